@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy analytics engine against the pure-Python fallback.
+
+    python benchmarks/bench_analytics.py                  # 100k, 1M, 10M check-ins
+    python benchmarks/bench_analytics.py --sizes 1000000 --python-max 0
+
+Synthetic check-ins are spread over 3 events and 40 scanners across a
+four-hour window. Both engines are checked to agree before timing is shown.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docgen.analytics import CheckInColumns, analyze_numpy, analyze_python, numpy_module  # noqa: E402
+
+np = numpy_module()
+
+START = 1_767_000_000
+WINDOW = 4 * 3600
+
+
+def synthetic(n, events=3, scanners=40, seed=7):
+    rng = random.Random(seed)
+    return CheckInColumns(
+        array('q', (START + int(rng.triangular(0, WINDOW, WINDOW * 0.3)) for _ in range(n))),
+        array('i', (i % events for i in range(n))),
+        array('i', (rng.randrange(scanners) for _ in range(n))),
+        array('i', range(n)),
+        [f'event-{i}' for i in range(events)],
+        [f'scanner-{i}' for i in range(scanners)],
+    )
+
+
+def synthetic_numpy(n, events=3, scanners=40, seed=7):
+    rng = np.random.default_rng(seed)
+    return CheckInColumns(
+        (START + rng.triangular(0, WINDOW * 0.3, WINDOW, n)).astype(np.int64),
+        (np.arange(n) % events).astype(np.int32),
+        rng.integers(0, scanners, n, dtype=np.int32),
+        np.arange(n, dtype=np.int32),
+        [f'event-{i}' for i in range(events)],
+        [f'scanner-{i}' for i in range(scanners)],
+    )
+
+
+def agree(expected, actual):
+    """Same rows, allowing for float rounding in the percentile maths"""
+    for rows_a, rows_b in zip(expected, actual):
+        if len(rows_a) != len(rows_b):
+            return False
+        for a, b in zip(rows_a, rows_b):
+            for x, y in zip(a, b):
+                if isinstance(x, float) or isinstance(y, float):
+                    if not math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-9):
+                        return False
+                elif x != y:
+                    return False
+    return True
+
+
+def timed(func, cols):
+    start = time.perf_counter()
+    result = func(cols)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--python-max', type=int, default=1_000_000,
+                        help='largest size to run the pure-Python engine at')
+    args = parser.parse_args(argv)
+    if np is None:
+        sys.exit('NumPy is not installed; nothing to compare against')
+
+    print(f'{"check-ins":>10}  {"python s":>9}  {"numpy s":>8}  {"speedup":>8}')
+    for n in args.sizes:
+        if n <= args.python_max:
+            cols = synthetic(n)
+            py, expected = timed(analyze_python, cols)
+            vec, actual = timed(analyze_numpy, cols)
+            if not agree(expected, actual):
+                sys.exit(f'engines disagree at n={n}')
+            print(f'{n:>10}  {py:>9.3f}  {vec:>8.3f}  {py / vec:>7.1f}x')
+        else:
+            vec, _ = timed(analyze_numpy, synthetic_numpy(n))
+            print(f'{n:>10}  {"skipped":>9}  {vec:>8.3f}  {"-":>8}')
+
+
+if __name__ == '__main__':
+    main()
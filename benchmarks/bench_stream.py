@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Compare the python-docx and streaming backends on long attendee listings.
+
+    python benchmarks/bench_stream.py                    # 10k, 100k, 300k attendee rows
+    python benchmarks/bench_stream.py --sizes 1000000 --backends stream
+
+Every build runs in its own process (the report plus an attendance section
+streamed from a generated export, empty fragment cache) and reports its
+wall time, peak RSS and output size.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+BACKENDS = ('docx', 'stream')
+
+
+def child(backend, export, output, cache_dir):
+    from docgen.attendance import add_attendance
+    from docgen.cache import FragmentCache
+    from docgen.model import load_document
+
+    if backend == 'stream':
+        from docgen.stream import stream_document as build
+    else:
+        from docgen.build import build_document as build
+
+    document = add_attendance(load_document(), [export], cache_dir=cache_dir)
+    start = time.perf_counter()
+    build(output, document, cache=FragmentCache(cache_dir), force=True)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': seconds,
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'size_mb': os.path.getsize(output) / 2 ** 20,
+    }))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 300_000])
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--child', nargs=4, metavar=('BACKEND', 'EXPORT', 'OUTPUT', 'CACHE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(*args.child)
+        return
+
+    sys.path.insert(0, HERE)
+    from suite import write_export
+
+    print(f'{"rows":>8}  {"backend":<7}  {"build s":>8}  {"peak RSS MB":>11}  {"docx MB":>8}')
+    with tempfile.TemporaryDirectory(prefix='docgen-stream-') as workdir:
+        for n in args.sizes:
+            export = os.path.join(workdir, f'export-{n}.jsonl')
+            write_export(export, n)
+            for backend in args.backends:
+                cache_dir = os.path.join(workdir, f'cache-{backend}-{n}')
+                output = os.path.join(workdir, f'{backend}-{n}.docx')
+                result = subprocess.run(
+                    [sys.executable, __file__, '--child', backend, export, output, cache_dir],
+                    check=True, capture_output=True, text=True,
+                )
+                r = json.loads(result.stdout)
+                print(f'{n:>8}  {backend:<7}  {r["seconds"]:>8.2f}  {r["rss_mb"]:>11.1f}  {r["size_mb"]:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
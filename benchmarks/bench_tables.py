@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bulk table writer against python-docx's add_row() loop.
+
+    python benchmarks/bench_tables.py                 # 100, 10k, 100k rows
+    python benchmarks/bench_tables.py --sizes 100 1000 --full
+
+The add_row() baseline grows quadratically, so by default it is skipped
+above --baseline-max rows; pass --full to time it at every size.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docgen.build import new_document  # noqa: E402
+from docgen.tables import write_table  # noqa: E402
+
+COLUMNS = ('Endpoint', 'Method', 'Purpose', 'Auth Required')
+
+
+def synthetic_rows(n):
+    for i in range(n):
+        yield (f'GET /api/events/{i}', 'GET', f'Synthetic endpoint {i}', 'Yes' if i % 2 else 'No')
+
+
+def add_row_loop(n):
+    doc = new_document()
+    table = doc.add_table(rows=1, cols=len(COLUMNS))
+    table.style = 'Light Grid Accent 1'
+    hdr = table.rows[0].cells
+    for i, name in enumerate(COLUMNS):
+        hdr[i].text = name
+    for row in synthetic_rows(n):
+        cells = table.add_row().cells
+        for i, value in enumerate(row):
+            cells[i].text = value
+    return doc
+
+
+def bulk_writer(n):
+    doc = new_document()
+    write_table(doc, COLUMNS, synthetic_rows(n))
+    return doc
+
+
+def timed(func, n):
+    start = time.perf_counter()
+    func(n)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10_000, 100_000])
+    parser.add_argument('--baseline-max', type=int, default=10_000, help='largest size to run add_row() at')
+    parser.add_argument('--full', action='store_true', help='run add_row() at every size')
+    args = parser.parse_args(argv)
+
+    print(f'{"rows":>8}  {"add_row() s":>12}  {"bulk s":>8}  {"speedup":>8}')
+    for n in args.sizes:
+        bulk = timed(bulk_writer, n)
+        if args.full or n <= args.baseline_max:
+            base = timed(add_row_loop, n)
+            print(f'{n:>8}  {base:>12.3f}  {bulk:>8.3f}  {base / bulk:>7.1f}x')
+        else:
+            print(f'{n:>8}  {"skipped":>12}  {bulk:>8.3f}  {"-":>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the documentation build, with regression checks.
+
+    python benchmarks/suite.py run                          # 10, 1k, 100k -> benchmarks/results.json
+    python benchmarks/suite.py run --scales 10 1000 -o before.json
+    python benchmarks/suite.py save-baseline                # results.json -> benchmarks/baseline.json
+    python benchmarks/suite.py compare                      # results.json vs benchmarks/baseline.json
+    python benchmarks/suite.py compare before.json after.json --threshold 0.05
+
+Every scale builds the real report with N synthetic endpoints in both API
+tables, N page entries and an attendance section streaming N attendee rows
+from a generated export. It then times:
+
+    render/<section>    each section, rendered in document order
+    save                doc.save() of the fully rendered document
+    tables/write_table  the bulk table writer, N rows
+    tables/add_row      python-docx's add_row() loop (up to --add-row-max)
+    build/cold          build_document() with an empty fragment cache
+    build/warm          build_document() with every section cached
+
+Each benchmark keeps the fastest of --repeat runs. Everything runs offline
+in a temporary directory; the repository's own cache is never touched.
+``compare`` exits with status 1 when any benchmark slowed down by more than
+the threshold.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docgen.attendance import attendance_section  # noqa: E402
+from docgen.build import build_document  # noqa: E402
+from docgen.cache import FragmentCache  # noqa: E402
+from docgen.model import load_document  # noqa: E402
+from docgen.providers import resolve_sources  # noqa: E402
+from docgen.render import Renderer  # noqa: E402
+from docgen.tables import write_table  # noqa: E402
+from docgen.template import new_document, style_ids  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.path.join(HERE, 'results.json')
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+RESULTS_VERSION = 1
+
+ENDPOINT_COLUMNS = ('Endpoint', 'Method', 'Purpose', 'Auth Required')
+EVENTS = ('65a000000000000000000001', '65a000000000000000000002', '65a000000000000000000003')
+
+
+def endpoint_rows(n):
+    methods = ('GET', 'POST', 'PUT', 'DELETE')
+    return [
+        (f'{methods[i % 4]} /api/resource-{i // 10}/:id/action-{i}', methods[i % 4],
+         f'Synthetic endpoint {i}', 'Yes' if i % 3 else 'No')
+        for i in range(n)
+    ]
+
+
+def page_items(n):
+    return [
+        {'name': f'Synthetic Page {i}', 'description': f'Generated page {i} used to size the entries renderer.',
+         'users': ('Attendees', 'Organizers', 'Admins')[i % 3]}
+        for i in range(n)
+    ]
+
+
+def write_export(path, n):
+    """JSONL export with ``n`` registrations spread over three events"""
+    statuses = ('confirmed', 'checked_in', 'checked_in', 'cancelled')
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n):
+            record = {
+                '_id': {'$oid': f'{i:024x}'}, 'eventId': {'$oid': EVENTS[i % 3]},
+                'eventTitle': f'Synthetic Event {i % 3 + 1}', 'ticketCode': f'TKT-{i:08d}',
+                'userName': f'Attendee {i}', 'status': statuses[i % 4],
+                'registeredAt': {'$date': f'2026-01-0{i % 9 + 1}T08:00:00Z'},
+            }
+            if record['status'] == 'checked_in':
+                record['checkedInAt'] = {'$date': f'2026-02-01T{9 + i % 5:02d}:{i % 60:02d}:00Z'}
+            f.write(json.dumps(record) + '\n')
+
+
+def synthetic_document(n, workdir):
+    """The real report scaled to ``n`` endpoints, pages and attendee rows"""
+    document = resolve_sources(load_document(), cache_dir=os.path.join(workdir, 'cache'))
+    for node in document.walk():
+        if node.type == 'table' and node.source:
+            node.source = None
+            node.rows = endpoint_rows(n)
+    for node in document.section('pages').children:
+        if node.type == 'entries':
+            node.items = page_items(n)
+
+    export = os.path.join(workdir, f'export-{n}.jsonl')
+    if not os.path.exists(export):
+        write_export(export, n)
+    names = [s.name for s in document.sections]
+    document.sections.insert(names.index('conclusion'),
+                             attendance_section([export], cache_dir=os.path.join(workdir, 'cache')))
+    return document
+
+
+def add_row_loop(doc, rows):
+    table = doc.add_table(rows=1, cols=len(ENDPOINT_COLUMNS))
+    table.style = 'Light Grid Accent 1'
+    for i, name in enumerate(ENDPOINT_COLUMNS):
+        table.rows[0].cells[i].text = name
+    for row in rows:
+        cells = table.add_row().cells
+        for i, value in enumerate(row):
+            cells[i].text = value
+
+
+class Recorder:
+    """Collects every run of every benchmark"""
+
+    def __init__(self):
+        self.runs = {}
+
+    def add(self, name, seconds):
+        self.runs.setdefault(name, []).append(seconds)
+
+    def time(self, name, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.add(name, time.perf_counter() - start)
+        return result
+
+    def results(self):
+        return {
+            name: {'min': min(runs), 'median': statistics.median(runs), 'runs': len(runs)}
+            for name, runs in self.runs.items()
+        }
+
+
+def bench_scale(n, recorder, workdir, repeat, add_row_max):
+    prefix = f'{n}/'
+    cache_dir = os.path.join(workdir, 'cache')
+    document = synthetic_document(n, workdir)
+    rows = endpoint_rows(n)
+
+    for _ in range(repeat):
+        doc = new_document(cache_dir)
+        renderer = Renderer(doc, style_ids(cache_dir))
+        for section in document.sections:
+            recorder.time(f'{prefix}render/{section.name}', renderer.render, section)
+        recorder.time(f'{prefix}save', doc.save, io.BytesIO())
+
+        recorder.time(f'{prefix}tables/write_table', write_table, new_document(cache_dir), ENDPOINT_COLUMNS, rows)
+        if n <= add_row_max:
+            recorder.time(f'{prefix}tables/add_row', add_row_loop, new_document(cache_dir), rows)
+
+        output = os.path.join(workdir, f'build-{n}.docx')
+        cache = FragmentCache(os.path.join(workdir, f'fragments-{n}'))
+        recorder.time(f'{prefix}build/cold', build_document, output, document, cache=cache, force=True)
+        recorder.time(f'{prefix}build/warm', build_document, output, document, cache=cache)
+
+
+def run(args):
+    import docx
+
+    recorder = Recorder()
+    with tempfile.TemporaryDirectory(prefix='docgen-bench-') as workdir:
+        for n in args.scales:
+            start = time.perf_counter()
+            bench_scale(n, recorder, workdir, args.repeat, args.add_row_max)
+            print(f'scale {n}: {time.perf_counter() - start:.1f}s', file=sys.stderr)
+
+    results = recorder.results()
+    data = {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'python_docx': docx.__version__,
+            'platform': platform.platform(),
+            'scales': args.scales,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+    width = max(len(name) for name in results)
+    for name, r in results.items():
+        print(f'{name:<{width}}  {r["min"] * 1000:10.2f} ms')
+    print(f'Wrote {len(results)} results to {args.output}')
+
+
+def load_results(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        raise SystemExit(f'{path}: no such results file; write one with "run" '
+                         '(and keep it as the baseline with "save-baseline")') from None
+    if data.get('version') != RESULTS_VERSION:
+        raise SystemExit(f'{path}: unsupported results version {data.get("version")!r}')
+    return data['results']
+
+
+def compare(baseline, current, threshold, min_time):
+    """
+    Return ``(rows, regressions)`` comparing the fastest runs.
+
+    Benchmarks faster than ``min_time`` in both files are reported but never
+    flagged; at that size timer noise dominates.
+    """
+    rows, regressions = [], []
+    for name in sorted(set(baseline) | set(current)):
+        if name not in baseline or name not in current:
+            rows.append((name, baseline.get(name, {}).get('min'), current.get(name, {}).get('min'), None, ''))
+            continue
+        before, after = baseline[name]['min'], current[name]['min']
+        change = after / before - 1 if before else 0.0
+        flag = ''
+        if max(before, after) >= min_time:
+            if change > threshold:
+                flag = 'REGRESSION'
+                regressions.append(name)
+            elif change < -threshold:
+                flag = 'faster'
+        rows.append((name, before, after, change, flag))
+    return rows, regressions
+
+
+def run_save_baseline(args):
+    load_results(args.results)
+    shutil.copyfile(args.results, args.output)
+    print(f'Saved {args.results} as the baseline {args.output}')
+
+
+def _ms(seconds):
+    return f'{seconds * 1000:10.2f}' if seconds is not None else f'{"-":>10}'
+
+
+def run_compare(args):
+    rows, regressions = compare(load_results(args.baseline), load_results(args.current),
+                                args.threshold, args.min_time)
+    width = max(len(row[0]) for row in rows)
+    print(f'{"benchmark":<{width}}  {"baseline ms":>11}  {"current ms":>10}  {"change":>7}')
+    for name, before, after, change, flag in rows:
+        pct = f'{change:+7.1%}' if change is not None else f'{"new" if before is None else "gone":>7}'
+        print(f'{name:<{width}}  {_ms(before):>11}  {_ms(after)}  {pct}  {flag}'.rstrip())
+    if regressions:
+        print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}')
+        return 1
+    print(f'No regressions beyond {args.threshold:.0%}')
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('run', help='run the benchmarks and write a results file')
+    p.add_argument('--scales', type=int, nargs='+', default=[10, 1_000, 100_000])
+    p.add_argument('--repeat', type=int, default=3, help='runs per benchmark; the fastest is kept')
+    p.add_argument('--add-row-max', type=int, default=1_000,
+                   help='largest scale to time the quadratic add_row() loop at')
+    p.add_argument('-o', '--output', default=RESULTS_PATH)
+
+    p = commands.add_parser('save-baseline', help='keep a results file as the baseline for compare')
+    p.add_argument('results', nargs='?', default=RESULTS_PATH)
+    p.add_argument('-o', '--output', default=BASELINE_PATH)
+
+    p = commands.add_parser('compare', help='flag regressions against a baseline results file')
+    p.add_argument('baseline', nargs='?', default=BASELINE_PATH)
+    p.add_argument('current', nargs='?', default=RESULTS_PATH)
+    p.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown, as a fraction (0.10 = 10%%)')
+    p.add_argument('--min-time', type=float, default=0.002,
+                   help='ignore benchmarks faster than this many seconds in both files')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        run(args)
+        return 0
+    if args.command == 'save-baseline':
+        run_save_baseline(args)
+        return 0
+    return run_compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+"""
+Build pipeline for the QRentry Activity Documentation report.
+"""
+
+import importlib
+
+__all__ = ['build_document', 'FragmentCache', 'load_document', 'Renderer']
+
+# python-docx and lxml are only imported once something that renders is used
+_EXPORTS = {'build_document': 'build', 'FragmentCache': 'cache', 'load_document': 'model', 'Renderer': 'render'}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return getattr(importlib.import_module(f'.{module}', __name__), name)
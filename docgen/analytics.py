@@ -0,0 +1,274 @@
+"""
+Attendance analytics over check-in timestamps.
+
+Check-ins are memory-mapped from the columnar cache (``docgen.columnar``)
+as flat columns (epoch seconds, interned scanner, event and registration
+codes) and reduced with NumPy when it is installed: arrival-rate
+percentiles and peak minute per event, throughput per scanner
+(``scannedBy``) and per-event conversion. A pure-Python implementation
+computes the same numbers when NumPy is missing.
+"""
+
+import json
+import os
+from array import array
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from .attendance import load_stats, source_stamps
+from .columnar import CHECK_INS, open_store
+from .model import Heading, PageBreak, Paragraph, Section, Table
+from .paths import CACHE_DIR
+
+PERCENTILES = (50, 90, 99)
+CACHE_VERSION = 2
+
+_numpy = False
+
+CheckInColumns = namedtuple('CheckInColumns', 'scanned_at event scanner registration event_ids scanner_ids')
+EventRate = namedtuple('EventRate', 'event_id scans unique p50 p90 p99 peak_minute peak_count')
+ScannerRate = namedtuple('ScannerRate', 'scanner_id scans active_minutes per_minute')
+
+
+def to_epoch(value):
+    """ISO-8601 string or epoch millis to integer epoch seconds"""
+    if isinstance(value, str):
+        try:
+            stamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        return int(stamp.timestamp())
+    try:
+        return int(float(value)) // 1000
+    except (TypeError, ValueError):
+        return None
+
+
+def load_check_ins(paths, cache_dir=CACHE_DIR):
+    """Check-in columns of the exports, memory-mapped from the columnar cache"""
+    store = open_store(paths, cache_dir)
+    return CheckInColumns(
+        store.column(CHECK_INS, 'scanned_at'), store.column(CHECK_INS, 'event'),
+        store.column(CHECK_INS, 'scanner'), store.column(CHECK_INS, 'registration'),
+        list(store.strings('events')), list(store.strings('scanners')),
+    )
+
+
+def numpy_module():
+    """NumPy, imported on first use; ``None`` when it is not installed"""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+def _as_numpy(cols, np):
+    # Zero-copy views over arrays and the memory-mapped columns alike
+    def view(column, dtype):
+        return np.frombuffer(column, dtype=dtype) if isinstance(column, (array, memoryview)) else column
+
+    return cols._replace(
+        scanned_at=view(cols.scanned_at, np.int64),
+        event=view(cols.event, np.int32),
+        scanner=view(cols.scanner, np.int32),
+        registration=view(cols.registration, np.int32),
+    )
+
+
+def analyze_numpy(cols):
+    """Vectorized analytics; returns ``(event_rates, scanner_rates)``"""
+    np = numpy_module()
+    cols = _as_numpy(cols, np)
+    ts, ev, sc, reg = cols.scanned_at, cols.event, cols.scanner, cols.registration
+    if not len(ts):
+        return [], []
+
+    # Codes are dense, so distinct registrations per event come from an
+    # owner table instead of a sort-based np.unique
+    owner = np.full(int(reg.max()) + 1, -1, dtype=np.int64)
+    owner[reg] = ev
+    unique = np.bincount(owner[owner >= 0], minlength=len(cols.event_ids))
+
+    event_rates = []
+    order = np.argsort(ev, kind='stable')
+    bounds = np.flatnonzero(np.diff(ev[order])) + 1
+    for idx in np.split(order, bounds):
+        t = ts[idx]
+        start = t.min()
+        per_minute = np.bincount((t - start) // 60)
+        peak = int(per_minute.argmax())
+        p50, p90, p99 = np.percentile(per_minute, PERCENTILES)
+        e = int(ev[idx[0]])
+        event_rates.append(EventRate(
+            cols.event_ids[e], int(len(t)), int(unique[e]),
+            float(p50), float(p90), float(p99), int(start + peak * 60), int(per_minute[peak]),
+        ))
+
+    n_scanners = len(cols.scanner_ids)
+    counts = np.bincount(sc, minlength=n_scanners)
+    first = np.full(n_scanners, np.iinfo(np.int64).max)
+    last = np.full(n_scanners, np.iinfo(np.int64).min)
+    np.minimum.at(first, sc, ts)
+    np.maximum.at(last, sc, ts)
+    present = np.flatnonzero(counts)
+    minutes = np.maximum((last[present] - first[present]) / 60.0, 1.0)
+    scanner_rates = [
+        ScannerRate(cols.scanner_ids[int(i)], int(counts[i]), float(m), float(counts[i] / m))
+        for i, m in zip(present, minutes)
+    ]
+    return event_rates, scanner_rates
+
+
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile, matching ``numpy.percentile``"""
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def analyze_python(cols):
+    """Pure-Python equivalent of ``analyze_numpy``"""
+    by_event = {}
+    owner = {}
+    scanner_stats = {}
+    for t, e, s, r in zip(cols.scanned_at, cols.event, cols.scanner, cols.registration):
+        times = by_event.get(e)
+        if times is None:
+            times = by_event[e] = []
+        times.append(t)
+        owner[r] = e
+        stat = scanner_stats.get(s)
+        if stat is None:
+            scanner_stats[s] = [1, t, t]
+        else:
+            stat[0] += 1
+            if t < stat[1]:
+                stat[1] = t
+            elif t > stat[2]:
+                stat[2] = t
+
+    unique = {}
+    for e in owner.values():
+        unique[e] = unique.get(e, 0) + 1
+
+    event_rates = []
+    for e in sorted(by_event):
+        times = by_event[e]
+        start = min(times)
+        per_minute = [0] * ((max(times) - start) // 60 + 1)
+        for t in times:
+            per_minute[(t - start) // 60] += 1
+        peak = max(range(len(per_minute)), key=per_minute.__getitem__)
+        ordered = sorted(per_minute)
+        p50, p90, p99 = (float(percentile(ordered, q)) for q in PERCENTILES)
+        event_rates.append(EventRate(
+            cols.event_ids[e], len(times), unique.get(e, 0), p50, p90, p99, start + peak * 60, per_minute[peak],
+        ))
+
+    scanner_rates = []
+    for s in sorted(scanner_stats):
+        count, first, last = scanner_stats[s]
+        minutes = max((last - first) / 60.0, 1.0)
+        scanner_rates.append(ScannerRate(cols.scanner_ids[s], count, minutes, count / minutes))
+    return event_rates, scanner_rates
+
+
+def analyze(cols, engine=None):
+    """Run the NumPy engine when available (or requested), else pure Python"""
+    if engine is None:
+        engine = 'numpy' if numpy_module() is not None else 'python'
+    if engine == 'numpy':
+        if numpy_module() is None:
+            raise RuntimeError('NumPy is not installed')
+        return analyze_numpy(cols)
+    return analyze_python(cols)
+
+
+def load_analytics(paths, cache_dir=CACHE_DIR):
+    """``analyze`` over the exports, cached by their mtime and size"""
+    stamps = source_stamps(paths)
+    cache_file = os.path.join(cache_dir, 'analytics', 'results.json')
+    try:
+        with open(cache_file, encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['version'] == CACHE_VERSION and cached['sources'] == stamps:
+            return [EventRate(*e) for e in cached['events']], [ScannerRate(*s) for s in cached['scanners']]
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+
+    event_rates, scanner_rates = analyze(load_check_ins(paths, cache_dir))
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp = f'{cache_file}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'sources': stamps, 'events': event_rates, 'scanners': scanner_rates}, f)
+    os.replace(tmp, cache_file)
+    return event_rates, scanner_rates
+
+
+def _minute(epoch):
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def analytics_section(paths, event_id=None, cache_dir=CACHE_DIR):
+    """Build the 'Attendance Analytics' model section"""
+    paths = list(paths)
+    event_rates, scanner_rates = load_analytics(paths, cache_dir)
+    stats = load_stats(paths, cache_dir)
+    if event_id is not None:
+        event_rates = [e for e in event_rates if e.event_id == str(event_id)]
+        stats = [s for s in stats if s.event_id == str(event_id)]
+    if not event_rates:
+        return Section('analytics', [
+            Heading('Attendance Analytics'),
+            Paragraph(text='No check-in scans in the exports, so there are no arrival rates, scanner '
+                           'throughput or conversion figures. Check-ins recorded on the registrations '
+                           '(checkedInAt) are counted in the attendance report.'),
+            PageBreak(),
+        ])
+
+    titles = {s.event_id: s.title for s in stats}
+
+    def title(eid):
+        return titles.get(eid, eid)
+
+    # Every event with registrations, including the ones nobody was scanned into
+    scanned = {e.event_id: e.unique for e in event_rates}
+    conversion = []
+    for s in stats:
+        checked_in = scanned.get(s.event_id, 0)
+        rate = f'{checked_in / s.registered:.1%}' if s.registered else '-'
+        conversion.append((s.title, s.registered, checked_in, rate))
+
+    return Section('analytics', [
+        Heading('Attendance Analytics'),
+        Paragraph(text='Arrival rates are check-ins per minute over each event\'s check-in window.'),
+        Heading('Arrival Rate', level=2),
+        Table(['Event', 'Scans', 'p50 / min', 'p90 / min', 'p99 / min', 'Peak Minute (UTC)', 'Peak Scans'], [
+            (title(e.event_id), e.scans, f'{e.p50:.1f}', f'{e.p90:.1f}', f'{e.p99:.1f}',
+             _minute(e.peak_minute), e.peak_count)
+            for e in event_rates
+        ]),
+        Heading('Scanner Throughput', level=2),
+        Table(['Scanner (scannedBy)', 'Scans', 'Active Minutes', 'Scans / min'], [
+            (s.scanner_id, s.scans, f'{s.active_minutes:.0f}', f'{s.per_minute:.2f}') for s in scanner_rates
+        ]),
+        Heading('Check-in Conversion', level=2),
+        Table(['Event', 'Registered', 'Checked In', 'Conversion'], conversion),
+        PageBreak(),
+    ])
+
+
+def add_analytics(document, paths, event_id=None, cache_dir=CACHE_DIR):
+    """Insert the analytics section ahead of the conclusion"""
+    section = analytics_section(paths, event_id, cache_dir)
+    names = [s.name for s in document.sections]
+    at = names.index('conclusion') if 'conclusion' in names else len(names)
+    document.sections.insert(at, section)
+    return document
@@ -0,0 +1,242 @@
+"""
+Attendance and check-in reporting from registration/check-in exports.
+
+Exports are JSONL (one document per line, e.g. ``mongoexport`` output) or
+CSV with the schema field names as headers. Registrations and check-ins may
+be in the same file or in separate ones; a record with ``scannedAt`` is a
+check-in, anything with a ``ticketCode`` is a registration.
+
+Records are read one at a time, once per change of the exports, into the
+columnar cache (``docgen.columnar``). Aggregates are folded from its
+memory-mapped columns one event's row range at a time and cached on disk
+keyed by the exports' mtime and size; each event's attendee table streams
+its row range straight into the table writer.
+"""
+
+import csv
+import json
+import os
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from .model import Heading, PageBreak, Paragraph, Section, Table
+from .paths import CACHE_DIR
+
+REGISTRATION, CHECK_IN = 'registration', 'check-in'
+CACHE_VERSION = 2
+ATTENDEE_COLUMNS = ('Ticket Code', 'User', 'Status', 'Registered At', 'Checked In At')
+
+EventStats = namedtuple('EventStats', 'event_id title registered cancelled checked_in no_show hourly')
+
+
+class StreamRows:
+    """
+    Table rows produced lazily at render time.
+
+    ``fingerprint`` stands in for the rows when the section is hashed, so
+    the rows themselves are never materialized. ``prepare``, when given,
+    sets up what the factory reads (e.g. converts the exports) ahead of
+    concurrent readers.
+    """
+    __slots__ = ('factory', 'fingerprint', 'prepare')
+
+    def __init__(self, factory, fingerprint, prepare=None):
+        self.factory = factory
+        self.fingerprint = fingerprint
+        self.prepare = prepare
+
+    def __iter__(self):
+        return iter(self.factory())
+
+
+def _plain(obj):
+    """Unwrap Extended JSON (``{"$oid": ...}``, ``{"$date": ...}``) as it is decoded"""
+    for key in ('$oid', '$date', '$numberLong'):
+        if key in obj:
+            return obj[key]
+    return obj
+
+
+# One decoder for every line; nested wrappers are unwrapped innermost first
+_decoder = json.JSONDecoder(object_hook=_plain)
+
+
+def read_records(path):
+    """Yield dict records from a .jsonl/.ndjson/.json-lines or .csv export"""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            for row in csv.DictReader(f):
+                yield {k: v for k, v in row.items() if v not in ('', None)}
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield _decoder.decode(line)
+
+
+def iter_records(paths):
+    """Yield ``(kind, record)`` for every record in every export"""
+    for path in paths:
+        for record in read_records(path):
+            if 'scannedAt' in record:
+                yield CHECK_IN, record
+            elif 'ticketCode' in record:
+                yield REGISTRATION, record
+
+
+def _hour_counts(epochs):
+    """Count epoch seconds per UTC hour, keyed ``'2024-12-31 10:00'``"""
+    counts = {}
+    for epoch in epochs:
+        hour = epoch // 3600
+        counts[hour] = counts.get(hour, 0) + 1
+    return {
+        datetime.fromtimestamp(hour * 3600, tz=timezone.utc).strftime('%Y-%m-%d %H:00'): count
+        for hour, count in counts.items()
+    }
+
+
+def aggregate_store(store):
+    """
+    Fold a ``docgen.columnar`` store into per-event statistics, one event's
+    row range at a time.
+
+    Check-ins drive the hourly histogram; when an event has none, the
+    registrations' ``checkedInAt`` is used instead.
+    """
+    from .columnar import CHECK_INS, NULL_TIME, REGISTRATIONS
+
+    statuses = store.enum('status')
+    cancelled_code, checked_in_code = statuses.index('cancelled'), statuses.index('checked_in')
+    status = store.column(REGISTRATIONS, 'status')
+    checked_in_at = store.column(REGISTRATIONS, 'checked_in_at')
+    scanned_at = store.column(CHECK_INS, 'scanned_at')
+    titles = store.strings('titles')
+
+    result = []
+    for event, event_id in enumerate(store.strings('events')):
+        regs = store.event_rows(REGISTRATIONS, event)
+        scans = store.event_rows(CHECK_INS, event)
+        codes = status[regs.start:regs.stop].tobytes()
+        cancelled = codes.count(cancelled_code)
+        registered = len(codes) - cancelled
+        hours = _hour_counts(scanned_at[scans.start:scans.stop])
+        if not hours:
+            hours = _hour_counts(
+                t for c, t in zip(codes, checked_in_at[regs.start:regs.stop])
+                if c == checked_in_code and t != NULL_TIME
+            )
+        # A check-in-only export has no registration statuses to count
+        checked_in = codes.count(checked_in_code) or len(scans)
+        result.append(EventStats(
+            event_id, titles[event] or event_id, registered, cancelled,
+            checked_in, max(registered - checked_in, 0), sorted(hours.items()),
+        ))
+    return result
+
+
+def source_stamps(paths):
+    stamps = []
+    for path in paths:
+        st = os.stat(path)
+        stamps.append([os.path.abspath(path), st.st_mtime_ns, st.st_size])
+    return stamps
+
+
+def load_stats(paths, cache_dir=CACHE_DIR):
+    """``aggregate_store`` over ``paths``, cached by the exports' mtime and size"""
+    stamps = source_stamps(paths)
+    cache_file = os.path.join(cache_dir, 'attendance', 'stats.json')
+    try:
+        with open(cache_file, encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['version'] == CACHE_VERSION and cached['sources'] == stamps:
+            return [EventStats(*s[:6], [tuple(h) for h in s[6]]) for s in cached['events']]
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+
+    from .columnar import open_store
+
+    stats = aggregate_store(open_store(paths, cache_dir))
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp = f'{cache_file}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'sources': stamps, 'events': stats}, f)
+    os.replace(tmp, cache_file)
+    return stats
+
+
+def attendee_rows(paths, event_id, cache_dir=CACHE_DIR):
+    """Stream one event's attendee rows from its row range in the columnar cache"""
+    from .columnar import REGISTRATIONS, format_time, open_store
+
+    store = open_store(paths, cache_dir)
+    rows = store.event_rows(REGISTRATIONS, event_id)
+    tickets, users, statuses = store.strings('tickets'), store.strings('users'), store.enum('status')
+    columns = [
+        store.column(REGISTRATIONS, name)[rows.start:rows.stop]
+        for name in ('ticket', 'user', 'status', 'registered_at', 'checked_in_at')
+    ]
+    for ticket, user, status, registered_at, checked_in_at in zip(*columns):
+        yield (
+            tickets[ticket], users[user], statuses[status],
+            format_time(registered_at), format_time(checked_in_at),
+        )
+
+
+def _rate(part, whole):
+    return f'{part / whole:.1%}' if whole else '-'
+
+
+def attendance_section(paths, event_id=None, attendees=True, cache_dir=CACHE_DIR):
+    """
+    Build the 'Attendance & Check-in Report' model section.
+
+    ``event_id`` limits the report to one event; ``attendees=False`` leaves
+    out the per-attendee tables.
+    """
+    from .columnar import open_store
+
+    paths = list(paths)
+    stats = load_stats(paths, cache_dir)
+    if event_id is not None:
+        stats = [s for s in stats if s.event_id == str(event_id)]
+    stamps = source_stamps(paths)
+
+    children = [
+        Heading('Attendance & Check-in Report'),
+        Paragraph(text=f'Generated from {len(paths)} export file(s): '
+                       + ', '.join(os.path.basename(p) for p in paths)),
+        Table(['Event', 'Registered', 'Checked In', 'No-show', 'Cancelled', 'Check-in Rate'], [
+            (s.title, s.registered, s.checked_in, s.no_show, s.cancelled, _rate(s.checked_in, s.registered))
+            for s in stats
+        ]),
+    ]
+    for s in stats:
+        children.append(Heading(s.title, level=2))
+        if s.hourly:
+            children.append(Table(['Hour (UTC)', 'Arrivals', 'Share'], [
+                (hour, count, _rate(count, s.checked_in or sum(c for _, c in s.hourly)))
+                for hour, count in s.hourly
+            ]))
+        else:
+            children.append(Paragraph(text='No check-ins recorded.'))
+        if attendees and s.registered + s.cancelled:
+            table = Table(ATTENDEE_COLUMNS)
+            table.rows = StreamRows(
+                lambda event_id=s.event_id: attendee_rows(paths, event_id, cache_dir),
+                {'sources': stamps, 'event': s.event_id},
+                lambda: open_store(paths, cache_dir),
+            )
+            children.append(table)
+    children.append(PageBreak())
+    return Section('attendance', children)
+
+
+def add_attendance(document, paths, event_id=None, attendees=True, cache_dir=CACHE_DIR):
+    """Insert the attendance section ahead of the conclusion"""
+    section = attendance_section(paths, event_id, attendees, cache_dir)
+    names = [s.name for s in document.sections]
+    at = names.index('conclusion') if 'conclusion' in names else len(names)
+    document.sections.insert(at, section)
+    return document
@@ -0,0 +1,166 @@
+"""
+Parallel multi-document builds from a variant manifest.
+
+Sections that come out identical in more than one variant (setup, tech
+stack, troubleshooting, ...) are rendered once in the parent process and
+written to the fragment cache before any worker starts; workers then only
+render what is specific to their variant and stitch the rest from disk.
+Workers get a block memo set up like the parent's, so with a disk budget
+they also share the blocks rendered inside variant-specific sections.
+Variants with per-attendee tables are written by the streaming backend
+(``docgen.stream``) unless another backend is asked for, and the shared
+sections are then pre-rendered as its body XML.
+"""
+
+import os
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .analytics import add_analytics, load_analytics
+from .attendance import add_attendance, load_stats
+from .build import RENDERER_FINGERPRINT, build_document, render_fragment
+from .cache import FragmentCache, section_key
+from .memo import block_memo, configure_memo
+from .model import CONTENT_PATH, load_document
+from .providers import resolve_sources
+from .render import Renderer
+from .screenshots import section_has_images
+from .stream import STREAM_FINGERPRINT, StreamRenderer, stream_document
+from .template import load_template, new_document, style_ids
+
+BuildResult = namedtuple('BuildResult', 'name output seconds rendered')
+BatchReport = namedtuple('BatchReport', 'results prerendered seconds')
+
+
+def _cached(cache, name, key):
+    cached = cache.open(name, key)
+    if cached is None:
+        return False
+    cached.close()
+    return True
+
+
+def prerender_shared(document, variants, cache, force=False, backend='docx'):
+    """
+    Render every section whose content is shared by two or more variants.
+
+    Returns the ``(name, key)`` of the sections rendered here; sections
+    already in the cache are skipped unless ``force``. With the ``stream``
+    ``backend`` the fragments are the ``<section>.stream`` body XML it
+    copies, and sections with screenshots (never cached there) are left out.
+    """
+    stream = backend == 'stream'
+    fingerprint = STREAM_FINGERPRINT if stream else RENDERER_FINGERPRINT
+    cache_dir = os.path.dirname(cache.path)
+    counts = Counter()
+    sections = {}
+    for variant in variants:
+        doc = resolve_sources(variant.apply(document), variant.context, cache_dir)
+        for section in doc.sections:
+            if stream and section_has_images(section):
+                continue
+            key = section_key(section, fingerprint)
+            counts[section.name, key] += 1
+            sections[section.name, key] = section
+
+    renderer = None
+    done = []
+    for (name, key), count in counts.items():
+        fragment = f'{name}.stream' if stream else name
+        if count < 2 or not force and _cached(cache, fragment, key):
+            continue
+        if renderer is None:
+            memo = None if force else block_memo()
+            if stream:
+                renderer = StreamRenderer(*load_template(cache_dir), memo=memo)
+            else:
+                renderer = Renderer(new_document(cache_dir), style_ids(cache_dir), memo=memo)
+        if stream:
+            with cache.writer(fragment, key, prune=False) as f:
+                renderer.render_to(sections[name, key], f)
+        else:
+            cache.put(name, key, render_fragment(renderer, sections[name, key]), prune=False)
+        done.append((name, key))
+    return done
+
+
+def _build_variant(variant, content_path, cache_dir, force, prerendered=(), exports=None, attendees=True,
+                   analytics=False, load_results=None, capacity=None, backend='docx'):
+    start = time.perf_counter()
+    document = variant.apply(load_document(content_path))
+    if exports:
+        event_id = variant.event.get('id') if variant.event else None
+        add_attendance(document, exports, event_id, attendees, cache_dir)
+        if analytics:
+            add_analytics(document, exports, event_id, cache_dir)
+    if load_results:
+        from .loadtest import add_performance
+        add_performance(document, load_results)
+    if capacity:
+        from .scansim import add_capacity
+        add_capacity(document, capacity, cache_dir)
+    out_dir = os.path.dirname(variant.output)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    write = stream_document if backend == 'stream' else build_document
+    rendered = write(
+        variant.output, document, cache=FragmentCache(cache_dir), force=force,
+        context=variant.context, prune=False, prerendered=prerendered,
+    )
+    return BuildResult(variant.name, variant.output, time.perf_counter() - start, rendered)
+
+
+def build_variants(variants, content_path=CONTENT_PATH, cache_dir=None, workers=None, force=False, exports=None,
+                   attendees=True, analytics=False, load_results=None, capacity=None, backend=None):
+    """
+    Build every variant on a process pool and return a ``BatchReport``.
+
+    ``exports`` adds the attendance section to each variant, limited to the
+    variant's event when it has one; ``attendees`` and ``analytics`` are as
+    for ``add_attendance`` and ``add_analytics``. ``load_results`` and
+    ``capacity`` add the performance and capacity-planning sections of a
+    load test and a check-in simulation to every variant. ``backend`` is
+    ``docx`` or ``stream``; by default ``stream`` when there are attendee
+    tables, whose rows it never holds in memory. With ``force``, the shared
+    sections are re-rendered once here and the workers re-render only their own.
+    """
+    start = time.perf_counter()
+    cache = FragmentCache(cache_dir) if cache_dir else FragmentCache()
+    cache_dir = os.path.dirname(cache.path)
+    if backend is None:
+        backend = 'stream' if exports and attendees else 'docx'
+
+    shared = prerender_shared(load_document(content_path), variants, cache, force, backend)
+    prerendered = {key for _, key in shared}
+    if exports:
+        # Aggregate once here so workers all hit the stats cache
+        load_stats(exports, cache_dir)
+        if analytics:
+            load_analytics(exports, cache_dir)
+
+    memo = block_memo()
+    settings = memo.settings if memo is not None else (0,)
+    with ProcessPoolExecutor(max_workers=workers, initializer=configure_memo, initargs=settings) as pool:
+        futures = [
+            pool.submit(_build_variant, v, content_path, cache_dir, force, prerendered, exports=exports,
+                        attendees=attendees, analytics=analytics, load_results=load_results,
+                        capacity=capacity, backend=backend)
+            for v in variants
+        ]
+        results = [f.result() for f in futures]
+
+    return BatchReport(results, [name for name, _ in shared], time.perf_counter() - start)
+
+
+def format_report(report):
+    lines = []
+    if report.prerendered:
+        lines.append(f'Pre-rendered shared sections: {", ".join(sorted(set(report.prerendered)))}')
+    for r in report.results:
+        own = ', '.join(r.rendered) if r.rendered else 'none (all cached)'
+        lines.append(f'  {r.name:<20} {r.seconds * 1000:8.1f} ms  {r.output}  [rendered: {own}]')
+    count = len(report.results)
+    rate = count / report.seconds if report.seconds else 0.0
+    lines.append(f'{count} documents in {report.seconds:.2f}s ({rate:.1f} docs/s)')
+    return '\n'.join(lines)
@@ -0,0 +1,91 @@
+"""
+Incremental document builder: renders stale sections, stitches cached ones.
+"""
+
+import os
+
+from . import model, render, screenshots, tables, wml
+from .cache import FragmentCache, append_block, module_fingerprint, parse_fragment, section_key, serialize_fragment
+from .memo import block_memo
+from .model import load_document
+from .providers import resolve_sources
+from .render import Renderer
+from .screenshots import ImageLinker
+from .template import new_document, style_ids
+
+RENDERER_FINGERPRINT = module_fingerprint(model, render, screenshots, tables, wml)
+
+
+def render_fragment(renderer, section):
+    """Render one section and return its serialized fragment"""
+    return serialize_fragment(renderer.render(section))
+
+
+def _add_section(section, body, renderer, cache, force, prune, prerendered=()):
+    """Stitch or render one section; returns ``(elements, fragment, rendered)``"""
+    key = section_key(section, RENDERER_FINGERPRINT)
+    fragment = None if force and key not in prerendered else cache.get(section.name, key)
+    if fragment is not None:
+        elements = parse_fragment(fragment)
+        for element in elements:
+            append_block(body, element)
+        return elements, fragment, False
+    elements = renderer.render(section)
+    fragment = serialize_fragment(elements)
+    cache.put(section.name, key, fragment, prune=prune)
+    return elements, fragment, True
+
+
+def build_document(output_path, document=None, cache=None, force=False, context=None, prune=True, tracer=None,
+                   prerendered=()):
+    """
+    Build the .docx at ``output_path`` from a model ``document``.
+
+    Sections whose content hash matches a cached fragment are stitched in
+    from the cache; the rest are rendered (reusing memoized blocks, see
+    ``docgen.memo``) and written back. ``force`` renders every section and
+    block and refreshes the cache, except for the section keys in
+    ``prerendered`` (rendered earlier in the same run). ``context`` is passed to
+    table data providers. ``tracer`` (a ``docgen.trace.Tracer``) records a span for
+    source resolution, every section and the save. Returns the names of the
+    sections that were rendered.
+    """
+    if document is None:
+        document = load_document()
+    if cache is None:
+        cache = FragmentCache()
+    cache_dir = os.path.dirname(cache.path)
+    if tracer is None:
+        resolve_sources(document, context, cache_dir)
+    else:
+        with tracer.span('resolve sources'):
+            resolve_sources(document, context, cache_dir)
+    if tracer is None:
+        doc = new_document(cache_dir)
+    else:
+        with tracer.span('base template'):
+            doc = new_document(cache_dir)
+    body = doc.element.body
+    renderer = Renderer(doc, style_ids(cache_dir), memo=None if force else block_memo())
+    linker = ImageLinker(doc, cache_dir)
+    rendered = []
+
+    for section in document.sections:
+        if tracer is None:
+            elements, fragment, fresh = _add_section(section, body, renderer, cache, force, prune, prerendered)
+        else:
+            with tracer.span(section.name, 'section') as span:
+                elements, fragment, fresh = _add_section(section, body, renderer, cache, force, prune, prerendered)
+                span.args['cached'] = not fresh
+                span.count(elements)
+        if ImageLinker.MARKER in fragment:
+            linker.link(elements)
+        if fresh:
+            rendered.append(section.name)
+
+    if tracer is None:
+        doc.save(output_path)
+    else:
+        with tracer.span('save', 'io'):
+            doc.save(output_path)
+    return rendered
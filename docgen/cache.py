@@ -0,0 +1,127 @@
+"""
+On-disk cache of rendered section XML fragments, keyed by input hash.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from contextlib import contextmanager
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .paths import CACHE_DIR
+
+# Bump when the fragment format or stitching logic changes
+CACHE_VERSION = '1'
+
+DEFAULT_CACHE_DIR = CACHE_DIR
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+SECT_PR = qn('w:sectPr')
+
+
+def section_key(section, salt=''):
+    """Hash a section's content; ``salt`` carries the renderer fingerprint"""
+    digest = hashlib.sha256()
+    digest.update(CACHE_VERSION.encode())
+    digest.update(salt.encode())
+    digest.update(section.name.encode())
+    digest.update(json.dumps(section.inputs, sort_keys=True, default=_json_default).encode())
+    return digest.hexdigest()
+
+
+def _json_default(value):
+    # Lazily streamed table rows hash by their fingerprint
+    fingerprint = getattr(value, 'fingerprint', None)
+    return fingerprint if fingerprint is not None else str(value)
+
+
+def module_fingerprint(*modules):
+    """Hash of the given modules' source, so code changes invalidate the cache"""
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(inspect.getsource(module).encode())
+    return digest.hexdigest()
+
+
+def append_block(body, element):
+    """Append a block element to a w:body, keeping sectPr last"""
+    # sectPr can only be the body's last child; checking just that one keeps
+    # stitching linear instead of rescanning the body on every append
+    last = next(body.iterchildren(reversed=True), None)
+    if last is not None and last.tag == SECT_PR:
+        last.addprevious(element)
+    else:
+        body.append(element)
+
+
+def serialize_fragment(elements):
+    """Serialize block elements into a standalone fragment document"""
+    parts = [f'<w:fragment xmlns:w="{W_NS}">'.encode()]
+    for el in elements:
+        parts.append(etree.tostring(el, encoding='utf-8'))
+    parts.append(b'</w:fragment>')
+    return b''.join(parts)
+
+
+def parse_fragment(data):
+    """Inverse of serialize_fragment; returns the block elements"""
+    return list(parse_xml(data))
+
+
+class FragmentCache:
+    """Directory of ``<section>-<hash>.xml`` files"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.path = os.path.join(cache_dir, 'sections')
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, name, key):
+        return os.path.join(self.path, f'{name}-{key[:20]}.xml')
+
+    def get(self, name, key):
+        try:
+            with open(self._file(name, key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def open(self, name, key):
+        """Open a cached fragment for streaming reads, or return None"""
+        try:
+            return open(self._file(name, key), 'rb')
+        except FileNotFoundError:
+            return None
+
+    def put(self, name, key, data, prune=True):
+        """
+        Store a fragment. With ``prune``, older fragments of the same section
+        are removed; variant builds keep several live keys per section and
+        pass ``prune=False``.
+        """
+        with self.writer(name, key, prune) as f:
+            f.write(data)
+
+    @contextmanager
+    def writer(self, name, key, prune=True):
+        """Binary file to stream a fragment into; it is only stored if the block completes"""
+        target = self._file(name, key)
+        if prune:
+            prefix = f'{name}-'
+            for entry in os.listdir(self.path):
+                if entry.startswith(prefix) and entry.endswith('.xml') and entry[len(prefix):-4].isalnum():
+                    try:
+                        os.remove(os.path.join(self.path, entry))
+                    except FileNotFoundError:
+                        pass
+        tmp = f'{target}.{os.getpid()}.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                yield f
+        except BaseException:
+            os.remove(tmp)
+            raise
+        os.replace(tmp, target)
@@ -0,0 +1,142 @@
+"""
+Line and bar charts as PNG figures, drawn with Pillow.
+
+Charts are stored in the image cache next to the processed screenshots,
+named after a hash of their data, so an unchanged chart is drawn once and
+its ``Figure`` (and the section around it) stays cached. ``figure`` returns
+``None`` when Pillow is not installed; callers leave the chart out.
+"""
+
+import hashlib
+import json
+import os
+
+from .paths import CACHE_DIR
+from .screenshots import have_pillow, images_path
+
+# Bump when the drawing below changes
+CHART_VERSION = '1'
+
+SIZE = (1600, 800)
+MARGIN = (130, 70, 50, 110)  # left, top, right, bottom
+PALETTE = ('#4F81BD', '#C0504D', '#9BBB59', '#8064A2', '#4BACC6', '#F79646', '#2C4D75', '#772C2A')
+GRID = '#D9D9D9'
+INK = '#333333'
+
+
+def _font(size):
+    from PIL import ImageFont
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+def nice_ticks(top, count=5):
+    """Round tick values from 0 to at least ``top``"""
+    if top <= 0:
+        return [0, 1]
+    raw = top / count
+    magnitude = 10 ** len(str(int(raw))) / 10 if raw >= 1 else 1
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    ticks = [0]
+    while ticks[-1] < top:
+        ticks.append(ticks[-1] + step)
+    return ticks
+
+
+def _label(value):
+    return f'{value:g}' if isinstance(value, float) else str(value)
+
+
+def _frame(title, x_label, y_label, y_ticks):
+    """Blank chart with title, axis labels and horizontal grid; returns the image, drawer and plot box"""
+    from PIL import Image, ImageDraw
+
+    image = Image.new('RGB', SIZE, 'white')
+    draw = ImageDraw.Draw(image)
+    left, top, right, bottom = MARGIN[0], MARGIN[1], SIZE[0] - MARGIN[2], SIZE[1] - MARGIN[3]
+    draw.text((SIZE[0] / 2, 20), title, fill=INK, font=_font(34), anchor='ma')
+    small = _font(24)
+    for tick in y_ticks:
+        y = bottom - (bottom - top) * tick / y_ticks[-1]
+        draw.line((left, y, right, y), fill=GRID, width=1)
+        draw.text((left - 12, y), _label(tick), fill=INK, font=small, anchor='rm')
+    draw.line((left, top, left, bottom), fill=INK, width=2)
+    draw.line((left, bottom, right, bottom), fill=INK, width=2)
+    draw.text(((left + right) / 2, SIZE[1] - 20), x_label, fill=INK, font=small, anchor='md')
+    label = Image.new('RGB', (int(draw.textlength(y_label, font=small)) + 8, 32), 'white')
+    ImageDraw.Draw(label).text((4, 2), y_label, fill=INK, font=small)
+    label = label.rotate(90, expand=True)
+    image.paste(label, (10, int((top + bottom - label.height) / 2)))
+    return image, draw, (left, top, right, bottom)
+
+
+def line_chart(series, title, x_label, y_label, x_step=1):
+    """``series`` is ``[(label, values)]``, values at x = 0, ``x_step``, ..."""
+    longest = max(len(values) for _, values in series)
+    y_ticks = nice_ticks(max((max(values, default=0) for _, values in series), default=0))
+    image, draw, (left, top, right, bottom) = _frame(title, x_label, y_label, y_ticks)
+    small = _font(24)
+    span = max(longest - 1, 1)
+
+    def point(i, value):
+        return left + (right - left) * i / span, bottom - (bottom - top) * value / y_ticks[-1]
+
+    for x_tick in nice_ticks(span * x_step, 10):
+        if x_tick > span * x_step:
+            break
+        x = point(x_tick / x_step, 0)[0]
+        draw.line((x, bottom, x, bottom + 8), fill=INK, width=2)
+        draw.text((x, bottom + 12), _label(x_tick), fill=INK, font=small, anchor='ma')
+    for n, (label, values) in enumerate(series):
+        color = PALETTE[n % len(PALETTE)]
+        if len(values) > 1:
+            draw.line([point(i, v) for i, v in enumerate(values)], fill=color, width=4, joint='curve')
+        y = top + 10 + n * 34
+        draw.line((right - 250, y + 12, right - 200, y + 12), fill=color, width=6)
+        draw.text((right - 190, y), label, fill=INK, font=small)
+    return image
+
+
+def bar_chart(bars, title, x_label, y_label):
+    """``bars`` is ``[(label, value)]``"""
+    y_ticks = nice_ticks(max((value for _, value in bars), default=0))
+    image, draw, (left, top, right, bottom) = _frame(title, x_label, y_label, y_ticks)
+    small = _font(24)
+    slot = (right - left) / max(len(bars), 1)
+    for i, (label, value) in enumerate(bars):
+        x0 = left + slot * (i + 0.2)
+        x1 = left + slot * (i + 0.8)
+        y = bottom - (bottom - top) * value / y_ticks[-1]
+        draw.rectangle((x0, y, x1, bottom), fill=PALETTE[0])
+        draw.text(((x0 + x1) / 2, y - 6), _label(value), fill=INK, font=small, anchor='md')
+        draw.text(((x0 + x1) / 2, bottom + 12), label, fill=INK, font=small, anchor='ma')
+    return image
+
+
+def figure(kind, data, cache_dir=CACHE_DIR, **labels):
+    """
+    Draw a ``'line'`` or ``'bar'`` chart of ``data`` (unless already cached)
+    and return the image dict for a ``Figure``, sized to the printable width.
+    """
+    if not have_pillow():
+        return None
+    from .template import load_template
+
+    key = hashlib.sha256(
+        json.dumps([CHART_VERSION, kind, data, labels], sort_keys=True).encode()
+    ).hexdigest()[:32]
+    file = f'{key}.png'
+    images_dir = images_path(cache_dir)
+    path = os.path.join(images_dir, file)
+    if not os.path.exists(path):
+        draw = line_chart if kind == 'line' else bar_chart
+        image = draw(data, **labels)
+        os.makedirs(images_dir, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        image.save(tmp, 'PNG', optimize=True)
+        os.replace(tmp, path)
+    width = load_template(cache_dir)[0]._block_width
+    return {'file': file, 'width': width, 'height': int(width * SIZE[1] / SIZE[0])}
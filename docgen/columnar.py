@@ -0,0 +1,580 @@
+"""
+Columnar on-disk cache of registration/check-in exports.
+
+Exports are converted once per set of source files (keyed by their mtime
+and size) into a directory of flat column files under
+``.docgen-cache/columnar/``:
+
+- timestamps are int64 epoch seconds (``NULL_TIME`` when missing),
+- ticket codes, event ids, users, scanners and registration ids are
+  interned into string tables (a UTF-8 blob plus int64 offsets), with
+  rows holding int32 codes,
+- ``RegistrationStatus`` and ``CheckInMethod`` are one-byte enum codes.
+
+Rows are ordered by event, and two indexes map an event id to its row
+range in either table and a ticket code to its registration rows, so a
+per-event report reads one slice instead of scanning every export.
+Readers memory-map the files and get ``memoryview`` columns (NumPy can
+wrap them with ``frombuffer``) without copying.
+
+    python -m docgen.columnar registrations.jsonl check-ins.jsonl --event <id>
+"""
+
+import argparse
+import bisect
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+from array import array
+from datetime import datetime, timezone
+
+from .attendance import CHECK_IN, iter_records, source_stamps
+from .paths import CACHE_DIR
+
+STORE_VERSION = 1
+NULL_TIME = -2 ** 63
+
+REGISTRATIONS, CHECK_INS = 'registrations', 'check_ins'
+
+# Column name and array typecode, per table
+COLUMNS = {
+    REGISTRATIONS: (
+        ('event', 'i'), ('ticket', 'i'), ('user', 'i'), ('status', 'B'),
+        ('registered_at', 'q'), ('checked_in_at', 'q'),
+    ),
+    CHECK_INS: (
+        ('event', 'i'), ('scanner', 'i'), ('registration', 'i'), ('method', 'B'), ('scanned_at', 'q'),
+    ),
+}
+
+# The backend's RegistrationStatus and CheckInMethod; values outside them
+# get the next free code
+STATUSES = ('confirmed', 'cancelled', 'checked_in')
+METHODS = ('qr', 'manual')
+
+# Per-row string columns, interned through an external sort, and the
+# string table each one's codes index
+STRING_COLUMNS = {
+    REGISTRATIONS: {'ticket': 'tickets', 'user': 'users'},
+    CHECK_INS: {'registration': 'registration_ids'},
+}
+
+# Rows per buffered write, per sorted run of strings and per block read
+# back from a run while merging
+CHUNK_ROWS = 1 << 14
+RUN_ROWS = 1 << 16
+BLOCK_ROWS = 1 << 10
+
+_stores = {}
+# Writer threads (docx, html, md) open the same store concurrently
+_lock = threading.Lock()
+
+
+def columnar_path(cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, 'columnar')
+
+
+def format_time(epoch):
+    """Epoch seconds to ``'2024-12-31T10:42:00Z'``; ``''`` for ``NULL_TIME``"""
+    if epoch == NULL_TIME:
+        return ''
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _map(path, typecode):
+    """Read-only memory map of a column file as a typed ``memoryview``"""
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return memoryview(b'').cast(typecode)
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast(typecode)
+
+
+class StringTable:
+    """Interned strings backed by a memory-mapped blob and offsets"""
+    __slots__ = ('blob', 'offsets')
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, code):
+        return str(self.blob[self.offsets[code]:self.offsets[code + 1]], 'utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def find(self, value):
+        """Code of ``value`` in a sorted table, or ``None``"""
+        code = bisect.bisect_left(self, value)
+        return code if code < len(self) and self[code] == value else None
+
+
+class ColumnStore:
+    """A converted export set, opened read-only"""
+    __slots__ = ('path', 'meta', '_columns', '_strings')
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self._columns = {}
+        self._strings = {}
+
+    def rows(self, table):
+        return self.meta['rows'][table]
+
+    def enum(self, name):
+        """Values of the ``'status'`` or ``'method'`` enum, indexed by code"""
+        return self.meta['enums'][name]
+
+    def column(self, table, name, typecode=None):
+        key = f'{table}.{name}'
+        view = self._columns.get(key)
+        if view is None:
+            if typecode is None:
+                typecode = dict(COLUMNS[table])[name]
+            view = self._columns[key] = _map(os.path.join(self.path, key), typecode)
+        return view
+
+    def strings(self, name):
+        table = self._strings.get(name)
+        if table is None:
+            table = self._strings[name] = StringTable(
+                _map(os.path.join(self.path, f'{name}.str'), 'B'),
+                _map(os.path.join(self.path, f'{name}.off'), 'q'),
+            )
+        return table
+
+    def event_rows(self, table, event):
+        """Row range of one event (its code or id) in ``table``"""
+        if isinstance(event, str):
+            event = self.strings('events').find(event)
+            if event is None:
+                return range(0)
+        starts = self.column(table, 'event_start', 'q')
+        return range(starts[event], starts[event + 1])
+
+    def ticket_rows(self, ticket_code):
+        """Registration rows carrying ``ticket_code``"""
+        code = self.strings('tickets').find(ticket_code)
+        if code is None:
+            return []
+        starts = self.column(REGISTRATIONS, 'ticket_start', 'q')
+        return list(self.column(REGISTRATIONS, 'ticket_rows', 'i')[starts[code]:starts[code + 1]])
+
+
+def _intern(table, value):
+    code = table.get(value)
+    if code is None:
+        code = table[value] = len(table)
+    return code
+
+
+def _enum_code(values, value):
+    try:
+        return values.index(value)
+    except ValueError:
+        if len(values) == 256:
+            raise ValueError(f'More than 256 distinct values, e.g. {value!r}') from None
+        values.append(value)
+        return len(values) - 1
+
+
+def _flush(columns, files, runs):
+    """Append buffered column chunks to their spill files and spill full runs"""
+    for name, column in columns.items():
+        column.tofile(files[name])
+        del column[:]
+    for column_runs in runs.values():
+        if len(column_runs.values) >= RUN_ROWS:
+            column_runs.spill()
+
+
+def _chunks(path, typecode, size=None):
+    """Read a column file back as arrays of at most ``size`` (``CHUNK_ROWS``) items"""
+    size = size or CHUNK_ROWS
+    with open(path, 'rb') as f:
+        while True:
+            chunk = array(typecode)
+            data = f.read(size * chunk.itemsize)
+            if not data:
+                return
+            chunk.frombytes(data)
+            yield chunk
+
+
+class _Runs:
+    """
+    String values of one column, spilled as sorted ``(value, row)`` runs.
+
+    Values are appended to ``values`` and spilled every ``RUN_ROWS``
+    consecutive rows; ``merge`` yields every pair in value order, so the
+    values can be interned without holding them all in memory.
+    """
+    __slots__ = ('prefix', 'values', 'base', 'paths')
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.values = []
+        self.base = 0
+        self.paths = []
+
+    def spill(self):
+        values, base = self.values, self.base
+        if not values:
+            return
+        order = sorted(range(len(values)), key=values.__getitem__)
+        path = f'{self.prefix}.{len(self.paths)}'
+        with open(path, 'wb') as f:
+            for at in range(0, len(order), BLOCK_ROWS):
+                block = order[at:at + BLOCK_ROWS]
+                pickle.dump(([values[i] for i in block], [base + i for i in block]), f, pickle.HIGHEST_PROTOCOL)
+        self.paths.append(path)
+        self.base += len(values)
+        values.clear()
+
+    @staticmethod
+    def _read(path):
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    values, rows = pickle.load(f)
+                except EOFError:
+                    return
+                yield from zip(values, rows)
+
+    def merge(self):
+        self.spill()
+        return heapq.merge(*(self._read(path) for path in self.paths))
+
+
+def _scatter(path, typecode, count):
+    """Writable typed view over a new ``count``-item column file"""
+    with open(path, 'wb') as f:
+        f.truncate(count * array(typecode).itemsize)
+    if not count:
+        return None, memoryview(b'').cast(typecode)
+    with open(path, 'r+b') as f:
+        mapped = mmap.mmap(f.fileno(), 0)
+    return mapped, memoryview(mapped).cast(typecode)
+
+
+def _close(mapped, view):
+    view.release()
+    if mapped is not None:
+        mapped.close()
+
+
+def _write_strings(directory, name, values):
+    offsets = array('q', [0])
+    with open(os.path.join(directory, f'{name}.str'), 'wb') as f:
+        for value in values:
+            data = value.encode('utf-8')
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    with open(os.path.join(directory, f'{name}.off'), 'wb') as f:
+        offsets.tofile(f)
+
+
+def _intern_runs(directory, table, field, runs, dest):
+    """
+    Intern the merged ``runs`` of ``table.field`` into its string table.
+
+    Codes follow sorted order and are written at each row's ``dest``;
+    ticket codes also get the ``ticket_rows``/``ticket_start`` index.
+    The string table and the index are written a chunk at a time.
+    """
+    name = STRING_COLUMNS[table][field]
+    index = field == 'ticket'
+    mapped, codes = _scatter(os.path.join(directory, f'{table}.{field}'), 'i', len(dest))
+    outputs = [
+        open(os.path.join(directory, f'{name}.str'), 'wb'),
+        open(os.path.join(directory, f'{name}.off'), 'wb'),
+    ]
+    if index:
+        outputs += [
+            open(os.path.join(directory, f'{table}.ticket_rows'), 'wb'),
+            open(os.path.join(directory, f'{table}.ticket_start'), 'wb'),
+        ]
+    blob, offsets, rows, starts = [], array('q', [0]), array('i'), array('q')
+    size = count = 0
+
+    def flush():
+        outputs[0].write(b''.join(blob))
+        offsets.tofile(outputs[1])
+        blob.clear()
+        del offsets[:]
+        if index:
+            rows.tofile(outputs[2])
+            starts.tofile(outputs[3])
+            del rows[:], starts[:]
+
+    try:
+        code, last, first = -1, None, 0
+        for value, row in runs.merge():
+            at = dest[row]
+            if value != last:
+                if index:
+                    # Sources in export order; a ticket in several events
+                    # lists its rows in store order
+                    if count - first > 1:
+                        rows[first - count:] = array('i', sorted(rows[first - count:]))
+                    starts.append(count)
+                    first = count
+                if len(offsets) >= CHUNK_ROWS:
+                    flush()
+                data = value.encode('utf-8')
+                blob.append(data)
+                size += len(data)
+                offsets.append(size)
+                code, last = code + 1, value
+            codes[at] = code
+            if index:
+                rows.append(at)
+                count += 1
+        if index:
+            if count - first > 1:
+                rows[first - count:] = array('i', sorted(rows[first - count:]))
+            starts.append(count)
+        flush()
+    finally:
+        _close(mapped, codes)
+        for f in outputs:
+            f.close()
+    for path in runs.paths:
+        os.remove(path)
+
+
+def convert(paths, directory):
+    """
+    Stream the exports once into the column files in ``directory``.
+
+    Rows are spilled in export order, then counting-sorted by event into
+    place; ticket, user and registration strings are interned through an
+    external sort. Memory stays flat in the number of rows: only events,
+    titles and scanners are held in memory.
+    """
+    from .analytics import to_epoch
+
+    os.makedirs(directory, exist_ok=True)
+    spill = os.path.join(directory, 'spill')
+    os.makedirs(spill)
+
+    # Numeric columns are buffered and appended to unsorted spill files
+    numeric = {
+        table: {name: array(code) for name, code in columns if name not in STRING_COLUMNS[table]}
+        for table, columns in COLUMNS.items()
+    }
+    files = {
+        table: {name: open(os.path.join(spill, f'{table}.{name}'), 'wb') for name in columns}
+        for table, columns in numeric.items()
+    }
+    runs = {
+        table: {name: _Runs(os.path.join(spill, f'{table}.{name}')) for name in STRING_COLUMNS[table]}
+        for table in COLUMNS
+    }
+    reg, chk = numeric[REGISTRATIONS], numeric[CHECK_INS]
+    tickets, users = runs[REGISTRATIONS]['ticket'].values, runs[REGISTRATIONS]['user'].values
+    registration_ids = runs[CHECK_INS]['registration'].values
+    events, titles, scanners = {}, {}, {}
+    counts = {table: array('q') for table in COLUMNS}
+    statuses, methods = list(STATUSES), list(METHODS)
+
+    # Parsed once per distinct value while it is recent; exports repeat
+    # timestamps a lot
+    parsed = {}
+
+    def timestamp(value):
+        epoch = parsed.get(value) if isinstance(value, str) else None
+        if epoch is None:
+            epoch = to_epoch(value)
+            epoch = NULL_TIME if epoch is None else epoch
+            if isinstance(value, str):
+                if len(parsed) == CHUNK_ROWS:
+                    parsed.clear()
+                parsed[value] = epoch
+        return epoch
+
+    try:
+        for kind, record in iter_records(paths):
+            event_id = str(record.get('eventId', ''))
+            event = _intern(events, event_id)
+            if event == len(counts[REGISTRATIONS]):
+                for table in counts.values():
+                    table.append(0)
+            if titles.get(event_id) is None:
+                titles[event_id] = record.get('eventTitle')
+            if kind == CHECK_IN:
+                scanned_at = timestamp(record.get('scannedAt'))
+                if scanned_at == NULL_TIME:
+                    continue
+                counts[CHECK_INS][event] += 1
+                chk['event'].append(event)
+                chk['scanner'].append(_intern(scanners, str(record.get('scannedBy', ''))))
+                registration_ids.append(str(record.get('registrationId', '')))
+                chk['method'].append(_enum_code(methods, record.get('method', 'qr')))
+                chk['scanned_at'].append(scanned_at)
+                if len(chk['event']) == CHUNK_ROWS:
+                    _flush(chk, files[CHECK_INS], runs[CHECK_INS])
+                continue
+            counts[REGISTRATIONS][event] += 1
+            reg['event'].append(event)
+            tickets.append(str(record.get('ticketCode', '')))
+            users.append(str(record.get('userName') or record.get('userId', '')))
+            reg['status'].append(_enum_code(statuses, record.get('status', 'confirmed')))
+            reg['registered_at'].append(timestamp(record.get('registeredAt')))
+            reg['checked_in_at'].append(timestamp(record.get('checkedInAt')))
+            if len(reg['event']) == CHUNK_ROWS:
+                _flush(reg, files[REGISTRATIONS], runs[REGISTRATIONS])
+        for table, columns in numeric.items():
+            _flush(columns, files[table], runs[table])
+    finally:
+        for table in files.values():
+            for f in table.values():
+                f.close()
+
+    # Event and ticket codes follow sorted order so both tables are
+    # searchable; rows are grouped by event with a counting sort
+    event_ids = sorted(events)
+    remap = array('i', bytes(4 * len(event_ids)))
+    for new, event_id in enumerate(event_ids):
+        remap[events[event_id]] = new
+
+    rows = {}
+    for table, columns in numeric.items():
+        sizes = counts[table]
+        total = rows[table] = sum(sizes)
+        starts = array('q', bytes(8 * (len(event_ids) + 1)))
+        for old, new in enumerate(remap):
+            starts[new + 1] = sizes[old]
+        for i in range(len(event_ids)):
+            starts[i + 1] += starts[i]
+        with open(os.path.join(directory, f'{table}.event_start'), 'wb') as f:
+            starts.tofile(f)
+
+        # Destination of every row, in export order
+        placed = array('q', (starts[new] for new in remap))
+        dest_path = os.path.join(spill, f'{table}.dest')
+        with open(dest_path, 'wb') as f:
+            for chunk in _chunks(os.path.join(spill, f'{table}.event'), 'i'):
+                dest = array('i', bytes(4 * len(chunk)))
+                for i, old in enumerate(chunk):
+                    dest[i] = placed[old]
+                    placed[old] += 1
+                dest.tofile(f)
+
+        with open(os.path.join(directory, f'{table}.event'), 'wb') as f:
+            for event in range(len(event_ids)):
+                run = starts[event + 1] - starts[event]
+                for at in range(0, run, CHUNK_ROWS):
+                    (array('i', [event]) * min(CHUNK_ROWS, run - at)).tofile(f)
+        for name in columns:
+            if name == 'event':
+                continue
+            typecode = dict(COLUMNS[table])[name]
+            mapped, out = _scatter(os.path.join(directory, f'{table}.{name}'), typecode, total)
+            dests = _chunks(dest_path, 'i')
+            for chunk in _chunks(os.path.join(spill, f'{table}.{name}'), typecode):
+                for d, value in zip(next(dests), chunk):
+                    out[d] = value
+            _close(mapped, out)
+
+        dest = _map(dest_path, 'i')
+        for field, column_runs in runs[table].items():
+            _intern_runs(directory, table, field, column_runs, dest)
+        dest.release()
+    shutil.rmtree(spill)
+
+    for name, values in (
+        ('events', event_ids),
+        ('titles', [str(titles[e] or '') for e in event_ids]),
+        ('scanners', scanners),
+    ):
+        _write_strings(directory, name, values)
+    with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': STORE_VERSION, 'byteorder': sys.byteorder, 'sources': source_stamps(paths),
+            'rows': rows, 'enums': {'status': statuses, 'method': methods},
+        }, f)
+
+
+def _prune(root, paths, keep):
+    """Remove stores converted from earlier versions of the same exports"""
+    sources = sorted(os.path.abspath(p) for p in paths)
+    for name in os.listdir(root):
+        if name == keep or name.endswith('.tmp'):
+            continue
+        try:
+            with open(os.path.join(root, name, 'meta.json'), encoding='utf-8') as f:
+                stale = sorted(s[0] for s in json.load(f)['sources']) == sources
+        except (OSError, KeyError, ValueError):
+            stale = True
+        if stale:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def open_store(paths, cache_dir=CACHE_DIR):
+    """The ``ColumnStore`` for ``paths``, converting the exports if they changed"""
+    paths = list(paths)
+    stamps = source_stamps(paths)
+    key = hashlib.sha256(json.dumps([STORE_VERSION, sys.byteorder, stamps]).encode()).hexdigest()[:16]
+    root = columnar_path(cache_dir)
+    directory = os.path.join(root, key)
+    with _lock:
+        store = _stores.get(directory)
+        if store is not None:
+            return store
+        if not os.path.exists(os.path.join(directory, 'meta.json')):
+            os.makedirs(root, exist_ok=True)
+            tmp = tempfile.mkdtemp(prefix=f'{key}.', suffix='.tmp', dir=root)
+            try:
+                convert(paths, tmp)
+                os.replace(tmp, directory)
+            except OSError:
+                if not os.path.exists(os.path.join(directory, 'meta.json')):
+                    raise
+                # Another build converted the same exports first
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+            _prune(root, paths, key)
+        store = _stores[directory] = ColumnStore(directory)
+        return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert registration/check-in exports to the columnar cache.')
+    parser.add_argument('exports', nargs='+', metavar='EXPORT', help='.jsonl or .csv exports')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='cache directory (default .docgen-cache)')
+    parser.add_argument('--event', help='print the row ranges of one event id')
+    parser.add_argument('--ticket', help='print the registration rows of one ticket code')
+    args = parser.parse_args(argv)
+
+    store = open_store(args.exports, args.cache_dir)
+    size = sum(entry.stat().st_size for entry in os.scandir(store.path))
+    print(f'{store.path}: {store.rows(REGISTRATIONS)} registrations, {store.rows(CHECK_INS)} check-ins, '
+          f'{len(store.strings("events"))} events, {size / 1024:.0f} KiB')
+    if args.event:
+        for table in (REGISTRATIONS, CHECK_INS):
+            rows = store.event_rows(table, args.event)
+            print(f'{table}: rows {rows.start}-{rows.stop} ({len(rows)})')
+    if args.ticket:
+        statuses = store.enum('status')
+        events, users = store.strings('events'), store.strings('users')
+        for row in store.ticket_rows(args.ticket):
+            r = {name: store.column(REGISTRATIONS, name)[row] for name, _ in COLUMNS[REGISTRATIONS]}
+            print(f'row {row}: event {events[r["event"]]}, user {users[r["user"]]}, {statuses[r["status"]]}, '
+                  f'registered {format_time(r["registered_at"])}, checked in {format_time(r["checked_in_at"]) or "-"}')
+
+
+if __name__ == '__main__':
+    main()
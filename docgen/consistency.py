@@ -0,0 +1,357 @@
+"""
+Consistency check of the documentation against the code.
+
+Facts are extracted from ``backend/package.json`` and
+``frontend/package.json`` (dependencies, versions, npm scripts),
+``backend/src/main.ts`` (port, global prefix), the NestJS controllers (via
+the route index) and the frontend ``services/*.service.ts`` (the API calls
+the UI makes). Every statement the document makes about the database, the
+ORM, package versions, ports, npm scripts and endpoint paths is checked
+against them, as are the services' calls against the controllers.
+
+Files are read and parsed on a thread pool; per-file facts are cached by
+content hash and per-section results by section and fact hashes, so an
+unchanged tree is checked without parsing anything.
+
+    python -m docgen.consistency      # exit status 1 when something disagrees
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .paths import CACHE_DIR, REPO_ROOT
+from .routes import BACKEND_SRC
+
+Finding = namedtuple('Finding', 'section kind claim expected source')
+
+CHECK_VERSION = 3
+BACKEND_PACKAGE = os.path.join(REPO_ROOT, 'backend', 'package.json')
+FRONTEND_PACKAGE = os.path.join(REPO_ROOT, 'frontend', 'package.json')
+SERVICES_DIR = os.path.join(REPO_ROOT, 'frontend', 'src', 'services')
+SERVICES_GLOB = os.path.join(SERVICES_DIR, '*.service.ts')
+# Read besides the content and backend/src, for --watch
+CHECK_SOURCES = (BACKEND_PACKAGE, FRONTEND_PACKAGE, SERVICES_DIR)
+
+# Names used in the docs -> npm packages that provide them
+DATABASES = {
+    'PostgreSQL': ('pg', 'postgres'),
+    'MySQL': ('mysql', 'mysql2'),
+    'MongoDB': ('mongodb', 'mongoose', '@nestjs/mongoose'),
+    'SQLite': ('sqlite3', 'better-sqlite3'),
+}
+ORMS = {
+    'TypeORM': ('typeorm', '@nestjs/typeorm'),
+    'Prisma': ('prisma', '@prisma/client'),
+    'Sequelize': ('sequelize', '@nestjs/sequelize'),
+    'Mongoose': ('mongoose', '@nestjs/mongoose'),
+}
+# Versioned names in the docs -> (package.json, package)
+VERSIONED = {
+    'React': ('frontend', 'react'),
+    'NestJS': ('backend', '@nestjs/core'),
+    'TypeScript': ('frontend', 'typescript'),
+    'Tailwind CSS': ('frontend', 'tailwindcss'),
+}
+DEV_SERVER_PORTS = {'react-scripts': 3000, 'vite': 5173, 'next': 3000}
+NPM_ALIASES = ('start', 'test', 'stop', 'restart')
+
+_PORT_RE = re.compile(r'process\.env\.PORT\s*(?:\|\||\?\?)\s*(\d+)|\.listen\(\s*(\d+)')
+_CALL_RE = re.compile(r'\bapi\.(get|post|put|patch|delete)\s*(?:<[^>(]*>)?\(\s*([\'"`])(.*?)\2', re.S)
+_URL_RE = re.compile(r'localhost:(\d+)(/\S*)?')
+_NPM_RE = re.compile(r'\bnpm (?:run(?:-script)? ([\w:.-]+)|(' + '|'.join(NPM_ALIASES) + r')\b)')
+_ENDPOINT_RE = re.compile(r'\b(GET|POST|PUT|PATCH|DELETE)\s+(/[\w/:.{}$-]*)')
+_PARAM_RE = re.compile(r'\$\{[^}]*\}|\{[^}]*\}|:\w+')
+
+
+def _word_re(name):
+    return re.compile(rf'(?<![\w.-]){re.escape(name)}(?![\w-])', re.I)
+
+
+_MENTIONS = {name: _word_re(name) for name in (*DATABASES, *ORMS)}
+_VERSIONS = {name: re.compile(rf'\b{re.escape(name)}\s+v?(\d+)(?:\.(?:\d+|x))*\b') for name in VERSIONED}
+
+
+def normalize_route(path):
+    """``/api/events/${id}?x=1`` and ``/api/events/:eventId`` both to ``/api/events/:``"""
+    path = _PARAM_RE.sub(':', path.split('?', 1)[0])
+    return '/' + path.strip('/')
+
+
+def _route_matches(path, route):
+    a, b = path.split('/'), route.split('/')
+    return len(a) == len(b) and all(x == y or ':' in (x, y) for x, y in zip(a, b))
+
+
+# Per-file fact extractors; each returns JSON-serializable facts
+
+def package_facts(text):
+    data = json.loads(text)
+    return {
+        'dependencies': {**data.get('devDependencies', {}), **data.get('dependencies', {})},
+        'scripts': data.get('scripts', {}),
+    }
+
+
+def main_facts(text):
+    match = _PORT_RE.search(text)
+    return {'port': int(match.group(1) or match.group(2)) if match else None}
+
+
+def service_facts(text):
+    calls = []
+    for match in _CALL_RE.finditer(text):
+        line = text.count('\n', 0, match.start()) + 1
+        path = match.group(3)
+        calls.append([match.group(1).upper(), normalize_route(path), line, path])
+    return {'calls': calls}
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _scan(path, relpath, known, extract):
+    """Re-hash one file and re-extract its facts only when its content changed"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if known and known['sha'] == digest:
+        return dict(known, stamp=_stamp(path))
+    return {'sha': digest, 'stamp': _stamp(path), 'facts': extract(data.decode('utf-8'))}
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def load_facts(backend_src=BACKEND_SRC, cache_dir=CACHE_DIR, workers=None):
+    """
+    The fact index: ``'files'`` maps the package files, ``main.ts`` and the
+    frontend services to their facts, ``'routes'`` holds the controllers'
+    ``(method, path)`` pairs with the global ``'prefix'``.
+    """
+    from .routes import global_prefix, load_route_index
+
+    index_file = os.path.join(cache_dir, 'consistency', 'index.json')
+    try:
+        with open(index_file, encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != CHECK_VERSION:
+            raise ValueError('stale fact index')
+    except (FileNotFoundError, ValueError):
+        index = {'version': CHECK_VERSION, 'files': {}}
+
+    sources = [(BACKEND_PACKAGE, package_facts), (FRONTEND_PACKAGE, package_facts),
+               (os.path.join(backend_src, 'main.ts'), main_facts)]
+    sources += [(path, service_facts) for path in sorted(glob.glob(SERVICES_GLOB))]
+    entries = {}
+    todo = []
+    for path, extract in sources:
+        if not os.path.exists(path):
+            continue
+        relpath = os.path.relpath(path, REPO_ROOT).replace(os.sep, '/')
+        known = index['files'].get(relpath)
+        if known and known['stamp'] == _stamp(path):
+            entries[relpath] = known
+        else:
+            todo.append((path, relpath, known, extract))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # The controllers go through the route index, which has its own cache
+        routes = pool.submit(load_route_index, backend_src, cache_dir, workers)
+        for (path, relpath, known, extract), entry in zip(todo, pool.map(lambda job: _scan(*job), todo)):
+            entries[relpath] = entry
+        routes, _ = routes.result()
+
+    if todo or set(entries) != set(index['files']):
+        index['files'] = entries
+        _write_json(index_file, index)
+
+    prefix = global_prefix(backend_src)
+    return {
+        'files': {relpath: entry['facts'] for relpath, entry in sorted(entries.items())},
+        'prefix': prefix,
+        'routes': sorted({(r.method, normalize_route(prefix + r.path)) for r in routes}),
+    }
+
+
+def _package(facts, side):
+    return facts['files'].get(f'{side}/package.json', {'dependencies': {}, 'scripts': {}})
+
+
+def _using(table, dependencies):
+    """Entries of ``DATABASES``/``ORMS`` whose packages are dependencies"""
+    return {name: [p for p in packages if p in dependencies] for name, packages in table.items()
+            if any(p in dependencies for p in packages)}
+
+
+def _dev_server_port(package):
+    start = package['scripts'].get('start', '')
+    match = re.search(r'\bPORT=(\d+)', start)
+    if match:
+        return int(match.group(1))
+    return next((port for tool, port in DEV_SERVER_PORTS.items() if tool in start), None)
+
+
+def section_texts(section):
+    """Every piece of text ``section`` renders"""
+    stack = list(reversed(section.children))
+    while stack:
+        node = stack.pop()
+        if node.type == 'heading':
+            yield node.text
+        elif node.type == 'paragraph':
+            yield ''.join(r.text for r in node.runs if r.text)
+        elif node.type in ('list', 'code'):
+            yield from (line for line in (node.items if node.type == 'list' else node.lines) if line)
+        elif node.type == 'table':
+            yield from node.columns
+            # Streamed rows are export data, not statements about the code
+            if isinstance(node.rows, list):
+                yield from (str(value) for row in node.rows for value in row)
+        elif node.type == 'entries':
+            yield from (str(item.get(key, '')) for item in node.items for _, key in node.fields)
+        elif node.type == 'figure' and node.caption:
+            yield node.caption
+        stack.extend(reversed(getattr(node, 'children', ())))
+
+
+def check_text(text, facts):
+    """Yield ``(kind, expected, source)`` for each statement in ``text`` the facts contradict"""
+    backend, frontend = _package(facts, 'backend'), _package(facts, 'frontend')
+    deps = backend['dependencies']
+    for kind, table in (('database', DATABASES), ('orm', ORMS)):
+        using = _using(table, deps)
+        for name in table:
+            if name not in using and _MENTIONS[name].search(text):
+                actual = '; '.join(f'{n} ({", ".join(p)})' for n, p in using.items()) or f'no {kind} package'
+                yield kind, f'{name} is not a dependency; the backend uses {actual}', 'backend/package.json'
+
+    for name, (side, package) in VERSIONED.items():
+        for match in _VERSIONS[name].finditer(text):
+            version = (backend if side == 'backend' else frontend)['dependencies'].get(package)
+            major = re.search(r'\d+', version or '')
+            if major and major.group() != match.group(1):
+                yield 'version', f'{package} {version}', f'{side}/package.json'
+
+    for match in _URL_RE.finditer(text):
+        lower = text.lower()
+        if 'backend' in lower or (match.group(2) or '').startswith('/api'):
+            port, source = facts['files'].get('backend/src/main.ts', {}).get('port'), 'backend/src/main.ts'
+        elif 'frontend' in lower or 'browser' in lower:
+            port, source = _dev_server_port(frontend), 'frontend/package.json'
+        else:
+            continue
+        if port is not None and int(match.group(1)) != port:
+            yield 'port', f'port {port}', source
+
+    for match in _NPM_RE.finditer(text):
+        script = match.group(1) or match.group(2)
+        if script not in backend['scripts'] and script not in frontend['scripts']:
+            yield 'script', f'no "{script}" script', 'backend/package.json, frontend/package.json'
+
+    routes = facts['routes']
+    for match in _ENDPOINT_RE.finditer(text):
+        # A full stop after the path ends the sentence, it is not part of the path
+        method, written = match.group(1), match.group(2).rstrip('.')
+        path = normalize_route(written)
+        if not path.startswith(facts['prefix'] or '/'):
+            path = normalize_route(facts['prefix'] + path)
+        if not any(m == method and _route_matches(path, r) for m, r in routes):
+            yield 'endpoint', f'no {method} {written} route', 'backend/src/**/*.controller.ts'
+
+
+def check_section(section, facts):
+    findings = []
+    seen = set()
+    for text in section_texts(section):
+        for kind, expected, source in check_text(text, facts):
+            if (text, kind, expected) not in seen:
+                seen.add((text, kind, expected))
+                findings.append(Finding(section.name, kind, text, expected, source))
+    return findings
+
+
+def check_services(facts):
+    """Frontend API calls without a matching backend route"""
+    findings = []
+    for relpath, file_facts in facts['files'].items():
+        for method, path, line, written in file_facts.get('calls', ()):
+            if not any(m == method and _route_matches(path, r) for m, r in facts['routes']):
+                findings.append(Finding(
+                    relpath, 'endpoint', f'{method} {written}', 'no matching controller route', f'{relpath}:{line}',
+                ))
+    return findings
+
+
+def check_document(document, cache_dir=CACHE_DIR, workers=None, context=None, backend_src=BACKEND_SRC):
+    """Return the ``Finding``s for ``document`` (its table sources are resolved first)"""
+    from .cache import section_key
+    from .providers import resolve_sources
+
+    resolve_sources(document, context, cache_dir)
+    facts = load_facts(backend_src, cache_dir, workers)
+    salt = f'{CHECK_VERSION}:' + hashlib.sha256(json.dumps(facts, sort_keys=True).encode()).hexdigest()
+
+    results_file = os.path.join(cache_dir, 'consistency', 'results.json')
+    try:
+        with open(results_file, encoding='utf-8') as f:
+            cached = json.load(f)
+    except (FileNotFoundError, ValueError):
+        cached = {}
+
+    results = {}
+    findings = check_services(facts)
+    for section in document.sections:
+        key = section_key(section, salt)
+        if key in cached:
+            section_findings = [Finding(*f) for f in cached[key]]
+        else:
+            section_findings = check_section(section, facts)
+        results[key] = section_findings
+        findings.extend(section_findings)
+
+    if set(results) != set(cached):
+        _write_json(results_file, results)
+    return findings
+
+
+def format_findings(findings):
+    lines = [f'{len(findings)} statement(s) disagree with the code:']
+    for f in findings:
+        lines.append(f'  [{f.section}] {f.kind}: "{f.claim}"')
+        lines.append(f'      {f.expected} ({f.source})')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    from .model import CONTENT_PATH, load_document
+
+    parser = argparse.ArgumentParser(description='Check the documentation content against the code.')
+    parser.add_argument('--content', default=CONTENT_PATH, help='document content (default docgen/content/report.json)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='cache directory (default .docgen-cache)')
+    parser.add_argument('--workers', type=int, help='threads for reading source files')
+    args = parser.parse_args(argv)
+
+    findings = check_document(load_document(args.content), args.cache_dir, args.workers)
+    if findings:
+        print(format_findings(findings))
+        return 1
+    print('Documentation is consistent with the code')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""
+Offline dependency check.
+
+Nothing is installed at run time: build containers have no network access,
+so missing packages are reported up front instead of half-way through a
+build.
+"""
+
+import importlib.util
+
+# import name -> distribution name
+REQUIRED = {'docx': 'python-docx', 'lxml': 'lxml'}
+
+
+def missing(modules=REQUIRED):
+    """Distribution names of the ``modules`` that cannot be imported"""
+    return [package for module, package in modules.items() if importlib.util.find_spec(module) is None]
+
+
+def check_dependencies(modules=REQUIRED):
+    """Raise ``RuntimeError`` naming every required package that is not installed"""
+    absent = missing(modules)
+    if absent:
+        raise RuntimeError(f'Missing required package(s): {", ".join(absent)}. '
+                           f'Install with: pip install {" ".join(absent)}')
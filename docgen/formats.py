@@ -0,0 +1,95 @@
+"""
+Several output formats from one in-memory document.
+
+``build_formats`` resolves table sources once and lays the document out
+once (``Layout``), then runs the writers concurrently, one thread each:
+the .docx builder (or the streaming backend), HTML and Markdown. The
+writers only read the model, and streamed attendee rows are re-read per
+writer, so nothing is shared mutably between threads.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import FragmentCache
+from .html_writer import write_html
+from .layout import Layout
+from .markdown_writer import write_markdown
+from .providers import resolve_sources
+
+FORMATS = {'docx': '.docx', 'html': '.html', 'md': '.md'}
+
+
+def output_paths(output_path, formats):
+    """``{format: path}`` sharing ``output_path``'s name, with each format's extension"""
+    stem, ext = os.path.splitext(output_path)
+    if ext.lower() not in FORMATS.values():
+        stem = output_path
+    return {fmt: stem + FORMATS[fmt] for fmt in formats}
+
+
+def _docx_writer(backend):
+    if backend == 'stream':
+        from .stream import stream_document
+        return stream_document
+    from .build import build_document
+    return build_document
+
+
+def build_formats(outputs, document, cache=None, force=False, context=None, prune=True, backend='docx',
+                  tracer=None):
+    """
+    Write ``document`` to every ``{format: path}`` in ``outputs``.
+
+    Returns ``{format: result}``: the rendered section names for docx (as
+    ``build_document`` returns them), the output path for the others. With
+    a single format the tracer follows the writer into its sections; with
+    several, only the shared steps and the concurrent writes are traced.
+    """
+    unknown = set(outputs) - set(FORMATS)
+    if unknown:
+        raise ValueError(f'Unknown output format: {", ".join(sorted(unknown))}')
+    if cache is None:
+        cache = FragmentCache()
+    if set(outputs) == {'docx'}:
+        return {'docx': _docx_writer(backend)(outputs['docx'], document, cache, force, context, prune, tracer)}
+    cache_dir = os.path.dirname(cache.path)
+
+    if tracer is None:
+        resolve_sources(document, context, cache_dir)
+        layout = Layout(document)
+    else:
+        with tracer.span('resolve sources'):
+            resolve_sources(document, context, cache_dir)
+        with tracer.span('layout'):
+            layout = Layout(document)
+
+    # Streamed rows set up their sources here, once, not in every writer thread
+    for node in document.walk():
+        prepare = getattr(getattr(node, 'rows', None), 'prepare', None)
+        if prepare is not None:
+            prepare()
+
+    writer_tracer = tracer if len(outputs) == 1 else None
+    jobs = {}
+    for fmt, path in outputs.items():
+        if fmt == 'docx':
+            jobs[fmt] = (_docx_writer(backend), (path, document, cache, force, context, prune, writer_tracer))
+        elif fmt == 'html':
+            jobs[fmt] = (write_html, (path, document, layout, cache_dir))
+        else:
+            jobs[fmt] = (write_markdown, (path, document, layout, cache_dir))
+
+    if len(jobs) == 1:
+        (fmt, (func, args)), = jobs.items()
+        return {fmt: func(*args)}
+    if tracer is None:
+        return _run_concurrently(jobs)
+    with tracer.span(f'write {" ".join(outputs)}', 'io'):
+        return _run_concurrently(jobs)
+
+
+def _run_concurrently(jobs):
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {fmt: pool.submit(func, *args) for fmt, (func, args) in jobs.items()}
+        return {fmt: future.result() for fmt, future in futures.items()}
@@ -0,0 +1,187 @@
+"""
+HTML writer for the document model.
+
+Writes one self-contained page with print styles (A4 pages, page breaks,
+repeated table headers), so the HTML doubles as the source for a PDF via
+any browser's "Save as PDF". Screenshots are copied next to the page into
+``<name>_files/``.
+"""
+
+import os
+from html import escape
+
+from .layout import ENTRY_LEVEL, MUTED_COLOR, Layout
+from .paths import CACHE_DIR
+from .screenshots import EMU_PER_INCH, assets_path, export_images
+
+CSS = '''
+body { font-family: Calibri, Carlito, "Segoe UI", sans-serif; font-size: 11pt; line-height: 1.4;
+       max-width: 46em; margin: 2em auto; padding: 0 1em; color: #111827; }
+h1 { font-size: 26pt; font-weight: normal; border-bottom: 1px solid #4F81BD; padding-bottom: .2em; }
+h2, h3, h4, h5, h6 { color: #365F91; }
+ul { padding-left: 1.5em; }
+pre { font-family: "Courier New", monospace; font-size: 10pt; margin: .5em 0; white-space: pre-wrap; }
+table { border-collapse: collapse; width: 100%; margin: .5em 0; font-size: 10pt; }
+th, td { border: 1px solid #7BA0CD; padding: .2em .4em; text-align: left; vertical-align: top; }
+th { background: #4F81BD; color: #FFFFFF; }
+tbody tr:nth-child(odd) { background: #D3DFEE; }
+figure { margin: .5em 0; text-align: center; }
+figure img { max-width: 100%; height: auto; }
+figcaption { color: #6B7280; font-style: italic; }
+.spacer { height: 1em; }
+.page-break { break-after: page; }
+@page { size: A4; margin: 2.5cm; }
+@media print {
+  body { max-width: none; margin: 0; padding: 0; }
+  thead { display: table-header-group; }
+  tr, figure, h1, h2, h3, h4 { break-inside: avoid; }
+  h1, h2, h3, h4 { break-after: avoid; }
+}
+'''
+
+
+def _style_attr(props):
+    props = [p for p in props if p]
+    return f' style="{"; ".join(props)}"' if props else ''
+
+
+def _text(text):
+    return escape(text, quote=False).replace('\t', '&emsp;').replace('\n', '<br>')
+
+
+def _span(text, bold=None, italic=None, size=None, color=None, font=None):
+    html = _text(text)
+    style = _style_attr([
+        f'color: #{color}' if color else None,
+        f'font-size: {size}pt' if size else None,
+        f'font-family: {escape(font)}' if font else None,
+        'font-weight: normal' if bold is False else None,
+        'font-style: normal' if italic is False else None,
+    ])
+    if style:
+        html = f'<span{style}>{html}</span>'
+    if bold:
+        html = f'<strong>{html}</strong>'
+    if italic:
+        html = f'<em>{html}</em>'
+    return html
+
+
+class HtmlWriter:
+    """Writes model sections as HTML to a text stream"""
+
+    def __init__(self, out, layout, assets_dir='.'):
+        self.out = out
+        self.layout = layout
+        self.assets_dir = assets_dir
+        # Processed image files referenced so far, for export_images
+        self.images = []
+        self._handlers = {
+            'heading': self._heading,
+            'paragraph': self._paragraph,
+            'list': self._list,
+            'code': self._code,
+            'table': self._table,
+            'entries': self._entries,
+            'figure': self._figure,
+            'spacer': self._spacer,
+            'page_break': self._page_break,
+            'group': self._group,
+        }
+
+    def write(self, document):
+        title = escape(document.title or '')
+        self.out.write(
+            f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n<title>{title}</title>\n'
+            f'<style>{CSS}</style>\n</head>\n<body>\n'
+        )
+        for section in document.sections:
+            self.out.write(f'<section id="{escape(section.name)}">\n')
+            self._group(section)
+            self.out.write('</section>\n')
+        self.out.write('</body>\n</html>\n')
+
+    def _group(self, node):
+        for child in node.children:
+            self._handlers[child.type](child)
+
+    def _heading(self, node):
+        level = self.layout.heading_level(node)
+        style = _style_attr([
+            f'text-align: {node.align}' if node.align else None,
+            f'color: #{self.layout.color(node.color)}' if node.color else None,
+        ])
+        self.out.write(f'<h{level} id="{self.layout.anchor(node)}"{style}>{_text(node.text)}</h{level}>\n')
+
+    def _paragraph(self, node):
+        runs = ''.join(
+            _span(r.text, r.bold, r.italic, r.size, self.layout.color(r.color), r.font) for r in node.runs if r.text
+        )
+        style = _style_attr([f'text-align: {node.align}' if node.align else None])
+        self.out.write(f'<p{style}>{runs}</p>\n')
+
+    def _list(self, node):
+        items = ''.join(f'<li>{_text(item)}</li>\n' for item in node.items if item)
+        self.out.write(f'<ul>\n{items}</ul>\n')
+
+    def _code(self, node):
+        style = _style_attr([f'color: #{self.layout.color(node.color)}' if node.color else None])
+        self.out.write(f'<pre{style}>{escape(chr(10).join(node.lines), quote=False)}</pre>\n')
+
+    def _table(self, node):
+        header, rows = self.layout.table(node)
+        write = self.out.write
+        write('<table>\n<thead><tr>')
+        write(''.join(f'<th>{_text(cell)}</th>' for cell in header))
+        write('</tr></thead>\n<tbody>\n')
+        for row in rows:
+            write(f'<tr>{"".join(f"<td>{_text(cell)}</td>" for cell in row)}</tr>\n')
+        write('</tbody>\n</table>\n')
+
+    def _entries(self, node):
+        for i, item in enumerate(node.items, 1):
+            title = f'{i}. {item["name"]}'
+            self.out.write(f'<h{ENTRY_LEVEL}>{_text(title)}</h{ENTRY_LEVEL}>\n')
+            for label, key in node.fields:
+                self.out.write(f'<p><strong>{_text(label)}</strong>{_text(item[key])}</p>\n')
+            if 'image' in item:
+                self._picture(item['image'], item['name'])
+            elif node.placeholder:
+                self.out.write(f'<p>{_span(node.placeholder.format(**item), italic=True, color=MUTED_COLOR)}</p>\n')
+
+    def _figure(self, node):
+        self._picture(node.image, node.caption or '', node.caption)
+
+    def _picture(self, image, description, caption=None):
+        self.images.append(image['file'])
+        src = f'{self.assets_dir}/{image["file"]}'
+        width = round(image['width'] / EMU_PER_INCH * 96)
+        caption = f'<figcaption>{_text(caption)}</figcaption>' if caption else ''
+        self.out.write(
+            f'<figure><img src="{escape(src)}" alt="{escape(description)}" width="{width}">{caption}</figure>\n'
+        )
+
+    def _spacer(self, node):
+        self.out.write('<div class="spacer"></div>\n')
+
+    def _page_break(self, node):
+        self.out.write('<div class="page-break"></div>\n')
+
+
+def write_html(output_path, document, layout=None, cache_dir=CACHE_DIR):
+    """Write ``document`` as HTML to ``output_path``; returns the path"""
+    if layout is None:
+        layout = Layout(document)
+    assets_dir = assets_path(output_path)
+    tmp = f'{output_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'w', encoding='utf-8') as out:
+            writer = HtmlWriter(out, layout, os.path.basename(assets_dir))
+            writer.write(document)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, output_path)
+    export_images(writer.images, assets_dir, cache_dir)
+    return output_path
@@ -0,0 +1,176 @@
+"""
+Endpoint index built from the Postman collection and the markdown API docs.
+
+The Postman collection is read whole with ``json.load`` and its request
+items are walked without recursion; the markdown docs are streamed one line
+at a time. Both are merged into a single index deduplicated by method and
+path, cached on disk keyed by each source file's mtime and size, so
+unchanged sources are never re-parsed.
+"""
+
+import json
+import os
+import re
+from collections import namedtuple
+
+from .paths import API_DOCS, CACHE_DIR, POSTMAN_COLLECTION
+
+Endpoint = namedtuple('Endpoint', 'method path purpose auth')
+
+INDEX_VERSION = 1
+API_PREFIX = '/api'
+
+_VAR_RE = re.compile(r'\{\{(\w+)\}\}')
+_ENDPOINT_RE = re.compile(r'^\*\*Endpoint:\*\*\s*`(\w+)\s+([^`\s]+)`')
+_HEADER_AUTH_RE = re.compile(r'Authorization:\s*Bearer\s*<(\w*?)_?token>', re.I)
+_ONLY_RE = re.compile(r'\(([\w/ ]+) only\)', re.I)
+
+
+def _camel(name):
+    head, *rest = name.split('_')
+    return head + ''.join(part.title() for part in rest)
+
+
+def normalize_path(path):
+    """Strip the base URL/query and turn ``{{event_id}}`` into ``:eventId``"""
+    path = path.replace('{{base_url}}', '').split('?', 1)[0]
+    path = _VAR_RE.sub(lambda m: ':' + _camel(m.group(1)), path)
+    return '/' + path.strip('/')
+
+
+def route_key(method, path):
+    """Dedup key: method plus path with parameter names erased"""
+    return method.upper(), re.sub(r':\w+', ':param', path.rstrip('/') or '/')
+
+
+def auth_label(token=None, roles=None):
+    """``Yes``/``No`` with the required role when one is known"""
+    if roles:
+        return f'Yes ({roles})'
+    if token is None:
+        return 'No'
+    role = token.lower()
+    if role in ('admin', 'organizer'):
+        return f'Yes ({role.title()})'
+    return 'Yes'
+
+
+def iter_postman(path=POSTMAN_COLLECTION):
+    """Yield an ``Endpoint`` per request in a Postman v2 collection"""
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+
+    stack = list(reversed(collection.get('item', [])))
+    while stack:
+        item = stack.pop()
+        if 'item' in item:
+            stack.extend(reversed(item['item']))
+            continue
+        request = item.get('request') or {}
+        url = request.get('url')
+        raw = url.get('raw', '') if isinstance(url, dict) else (url or '')
+        token = None
+        for header in request.get('header', []):
+            if header.get('key', '').lower() == 'authorization':
+                match = _VAR_RE.search(header.get('value', ''))
+                token = match.group(1).rsplit('_token', 1)[0] if match else ''
+        if request.get('auth') and token is None:
+            token = ''
+        yield Endpoint(request.get('method', 'GET').upper(), normalize_path(raw), item.get('name', ''), auth_label(token))
+
+
+def iter_markdown(path=API_DOCS):
+    """Yield an ``Endpoint`` per ``**Endpoint:**`` block in the API reference"""
+    title = description = None
+    current = None
+
+    def finish():
+        if current is None:
+            return None
+        method, route, token = current
+        only = _ONLY_RE.search(description or '')
+        return Endpoint(method, route, title or '', auth_label(token, only.group(1) if only and token is not None else None))
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('#'):
+                done = finish()
+                if done:
+                    yield done
+                current = None
+                title = line.lstrip('#').strip() if line.startswith('### ') else None
+                description = None
+                continue
+            if current is None and title and description is None and line and not line.startswith('**'):
+                description = line
+            match = _ENDPOINT_RE.match(line)
+            if match:
+                current = [match.group(1).upper(), normalize_path(match.group(2)), None]
+                continue
+            if current is not None:
+                auth = _HEADER_AUTH_RE.search(line)
+                if auth:
+                    current[2] = auth.group(1)
+        done = finish()
+        if done:
+            yield done
+
+
+def merge(*sources):
+    """
+    Merge endpoint streams, first source wins.
+
+    Later sources only fill in endpoints the earlier ones lack and upgrade an
+    unknown auth requirement.
+    """
+    index = {}
+    for source in sources:
+        for endpoint in source:
+            key = route_key(endpoint.method, endpoint.path)
+            known = index.get(key)
+            if known is None:
+                index[key] = endpoint
+            elif known.auth == 'No' and endpoint.auth != 'No':
+                index[key] = known._replace(auth=endpoint.auth)
+    return list(index.values())
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def load_endpoint_index(sources=(API_DOCS, POSTMAN_COLLECTION), cache_dir=CACHE_DIR):
+    """
+    Return the merged endpoint index, re-parsing only when a source changed.
+
+    Markdown sources are parsed with ``iter_markdown`` and JSON sources with
+    ``iter_postman``; the markdown reference comes first so its paths and
+    titles win.
+    """
+    stamps = {os.path.abspath(p): _stamp(p) for p in sources}
+    cache_file = os.path.join(cache_dir, 'ingest', 'endpoints.json')
+    try:
+        with open(cache_file, encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['version'] == INDEX_VERSION and cached['sources'] == stamps:
+            return [Endpoint(*e) for e in cached['endpoints']]
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+
+    parsers = [iter_markdown(p) if p.endswith('.md') else iter_postman(p) for p in sources]
+    endpoints = merge(*parsers)
+
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp = f'{cache_file}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': INDEX_VERSION, 'sources': stamps, 'endpoints': endpoints}, f)
+    os.replace(tmp, cache_file)
+    return endpoints
+
+
+def endpoint_rows(endpoints, prefix=API_PREFIX):
+    """Rows for the API Integration table"""
+    for e in endpoints:
+        yield (f'{e.method} {prefix}{e.path}', e.method, e.purpose, e.auth)
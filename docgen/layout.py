@@ -0,0 +1,65 @@
+"""
+Formatting decisions shared by the text-based writers (HTML, Markdown).
+
+A ``Layout`` is resolved once per document, before any writer starts:
+heading levels and unique anchors, colors, and table cells normalized to
+strings. Tables with in-memory rows are laid out once for every writer;
+streamed rows (``StreamRows``) stay lazy and are normalized as each writer
+reads them.
+"""
+
+import re
+
+from .wml import color_hex
+
+MUTED_COLOR = '6B7280'
+# Entries are numbered 'Heading 2' paragraphs in the .docx
+ENTRY_LEVEL = 3
+
+
+def cell_text(value):
+    return '' if value is None else str(value)
+
+
+def _normalized(rows):
+    for row in rows:
+        yield tuple(cell_text(value) for value in row)
+
+
+class Layout:
+    def __init__(self, document):
+        self.title = document.title
+        self._anchors = {}
+        self._tables = {}
+        seen = {}
+        for node in document.walk():
+            if node.type == 'heading':
+                base = re.sub(r'[^a-z0-9]+', '-', node.text.lower()).strip('-') or 'section'
+                count = seen.get(base, 0)
+                seen[base] = count + 1
+                self._anchors[id(node)] = base if not count else f'{base}-{count}'
+            elif node.type == 'table':
+                header = tuple(cell_text(c) for c in node.columns)
+                rows = node.rows or ()
+                if isinstance(rows, (list, tuple)):
+                    rows = list(_normalized(rows))
+                self._tables[id(node)] = (header, rows)
+
+    def anchor(self, heading):
+        return self._anchors[id(heading)]
+
+    @staticmethod
+    def heading_level(heading):
+        """Title is level 1, 'Heading N' is level N + 1"""
+        return min(heading.level + 1, 6)
+
+    def table(self, node):
+        """``(header, rows)`` with every cell as a string"""
+        header, rows = self._tables[id(node)]
+        if isinstance(rows, list):
+            return header, rows
+        return header, _normalized(rows)
+
+    @staticmethod
+    def color(color):
+        return color_hex(color) if color else None
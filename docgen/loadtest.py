@@ -0,0 +1,494 @@
+"""
+Load generator for the API endpoints in the Postman collection.
+
+Every request in the collection becomes a scenario with its method, path,
+headers and body, and ``{{variables}}`` filled in. A pool of asyncio
+workers sends a weighted mix of scenarios over a fixed number of pooled
+keep-alive connections and records per-request latency. Without
+``--target`` the requests go to an in-process stand-in server that answers
+every scenario with a canned JSON body. That tests the harness offline; it
+says nothing about the API itself. Against a ``--target`` only the GET
+scenarios run unless ``--mix`` names others, so a default run never
+creates or changes records in a real API.
+
+    python -m docgen.loadtest                                   # stand-in server, 10 s
+    python -m docgen.loadtest --target http://localhost:3000/api \\
+        --concurrency 200 --connections 50 --mix "Scan QR Code=10" "Get All Events=5"
+
+Results are written as JSON (``reports/loadtest.json`` by default), which
+``generate_documentation.py --load-results`` turns into a Performance
+section.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from array import array
+from collections import namedtuple
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from .analytics import percentile
+from .model import Heading, PageBreak, Paragraph, Section, Table
+from .paths import POSTMAN_COLLECTION, REPO_ROOT
+
+RESULTS_VERSION = 1
+RESULTS_PATH = os.path.join(REPO_ROOT, 'reports', 'loadtest.json')
+PERCENTILES = (50, 95, 99)
+STAND_IN = 'stand-in'
+
+# Used where the collection leaves a variable empty (tokens, ids captured at runtime)
+DEFAULT_VARIABLES = {
+    'admin_token': 'load-test', 'organizer_token': 'load-test', 'attendee_token': 'load-test',
+    'event_id': '1', 'registration_id': '1', 'userId': '1',
+}
+
+_VAR_RE = re.compile(r'\{\{(\w+)\}\}')
+_PARAM_RE = re.compile(r'(?<=/):(\w+)')
+
+Scenario = namedtuple('Scenario', 'name method path headers body')
+EndpointResult = namedtuple('EndpointResult', 'name method path requests errors rps p50_ms p95_ms p99_ms')
+
+
+def _substitute(text, variables):
+    return _VAR_RE.sub(lambda m: variables.get(m.group(1)) or DEFAULT_VARIABLES.get(m.group(1), ''), text)
+
+
+def load_scenarios(path=POSTMAN_COLLECTION, variables=None):
+    """One ``Scenario`` per request in a Postman v2 collection"""
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+    values = {v['key']: v.get('value', '') for v in collection.get('variable', [])}
+    values.update(variables or {})
+    values['base_url'] = ''
+
+    scenarios = []
+    stack = list(reversed(collection.get('item', [])))
+    while stack:
+        item = stack.pop()
+        if 'item' in item:
+            stack.extend(reversed(item['item']))
+            continue
+        request = item.get('request') or {}
+        url = request.get('url')
+        raw = url.get('raw', '') if isinstance(url, dict) else (url or '')
+        target = _substitute(raw, values)
+        target = _PARAM_RE.sub(lambda m: values.get(m.group(1)) or DEFAULT_VARIABLES.get(m.group(1), '1'), target)
+        headers = tuple(
+            (h['key'], _substitute(h.get('value', ''), values))
+            for h in request.get('header', []) if not h.get('disabled')
+        )
+        body = (request.get('body') or {}).get('raw', '')
+        scenarios.append(Scenario(
+            item.get('name', ''), request.get('method', 'GET').upper(), '/' + target.lstrip('/'), headers,
+            _substitute(body, values).encode('utf-8'),
+        ))
+    return scenarios
+
+
+def parse_mix(specs, scenarios, read_only=False):
+    """
+    Weights from ``NAME=WEIGHT`` specs, where NAME is a scenario name or
+    ``"METHOD /path"``. Without specs every non-DELETE scenario gets weight 1,
+    or with ``read_only`` every GET scenario.
+    """
+    if not specs:
+        if read_only:
+            return [1 if s.method == 'GET' else 0 for s in scenarios]
+        return [0 if s.method == 'DELETE' else 1 for s in scenarios]
+    weights = [0] * len(scenarios)
+    for spec in specs:
+        name, sep, weight = spec.rpartition('=')
+        if not sep:
+            name, weight = spec, '1'
+        name = name.strip().lower()
+        matches = [
+            i for i, s in enumerate(scenarios)
+            if name in (s.name.lower(), f'{s.method} {s.path}'.lower())
+        ]
+        if not matches:
+            raise ValueError(f'No scenario named {name!r} in the collection')
+        for i in matches:
+            weights[i] = float(weight)
+    return weights
+
+
+def request_bytes(scenario, host, prefix=''):
+    """The full HTTP/1.1 request, built once per scenario"""
+    lines = [f'{scenario.method} {prefix}{scenario.path} HTTP/1.1', f'Host: {host}', 'Connection: keep-alive']
+    lines.extend(f'{key}: {value}' for key, value in scenario.headers if key.lower() not in ('host', 'connection'))
+    if scenario.body or scenario.method in ('POST', 'PUT', 'PATCH'):
+        lines.append(f'Content-Length: {len(scenario.body)}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + scenario.body
+
+
+async def read_response(reader):
+    """Read one response; returns ``(status, keep_alive)``"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed by server')
+    version, status = status_line.split(None, 2)[:2]
+    keep_alive = version != b'HTTP/1.0'
+    length = None
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.partition(b':')
+        name = name.strip().lower()
+        value = value.strip().lower()
+        if name == b'content-length':
+            length = int(value)
+        elif name == b'transfer-encoding':
+            chunked = b'chunked' in value
+        elif name == b'connection':
+            keep_alive = value == b'keep-alive' if version == b'HTTP/1.0' else value != b'close'
+    status = int(status)
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            await reader.readexactly(size + 2)
+    elif length is not None:
+        await reader.readexactly(length)
+    elif status >= 200 and status not in (204, 304):
+        await reader.read()
+        keep_alive = False
+    return status, keep_alive
+
+
+class ConnectionPool:
+    """At most ``size`` keep-alive connections, shared by any number of workers"""
+
+    def __init__(self, host, port, size, ssl=None):
+        self.host = host
+        self.port = port
+        self.ssl = ssl
+        self.opened = 0
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connect(self):
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    async def request(self, payload):
+        """Send a prebuilt request and read the response; returns the status"""
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            while True:
+                fresh = conn is None
+                if fresh:
+                    conn = await self._connect()
+                try:
+                    status, keep_alive = await self._exchange(conn, payload)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn[1].close()
+                    if fresh:
+                        raise
+                    # The server may have closed the idle keep-alive connection; retry on a fresh one
+                    conn = None
+                except BaseException:
+                    conn[1].close()
+                    raise
+            if keep_alive:
+                self._idle.append(conn)
+            else:
+                conn[1].close()
+            return status
+
+    @staticmethod
+    async def _exchange(conn, payload):
+        reader, writer = conn
+        writer.write(payload)
+        await writer.drain()
+        return await read_response(reader)
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+class StandInServer:
+    """
+    Minimal keep-alive HTTP server answering the given scenarios with a
+    canned JSON body (404 for anything else), after ``delay`` seconds.
+    """
+
+    def __init__(self, scenarios, delay=0.0):
+        self.routes = {(s.method, s.path) for s in scenarios}
+        self.delay = delay
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=0):
+        self.server = await asyncio.start_server(self._serve, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target = request_line.decode('latin-1').split()[:2]
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.partition(b':')
+                    if name.strip().lower() == b'content-length':
+                        length = int(value)
+                if length:
+                    await reader.readexactly(length)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                if (method, target) in self.routes:
+                    status = '201 Created' if method == 'POST' else '200 OK'
+                    body = b'{"success":true,"data":{}}'
+                else:
+                    status, body = '404 Not Found', b'{"success":false,"message":"Not found"}'
+                writer.write(
+                    f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\n'
+                    f'Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n'.encode() + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def run_load(scenarios, weights, target=None, concurrency=50, connections=20, duration=10.0, requests=None,
+                   server_delay=0.0, seed=None):
+    """
+    Run the load test and return its results dict.
+
+    ``target`` is a base URL (a path in it prefixes every request); without
+    it a ``StandInServer`` is started in this event loop. The run lasts
+    ``duration`` seconds, or until ``requests`` requests have completed.
+    """
+    stand_in = None
+    if target is None:
+        stand_in = StandInServer(scenarios, server_delay)
+        host, port = await stand_in.start()
+        ssl, prefix = None, ''
+    else:
+        url = urlsplit(target)
+        host, port = url.hostname, url.port or (443 if url.scheme == 'https' else 80)
+        ssl, prefix = (url.scheme == 'https') or None, url.path.rstrip('/')
+
+    chosen = [i for i, w in enumerate(weights) if w > 0]
+    if not chosen:
+        raise ValueError('The request mix selects no scenarios')
+    host_header = host if port in (80, 443) else f'{host}:{port}'
+    payloads = [request_bytes(scenarios[i], host_header, prefix) for i in chosen]
+    cum_weights = []
+    total = 0
+    for i in chosen:
+        total += weights[i]
+        cum_weights.append(total)
+
+    latencies = [array('d') for _ in chosen]
+    sent = [0] * len(chosen)
+    errors = [0] * len(chosen)
+    failures = {}
+    rng = random.Random(seed)
+    pool = ConnectionPool(host, port, connections, ssl)
+    remaining = [requests]
+
+    start = time.perf_counter()
+    deadline = None if requests else start + duration
+
+    async def worker():
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return
+            else:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            k = rng.choices(range(len(chosen)), cum_weights=cum_weights)[0]
+            sent[k] += 1
+            t0 = time.perf_counter()
+            try:
+                status = await pool.request(payloads[k])
+            except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+                errors[k] += 1
+                failures.setdefault(type(exc).__name__, str(exc))
+                # Don't spin when the target is down
+                await asyncio.sleep(0.01)
+                continue
+            latencies[k].append((time.perf_counter() - t0) * 1000)
+            if status >= 400:
+                errors[k] += 1
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        elapsed = time.perf_counter() - start
+        await pool.close()
+        if stand_in is not None:
+            await stand_in.close()
+
+    return {
+        'version': RESULTS_VERSION,
+        'started': datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        'target': target or STAND_IN,
+        'concurrency': concurrency,
+        'connections': connections,
+        'opened_connections': pool.opened,
+        'seconds': round(elapsed, 3),
+        'failures': failures,
+        'endpoints': [
+            _summary(scenarios[i].name, scenarios[i].method, prefix + scenarios[i].path, sent[k], errors[k],
+                     latencies[k], elapsed)._asdict()
+            for k, i in enumerate(chosen)
+        ],
+        'total': _summary('All endpoints', '', '', sum(sent), sum(errors),
+                          array('d', (x for lat in latencies for x in lat)), elapsed)._asdict(),
+    }
+
+
+def _summary(name, method, path, requests, errors, latencies, elapsed):
+    """Latency percentiles over the responses received; RPS counts responses, not attempts"""
+    ordered = sorted(latencies)
+    p50, p95, p99 = (round(percentile(ordered, q), 2) if ordered else None for q in PERCENTILES)
+    rps = round(len(ordered) / elapsed, 1) if elapsed else 0.0
+    return EndpointResult(name, method, path, requests, errors, rps, p50, p95, p99)
+
+
+def write_results(results, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+    os.replace(tmp, path)
+
+
+def load_results(path=RESULTS_PATH):
+    with open(path, encoding='utf-8') as f:
+        results = json.load(f)
+    if results.get('version') != RESULTS_VERSION:
+        raise ValueError(f'{path}: unsupported load test results version {results.get("version")!r}')
+    return results
+
+
+def _ms(value):
+    return '-' if value is None else f'{value:.1f}'
+
+
+def format_results(results):
+    """Plain-text table of a results dict"""
+    rows = [*results['endpoints'], results['total']]
+    width = max(len(r['name']) for r in rows)
+    lines = [f'{"scenario":<{width}}  {"requests":>8}  {"errors":>6}  {"rps":>8}  {"p50 ms":>7}  {"p95 ms":>7}  '
+             f'{"p99 ms":>7}']
+    for r in rows:
+        lines.append(f'{r["name"]:<{width}}  {r["requests"]:>8}  {r["errors"]:>6}  {r["rps"]:>8.1f}  '
+                     f'{_ms(r["p50_ms"]):>7}  {_ms(r["p95_ms"]):>7}  {_ms(r["p99_ms"]):>7}')
+    for kind, message in results['failures'].items():
+        lines.append(f'{kind}: {message}')
+    return '\n'.join(lines)
+
+
+def performance_section(results):
+    """Build the 'Performance' model section from a results dict"""
+    stand_in = results['target'] == STAND_IN
+    target = 'the in-process stand-in server' if stand_in else results['target']
+    children = [
+        Heading('Performance'),
+        Paragraph(text=f'Load test against {target} on {results["started"][:10]}: '
+                       f'{results["concurrency"]} concurrent clients over {results["connections"]} pooled '
+                       f'connections for {results["seconds"]:.1f} s, with scenarios from the Postman collection.'),
+    ]
+    if stand_in:
+        children.append(Paragraph(text='The stand-in server answers every request with a canned response, so '
+                                       'these numbers measure the test harness, not the API.'))
+    rows = [
+        (f'{r["method"]} {r["path"]}', r['requests'], r['errors'], f'{r["rps"]:.1f}',
+         _ms(r['p50_ms']), _ms(r['p95_ms']), _ms(r['p99_ms']))
+        for r in results['endpoints']
+    ]
+    t = results['total']
+    rows.append((t['name'], t['requests'], t['errors'], f'{t["rps"]:.1f}', _ms(t['p50_ms']), _ms(t['p95_ms']),
+                 _ms(t['p99_ms'])))
+    children.append(Table(['Endpoint', 'Requests', 'Errors', 'Requests / s', 'p50 ms', 'p95 ms', 'p99 ms'], rows))
+    children.append(PageBreak())
+    return Section('performance', children)
+
+
+def add_performance(document, path=RESULTS_PATH):
+    """Insert the performance section ahead of the conclusion"""
+    section = performance_section(load_results(path))
+    names = [s.name for s in document.sections]
+    at = names.index('conclusion') if 'conclusion' in names else len(names)
+    document.sections.insert(at, section)
+    return document
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', help='base URL of a running API, e.g. http://localhost:3000/api '
+                                         '(default: in-process stand-in server); without --mix only the GET '
+                                         'requests are sent to it')
+    parser.add_argument('--collection', default=POSTMAN_COLLECTION, help='Postman v2 collection to take scenarios from')
+    parser.add_argument('--var', action='append', default=[], metavar='NAME=VALUE',
+                        help='collection variable, e.g. admin_token=... or event_id=...')
+    parser.add_argument('--mix', nargs='+', metavar='NAME=WEIGHT',
+                        help='scenario weights by request name or "METHOD /path" (default: every GET request '
+                             'with --target, every non-DELETE request against the stand-in server, equally '
+                             'weighted); name POST/PUT requests here to load a real API with writes')
+    parser.add_argument('--concurrency', type=int, default=50, help='concurrent virtual clients')
+    parser.add_argument('--connections', type=int, default=20, help='size of the keep-alive connection pool')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to run')
+    parser.add_argument('--requests', type=int, help='stop after this many requests instead of --duration')
+    parser.add_argument('--server-delay', type=float, default=0.0, metavar='MS',
+                        help='simulated service time of the stand-in server')
+    parser.add_argument('--seed', type=int, help='seed for the request mix')
+    parser.add_argument('--list', action='store_true', help='list the scenarios and exit')
+    parser.add_argument('-o', '--output', default=RESULTS_PATH, help='results JSON path')
+    args = parser.parse_args(argv)
+
+    variables = dict(v.split('=', 1) for v in args.var)
+    scenarios = load_scenarios(args.collection, variables)
+    if args.list:
+        for s in scenarios:
+            print(f'{s.method:<7} {s.path:<40} {s.name}')
+        return
+    try:
+        weights = parse_mix(args.mix, scenarios, read_only=args.target is not None)
+    except ValueError as exc:
+        parser.error(str(exc))
+    results = asyncio.run(run_load(
+        scenarios, weights, args.target, args.concurrency, args.connections, args.duration, args.requests,
+        args.server_delay / 1000, args.seed,
+    ))
+    write_results(results, args.output)
+    print(format_results(results))
+    print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Markdown (GitHub-flavored) writer for the document model.
+
+Colors, fonts, sizes, alignment and page breaks have no Markdown form and
+are dropped; everything else maps onto headings, emphasis, bullet lists,
+fenced code and pipe tables. Screenshots are copied next to the file into
+``<name>_files/``.
+"""
+
+import os
+import re
+
+from .layout import ENTRY_LEVEL, Layout
+from .paths import CACHE_DIR
+from .screenshots import assets_path, export_images
+
+# Line starts Markdown would read as block syntax
+_BLOCK_START = re.compile(r'\s*(?:[#>+\-=|]|\d+[.)])')
+_INLINE = re.compile(r'([\\`*_\[\]<>])')
+
+
+def md_text(text):
+    """Escape ``text`` so it renders literally inside a paragraph"""
+    text = _INLINE.sub(r'\\\1', text)
+    start = _BLOCK_START.match(text)
+    if start:
+        # Escape the marker's last character ('#', '-', or the '.' of '1.')
+        end = start.end() - 1
+        text = f'{text[:end]}\\{text[end:]}'
+    return text.replace('\t', '    ').replace('\n', '  \n')
+
+
+def md_cell(text):
+    return _INLINE.sub(r'\\\1', text).replace('|', '\\|').replace('\r', '').replace('\n', '<br>')
+
+
+def _emphasis(text, bold=None, italic=None):
+    text = md_text(text)
+    stripped = text.strip()
+    if not stripped or not (bold or italic):
+        return text
+    marker = ('**' if bold else '') + ('*' if italic else '')
+    # Emphasis must hug the text, so keep surrounding spaces outside it
+    lead = text[:len(text) - len(text.lstrip())]
+    trail = text[len(text.rstrip()):]
+    return f'{lead}{marker}{stripped}{marker[::-1]}{trail}'
+
+
+class MarkdownWriter:
+    """Writes model sections as Markdown to a text stream"""
+
+    def __init__(self, out, layout, assets_dir='.'):
+        self.out = out
+        self.layout = layout
+        self.assets_dir = assets_dir
+        # Processed image files referenced so far, for export_images
+        self.images = []
+        self._handlers = {
+            'heading': self._heading,
+            'paragraph': self._paragraph,
+            'list': self._list,
+            'code': self._code,
+            'table': self._table,
+            'entries': self._entries,
+            'figure': self._figure,
+            'spacer': self._spacer,
+            'page_break': self._page_break,
+            'group': self._group,
+        }
+
+    def write(self, document):
+        for section in document.sections:
+            self._group(section)
+
+    def _block(self, text):
+        self.out.write(f'{text}\n\n')
+
+    def _group(self, node):
+        for child in node.children:
+            self._handlers[child.type](child)
+
+    def _heading(self, node):
+        self._block(f'{"#" * self.layout.heading_level(node)} {md_text(node.text)}')
+
+    def _paragraph(self, node):
+        runs = ''.join(_emphasis(r.text, r.bold, r.italic) for r in node.runs if r.text)
+        if runs.strip():
+            self._block(runs)
+
+    def _list(self, node):
+        items = [f'- {md_text(item)}' for item in node.items if item]
+        if items:
+            self._block('\n'.join(items))
+
+    def _code(self, node):
+        fence = '```'
+        while any(fence in line for line in node.lines):
+            fence += '`'
+        self._block('\n'.join([fence, *node.lines, fence]))
+
+    def _table(self, node):
+        header, rows = self.layout.table(node)
+        write = self.out.write
+        write(f'| {" | ".join(md_cell(cell) for cell in header)} |\n')
+        write(f'|{"|".join(" --- " for _ in header)}|\n')
+        for row in rows:
+            write(f'| {" | ".join(md_cell(cell) for cell in row)} |\n')
+        write('\n')
+
+    def _entries(self, node):
+        for i, item in enumerate(node.items, 1):
+            title = f'{i}. {item["name"]}'
+            self._block(f'{"#" * ENTRY_LEVEL} {md_text(title)}')
+            fields = [f'**{md_text(label).strip()}** {md_text(item[key])}' for label, key in node.fields]
+            if fields:
+                self._block('  \n'.join(fields))
+            if 'image' in item:
+                self._picture(item['image'], item['name'])
+            elif node.placeholder:
+                self._block(_emphasis(node.placeholder.format(**item), italic=True))
+
+    def _figure(self, node):
+        self._picture(node.image, node.caption or '')
+        if node.caption:
+            self._block(_emphasis(node.caption, italic=True))
+
+    def _picture(self, image, description):
+        self.images.append(image['file'])
+        alt = md_cell(description)
+        self._block(f'![{alt}]({self.assets_dir}/{image["file"]})')
+
+    def _spacer(self, node):
+        pass
+
+    def _page_break(self, node):
+        pass
+
+
+def write_markdown(output_path, document, layout=None, cache_dir=CACHE_DIR):
+    """Write ``document`` as Markdown to ``output_path``; returns the path"""
+    if layout is None:
+        layout = Layout(document)
+    assets_dir = assets_path(output_path)
+    tmp = f'{output_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'w', encoding='utf-8') as out:
+            writer = MarkdownWriter(out, layout, os.path.basename(assets_dir))
+            writer.write(document)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, output_path)
+    export_images(writer.images, assets_dir, cache_dir)
+    return output_path
@@ -0,0 +1,215 @@
+"""
+Memo of rendered block XML, shared by every build in the process.
+
+Section fragments are cached whole, so a section whose content changes
+(or differs between variants, e.g. by audience) is rendered from scratch.
+Most of its blocks are boilerplate that comes out the same every time:
+troubleshooting bullets, the commands and credentials tables, the tech
+stack lists. The renderer looks those blocks up here by a hash of their
+content and the style ids, table width and renderer source they render
+with, and reuses the XML instead of rendering it again.
+
+The memo is an LRU bounded by entry count and total XML size, with an
+optional on-disk layer under ``.docgen-cache/blocks/`` (bounded in bytes,
+least recently used files removed first) that outlives the process and
+is shared by batch workers. Hit, miss and eviction counters are kept for
+reporting.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict, namedtuple
+
+from .paths import CACHE_DIR
+
+# Bump when the key or the stored format changes
+MEMO_VERSION = '1'
+
+MAX_ENTRIES = 4096
+MAX_SIZE = 32 << 20
+
+# Node types worth memoizing: several paragraphs or a table each. Single
+# headings and paragraphs render faster than their key can be hashed.
+MEMO_TYPES = ('list', 'code', 'table', 'entries')
+
+MemoStats = namedtuple('MemoStats', 'hits disk_hits misses evictions entries size')
+
+_memo = None
+_fingerprint = None
+
+
+def blocks_path(cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, 'blocks')
+
+
+def renderer_salt(style_ids, block_width):
+    """Everything besides a block's own content that its XML depends on"""
+    global _fingerprint
+    if _fingerprint is None:
+        from . import model, render, tables, wml
+        from .cache import module_fingerprint
+        _fingerprint = module_fingerprint(model, render, tables, wml)
+    return json.dumps([MEMO_VERSION, _fingerprint, block_width, sorted(style_ids.items())])
+
+
+def block_key(node, salt):
+    digest = hashlib.sha256(salt.encode())
+    digest.update(json.dumps(node.to_dict(), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def memoizable(node):
+    """Whether ``node`` renders the same XML whenever its content is the same"""
+    if node.type not in MEMO_TYPES:
+        return False
+    if node.type == 'table':
+        # Streamed rows are never materialized, and far too large to keep
+        return isinstance(node.rows, list)
+    if node.type == 'entries':
+        # Pictures get per-document relationship and shape ids
+        return not any('image' in item for item in node.items)
+    return True
+
+
+class BlockMemo:
+    """
+    LRU of rendered block XML strings.
+
+    ``max_entries`` and ``max_size`` (total length of the stored XML) bound
+    the in-process memo; whichever is exceeded first evicts the least
+    recently used blocks. With ``disk_dir`` and ``disk_bytes``, blocks are
+    also kept as files in ``disk_dir``, pruned to ``disk_bytes``.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_size=MAX_SIZE, disk_dir=None, disk_bytes=0):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.disk_dir = disk_dir if disk_bytes > 0 else None
+        self.disk_bytes = disk_bytes
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._disk_size = None
+
+    @property
+    def settings(self):
+        """Constructor arguments, to set up the same memo in another process"""
+        return self.max_entries, self.max_size, self.disk_dir, self.disk_bytes
+
+    def stats(self):
+        return MemoStats(self.hits, self.disk_hits, self.misses, self.evictions, len(self._entries), self.size)
+
+    def get(self, key):
+        xml = self._entries.get(key)
+        if xml is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return xml
+        if self.disk_dir is not None:
+            xml = self._read(key)
+            if xml is not None:
+                self.disk_hits += 1
+                self._remember(key, xml)
+                return xml
+        self.misses += 1
+        return None
+
+    def put(self, key, xml):
+        self._remember(key, xml)
+        if self.disk_dir is not None:
+            self._write(key, xml)
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def _remember(self, key, xml):
+        if not self.max_entries or len(xml) > self.max_size:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._entries[key] = xml
+        self.size += len(xml)
+        while self._entries and (len(self._entries) > self.max_entries or self.size > self.max_size):
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def _file(self, key):
+        return os.path.join(self.disk_dir, f'{key[:32]}.xml')
+
+    def _read(self, key):
+        path = self._file(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                xml = f.read()
+        except FileNotFoundError:
+            return None
+        # The modification time doubles as the last use, for pruning
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return xml
+
+    def _write(self, key, xml):
+        os.makedirs(self.disk_dir, exist_ok=True)
+        path = self._file(key)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(xml)
+        os.replace(tmp, path)
+        if self._disk_size is None:
+            self._disk_size = sum(entry.stat().st_size for entry in os.scandir(self.disk_dir))
+        else:
+            self._disk_size += os.path.getsize(path)
+        if self._disk_size > self.disk_bytes:
+            self._prune()
+
+    def _prune(self):
+        """Remove least recently used files down to 80% of the budget"""
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.disk_bytes * 4 // 5
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._disk_size = total
+
+
+def configure_memo(max_entries=MAX_ENTRIES, max_size=MAX_SIZE, disk_dir=None, disk_bytes=0):
+    """Replace the process-wide memo; ``max_entries=0`` without a disk budget turns it off"""
+    global _memo
+    _memo = BlockMemo(max_entries, max_size, disk_dir, disk_bytes)
+    return _memo
+
+
+def block_memo():
+    """The process-wide memo, or ``None`` when it is turned off"""
+    if _memo is None:
+        configure_memo()
+    if not _memo.max_entries and _memo.disk_dir is None:
+        return None
+    return _memo
+
+
+def format_stats(stats):
+    looked_up = stats.hits + stats.disk_hits + stats.misses
+    rate = f'{(stats.hits + stats.disk_hits) / looked_up:.0%}' if looked_up else '-'
+    disk = f' ({stats.disk_hits} from disk)' if stats.disk_hits else ''
+    return (f'{stats.hits + stats.disk_hits} reused{disk}, {stats.misses} rendered, {rate} hit rate; '
+            f'{stats.entries} blocks held, {stats.evictions} evicted')
@@ -0,0 +1,253 @@
+"""
+Declarative document model.
+
+The report is a tree of small ``__slots__`` nodes loaded from JSON (or YAML
+when PyYAML is installed). Every node round-trips through ``to_dict`` so a
+section's content can be hashed, cached and diffed.
+"""
+
+import json
+import os
+
+CONTENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content', 'report.json')
+
+NODE_TYPES = {}
+
+
+def node_type(name):
+    """Register a node class under its JSON ``type`` name"""
+    def register(cls):
+        cls.type = name
+        NODE_TYPES[name] = cls
+        return cls
+    return register
+
+
+class Node:
+    __slots__ = ()
+    type = None
+
+    @classmethod
+    def from_dict(cls, data):
+        kwargs = {k: v for k, v in data.items() if k != 'type'}
+        return cls(**kwargs)
+
+    def to_dict(self):
+        data = {'type': self.type}
+        for slot in self.__slots__:
+            value = getattr(self, slot)
+            if value is not None:
+                data[slot] = _dump(value)
+        return data
+
+    def __repr__(self):
+        fields = ', '.join(f'{s}={getattr(self, s)!r}' for s in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
+def _dump(value):
+    if isinstance(value, Node):
+        return value.to_dict()
+    if isinstance(value, (list, tuple)):
+        return [_dump(v) for v in value]
+    return value
+
+
+def from_dict(data):
+    """Build a node from its dict form"""
+    try:
+        cls = NODE_TYPES[data['type']]
+    except KeyError:
+        raise ValueError(f'Unknown node type: {data.get("type")!r}')
+    return cls.from_dict(data)
+
+
+@node_type('run')
+class Run(Node):
+    __slots__ = ('text', 'bold', 'italic', 'size', 'color', 'font')
+
+    def __init__(self, text, bold=None, italic=None, size=None, color=None, font=None):
+        self.text = text
+        self.bold = bold
+        self.italic = italic
+        self.size = size
+        self.color = color
+        self.font = font
+
+
+def _runs(runs, text):
+    if runs is None:
+        return [] if text is None else [Run(text)]
+    return [r if isinstance(r, Run) else (Run(r) if isinstance(r, str) else Run.from_dict(r)) for r in runs]
+
+
+@node_type('heading')
+class Heading(Node):
+    __slots__ = ('text', 'level', 'align', 'color')
+
+    def __init__(self, text, level=1, align=None, color=None):
+        self.text = text
+        self.level = level
+        self.align = align
+        self.color = color
+
+
+@node_type('paragraph')
+class Paragraph(Node):
+    """A paragraph; ``text`` is shorthand for a single plain run"""
+    __slots__ = ('runs', 'style', 'align')
+
+    def __init__(self, runs=None, style=None, align=None, text=None):
+        self.runs = _runs(runs, text)
+        self.style = style
+        self.align = align
+
+
+@node_type('list')
+class List(Node):
+    """One paragraph per item, bulleted by default"""
+    __slots__ = ('items', 'style')
+
+    def __init__(self, items, style='List Bullet'):
+        self.items = list(items)
+        self.style = style
+
+    def to_dict(self):
+        data = {'type': self.type, 'items': self.items}
+        if self.style != 'List Bullet':
+            data['style'] = self.style
+        return data
+
+
+@node_type('code')
+class Code(Node):
+    """Monospace command lines, one paragraph each"""
+    __slots__ = ('lines', 'color')
+
+    def __init__(self, lines, color=None):
+        self.lines = list(lines)
+        self.color = color
+
+
+@node_type('table')
+class Table(Node):
+    """
+    A header row plus data rows.
+
+    Instead of inline ``rows`` a table may name a data ``source``; the
+    builder fills ``rows`` from the matching provider before rendering.
+    """
+    __slots__ = ('columns', 'rows', 'style', 'source')
+
+    def __init__(self, columns, rows=None, style='Light Grid Accent 1', source=None):
+        self.columns = list(columns)
+        self.rows = None if rows is None else [tuple(row) for row in rows]
+        self.style = style
+        self.source = source
+
+
+@node_type('entries')
+class Entries(Node):
+    """
+    Numbered level-2 entries (e.g. application pages).
+
+    Each item is a dict; ``fields`` maps a bold label to an item key and
+    ``placeholder`` is a format string rendered in muted italics.
+    """
+    __slots__ = ('items', 'fields', 'placeholder')
+
+    def __init__(self, items, fields, placeholder=None):
+        self.items = list(items)
+        self.fields = [tuple(f) for f in fields]
+        self.placeholder = placeholder
+
+
+@node_type('figure')
+class Figure(Node):
+    """
+    A centered picture from the image cache with an optional caption;
+    ``image`` is ``{'file', 'width', 'height'}`` with sizes in EMU.
+    """
+    __slots__ = ('image', 'caption')
+
+    def __init__(self, image, caption=None):
+        self.image = dict(image)
+        self.caption = caption
+
+
+@node_type('spacer')
+class Spacer(Node):
+    __slots__ = ()
+
+
+@node_type('page_break')
+class PageBreak(Node):
+    __slots__ = ()
+
+
+@node_type('group')
+class Group(Node):
+    """Child nodes shown only to the roles in ``audience`` (everyone if unset)"""
+    __slots__ = ('children', 'audience')
+
+    def __init__(self, children, audience=None):
+        self.children = [c if isinstance(c, Node) else from_dict(c) for c in children]
+        self.audience = audience
+
+
+@node_type('section')
+class Section(Node):
+    __slots__ = ('name', 'children', 'audience')
+
+    def __init__(self, name, children, audience=None):
+        self.name = name
+        self.children = [c if isinstance(c, Node) else from_dict(c) for c in children]
+        self.audience = audience
+
+    @property
+    def inputs(self):
+        """Everything the section renders from, for hashing"""
+        return self.to_dict()
+
+
+@node_type('document')
+class Document(Node):
+    __slots__ = ('title', 'sections')
+
+    def __init__(self, sections, title=None):
+        self.title = title
+        self.sections = [s if isinstance(s, Section) else Section.from_dict(s) for s in sections]
+
+    def walk(self):
+        """Yield every node below the document, depth first"""
+        stack = list(reversed(self.sections))
+        while stack:
+            node = stack.pop()
+            yield node
+            children = getattr(node, 'children', None)
+            if children:
+                stack.extend(reversed(children))
+
+    def copy(self):
+        return from_dict(self.to_dict())
+
+    def section(self, name):
+        for section in self.sections:
+            if section.name == name:
+                return section
+        raise KeyError(name)
+
+
+def load_document(path=CONTENT_PATH):
+    """Load a document tree from a .json or .yaml/.yml file"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError(f'PyYAML is required to load {path}') from None
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    data.setdefault('type', 'document')
+    return from_dict(data)
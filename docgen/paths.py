@@ -0,0 +1,11 @@
+"""
+Well-known locations in the repository.
+"""
+
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(REPO_ROOT, '.docgen-cache')
+
+POSTMAN_COLLECTION = os.path.join(REPO_ROOT, 'postman', 'Event-Registration-API.postman_collection.json')
+API_DOCS = os.path.join(REPO_ROOT, 'docs', 'API_DOCUMENTATION.md')
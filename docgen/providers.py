@@ -0,0 +1,55 @@
+"""
+Named data sources that tables can bind to via ``"source"``.
+
+A provider is called with the build context (``variant``, ``role`` and
+``event`` for variant builds) plus the build's ``cache_dir``, and returns
+table rows.
+"""
+
+from .paths import CACHE_DIR
+
+PROVIDERS = {}
+
+
+def provider(name):
+    """Register a callable ``func(context)`` returning table rows"""
+    def register(func):
+        PROVIDERS[name] = func
+        return func
+    return register
+
+
+def resolve_sources(document, context=None, cache_dir=CACHE_DIR):
+    """
+    Fill ``rows`` on every table in ``document`` that names a source.
+
+    Tables that already have rows are left alone, so a document resolved
+    once can be handed to several writers.
+    """
+    context = dict(context or {}, cache_dir=cache_dir)
+    results = {}
+    for node in document.walk():
+        source = getattr(node, 'source', None)
+        if source is None or node.rows is not None:
+            continue
+        if source not in results:
+            try:
+                func = PROVIDERS[source]
+            except KeyError:
+                raise ValueError(f'Unknown table source: {source!r}')
+            results[source] = [tuple(row) for row in func(context)]
+        node.rows = results[source]
+    return document
+
+
+@provider('api_endpoints')
+def api_endpoints(context):
+    from .ingest import endpoint_rows, load_endpoint_index
+    return endpoint_rows(load_endpoint_index(cache_dir=context['cache_dir']))
+
+
+@provider('backend_routes')
+def backend_routes(context):
+    from .routes import global_prefix, load_route_index, route_rows
+    routes, _ = load_route_index(cache_dir=context['cache_dir'])
+    return route_rows(routes, global_prefix())
@@ -0,0 +1,159 @@
+"""
+Single renderer for the document model.
+
+Paragraph-level nodes are emitted as WordprocessingML strings into a
+per-section buffer that is parsed and attached in one step, instead of going
+through python-docx's object API once per paragraph, run and cell.
+Given a ``docgen.memo.BlockMemo``, lists, code, tables and entries that
+rendered before are copied from it instead.
+"""
+
+from docx.oxml import parse_xml
+
+from .cache import W_NS, append_block
+from .memo import block_key, memoizable, renderer_salt
+from .screenshots import drawing_xml
+from .tables import table_chunks, write_table
+from .wml import quoteattr, run_xml
+
+ALIGNMENTS = {'left': 'left', 'center': 'center', 'right': 'right', 'justify': 'both'}
+MUTED_COLOR = (107, 114, 128)
+
+
+class Renderer:
+    """Renders model sections into a python-docx ``Document``"""
+
+    def __init__(self, doc, style_ids=None, memo=None):
+        self.doc = doc
+        self.body = doc.element.body
+        self.memo = memo
+        self._memo_salt = None
+        self._style_ids = dict(style_ids or ())
+        self._buffer = []
+        self._added = []
+        self._handlers = {
+            'heading': self._heading,
+            'paragraph': self._paragraph,
+            'list': self._list,
+            'code': self._code,
+            'table': self._table,
+            'entries': self._entries,
+            'figure': self._figure,
+            'spacer': self._spacer,
+            'page_break': self._page_break,
+            'group': self._group,
+        }
+
+    def style_id(self, name):
+        """Resolve a style name to its id once per renderer (or never, when preloaded)"""
+        try:
+            return self._style_ids[name]
+        except KeyError:
+            style_id = self._style_ids[name] = self.doc.styles[name].style_id
+            return style_id
+
+    def render(self, section):
+        """Render ``section`` and return the block elements it added"""
+        self._added = []
+        self._group(section)
+        self.flush()
+        return self._added
+
+    def flush(self):
+        if not self._buffer:
+            return
+        fragment = parse_xml(f'<w:fragment xmlns:w="{W_NS}">{"".join(self._buffer)}</w:fragment>')
+        for element in list(fragment):
+            append_block(self.body, element)
+            self._added.append(element)
+        self._buffer.clear()
+
+    def _p(self, runs='', style=None, align=None):
+        props = []
+        if style:
+            props.append(f'<w:pStyle w:val={quoteattr(self.style_id(style))}/>')
+        if align:
+            props.append(f'<w:jc w:val="{ALIGNMENTS[align]}"/>')
+        ppr = f'<w:pPr>{"".join(props)}</w:pPr>' if props else ''
+        if not ppr and not runs:
+            self._buffer.append('<w:p/>')
+        else:
+            self._buffer.append(f'<w:p>{ppr}{runs}</w:p>')
+
+    def _heading(self, node):
+        style = 'Title' if node.level == 0 else f'Heading {node.level}'
+        self._p(run_xml(node.text, color=node.color), style, node.align)
+
+    def _paragraph(self, node):
+        runs = ''.join(
+            run_xml(r.text, r.bold, r.italic, r.size, r.color, r.font) for r in node.runs if r.text
+        )
+        self._p(runs, node.style, node.align)
+
+    def _list(self, node):
+        for item in node.items:
+            self._p(run_xml(item) if item else '', node.style)
+
+    def _code(self, node):
+        for line in node.lines:
+            self._p(run_xml(line, color=node.color, font='Courier New'), 'No Spacing')
+
+    def _table(self, node):
+        self.flush()
+        self._added.append(write_table(self.doc, node.columns, node.rows, style_id=self.style_id(node.style)))
+
+    def _entries(self, node):
+        for i, item in enumerate(node.items, 1):
+            self._p(run_xml(f'{i}. {item["name"]}'), 'Heading 2')
+            for label, key in node.fields:
+                self._p(run_xml(label, bold=True) + run_xml(item[key]))
+            if 'image' in item:
+                self._p(self._picture(item['image'], item['name']), align='center')
+            elif node.placeholder:
+                self._p(run_xml(node.placeholder.format(**item), italic=True, color=MUTED_COLOR))
+            self._p()
+
+    def _figure(self, node):
+        self._p(self._picture(node.image, node.caption or ''), align='center')
+        if node.caption:
+            self._p(run_xml(node.caption, italic=True, color=MUTED_COLOR), align='center')
+
+    def _picture(self, image, description):
+        # Relationship and shape ids are filled in by ImageLinker
+        return drawing_xml(image, description)
+
+    def _group(self, node):
+        for child in node.children:
+            if self.memo is not None and memoizable(child):
+                self._memoized(child)
+            else:
+                self._handlers[child.type](child)
+
+    def _memoized(self, node):
+        if self._memo_salt is None:
+            self._memo_salt = renderer_salt(self._style_ids, self.doc._block_width)
+        key = block_key(node, self._memo_salt)
+        xml = self.memo.get(key)
+        if xml is None:
+            xml = self._block_xml(node)
+            self.memo.put(key, xml)
+        self._buffer.append(xml)
+
+    def _block_xml(self, node):
+        """One block's XML as a string, for the memo"""
+        if node.type == 'table':
+            return ''.join(table_chunks(
+                node.columns, node.rows, self.style_id(node.style), self.doc._block_width, declare_ns=False,
+            ))
+        buffer, self._buffer = self._buffer, []
+        try:
+            self._handlers[node.type](node)
+            return ''.join(self._buffer)
+        finally:
+            self._buffer = buffer
+
+    def _spacer(self, node):
+        self._p()
+
+    def _page_break(self, node):
+        self._buffer.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
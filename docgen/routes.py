@@ -0,0 +1,263 @@
+"""
+Route index extracted from the NestJS controllers.
+
+Scans ``backend/src/**/*.controller.ts`` for ``@Controller`` prefixes, HTTP
+method decorators, ``@UseGuards`` and role decorators (discovered from
+``backend/src/auth/decorators``). The index persists in the cache directory;
+on each run only controllers whose content hash changed are re-parsed, and
+those are read and parsed on a thread pool.
+
+    python -m docgen.routes        # print the current route table
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .paths import CACHE_DIR, REPO_ROOT
+
+Route = namedtuple('Route', 'method path handler guards roles public file line')
+
+INDEX_VERSION = 1
+BACKEND_SRC = os.path.join(REPO_ROOT, 'backend', 'src')
+CONTROLLER_GLOB = os.path.join('**', '*.controller.ts')
+DECORATORS_DIR = os.path.join(BACKEND_SRC, 'auth', 'decorators')
+
+HTTP_DECORATORS = {
+    'Get': 'GET', 'Post': 'POST', 'Put': 'PUT', 'Patch': 'PATCH',
+    'Delete': 'DELETE', 'Options': 'OPTIONS', 'Head': 'HEAD', 'All': 'ALL',
+}
+
+_TOKEN_RE = re.compile(
+    r'@(?P<decorator>\w+)\s*\('
+    r'|\bclass\s+(?P<cls>\w+)'
+    r'|^[ \t]*(?:(?:public|private|protected|static|async)\s+)*(?P<method>\w+)\s*\(',
+    re.M,
+)
+_STRING_RE = re.compile(r'''^\s*(['"`])(.*?)\1''', re.S)
+_METADATA_RE = re.compile(r'export\s+const\s+(\w+)\s*=.*?SetMetadata\(\s*[\'"`](\w+)[\'"`]', re.S)
+_PREFIX_RE = re.compile(r'setGlobalPrefix\(\s*[\'"`]([^\'"`]*)[\'"`]')
+
+
+def _balanced(text, start):
+    """Index just past the parenthesis that closes the one at ``text[start]``"""
+    depth = 0
+    i = start
+    quote = None
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == '\\':
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in '\'"`':
+            quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(text)
+
+
+def _path_arg(args):
+    """First string literal argument, or ``path:`` of an options object"""
+    match = _STRING_RE.match(args)
+    if match:
+        return match.group(2)
+    match = re.search(r'path\s*:\s*([\'"`])(.*?)\1', args)
+    return match.group(2) if match else ''
+
+
+def _role_names(args):
+    return [arg.split('.')[-1].strip(' \'"`').title() for arg in args.split(',') if arg.strip()]
+
+
+def _join(*parts):
+    path = '/'.join(p.strip('/') for p in parts if p and p.strip('/'))
+    return '/' + path
+
+
+def load_role_decorators(decorators_dir=DECORATORS_DIR):
+    """
+    Map custom decorator names to the metadata key they set.
+
+    e.g. ``{'Roles': 'roles'}`` for ``export const Roles = ... SetMetadata('roles', ...)``.
+    """
+    found = {'Roles': 'roles'}
+    for path in glob.glob(os.path.join(decorators_dir, '*.ts')):
+        with open(path, encoding='utf-8') as f:
+            found.update(_METADATA_RE.findall(f.read()))
+    return found
+
+
+def parse_controller(text, relpath='', decorators=None):
+    """Return the routes declared in one controller source"""
+    decorators = decorators or {'Roles': 'roles'}
+    routes = []
+    pending = []
+    prefix = ''
+    controller = ''
+    class_guards = []
+    class_roles = []
+    class_public = False
+    pos = 0
+
+    while True:
+        match = _TOKEN_RE.search(text, pos)
+        if not match:
+            break
+        if match.group('decorator'):
+            open_paren = match.end() - 1
+            close = _balanced(text, open_paren)
+            pending.append((match.group('decorator'), text[open_paren + 1:close - 1]))
+            pos = close
+            continue
+
+        if match.group('cls'):
+            prefix = ''
+            controller = match.group('cls')
+            class_guards, class_roles, class_public = [], [], False
+            for name, args in pending:
+                if name == 'Controller':
+                    prefix = _path_arg(args)
+                elif name == 'UseGuards':
+                    class_guards += [g.strip() for g in args.split(',') if g.strip()]
+                elif decorators.get(name) == 'roles':
+                    class_roles = _role_names(args)
+                elif decorators.get(name) in ('isPublic', 'public'):
+                    class_public = True
+            pending = []
+            pos = match.end()
+            continue
+
+        # A member declaration: attach pending decorators, then skip its
+        # parameter list so parameter decorators are not picked up
+        open_paren = match.end() - 1
+        guards, roles, public = list(class_guards), class_roles, class_public
+        http = None
+        for name, args in pending:
+            if name in HTTP_DECORATORS:
+                http = (HTTP_DECORATORS[name], _path_arg(args))
+            elif name == 'UseGuards':
+                guards += [g.strip() for g in args.split(',') if g.strip()]
+            elif decorators.get(name) == 'roles':
+                roles = _role_names(args)
+            elif decorators.get(name) in ('isPublic', 'public'):
+                public = True
+        if http:
+            line = text.count('\n', 0, match.start('method')) + 1
+            routes.append(Route(
+                http[0], _join(prefix, http[1]), f'{controller}.{match.group("method")}',
+                guards, roles, public, relpath, line,
+            ))
+        pending = []
+        pos = _balanced(text, open_paren)
+
+    return routes
+
+
+def global_prefix(backend_src=BACKEND_SRC):
+    """The ``app.setGlobalPrefix`` value from ``main.ts``, if any"""
+    try:
+        with open(os.path.join(backend_src, 'main.ts'), encoding='utf-8') as f:
+            match = _PREFIX_RE.search(f.read())
+    except FileNotFoundError:
+        return ''
+    return _join(match.group(1)) if match and match.group(1) else ''
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _scan(path, relpath, known, decorators):
+    """Re-hash one file and re-parse it only when its content changed"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if known and known['sha'] == digest:
+        return dict(known, stamp=_stamp(path)), False
+    routes = parse_controller(data.decode('utf-8'), relpath, decorators)
+    return {'sha': digest, 'stamp': _stamp(path), 'routes': [r._asdict() for r in routes]}, True
+
+
+def load_route_index(backend_src=BACKEND_SRC, cache_dir=CACHE_DIR, workers=None):
+    """
+    Return ``(routes, rescanned)`` for every controller under ``backend_src``.
+
+    Files whose mtime and size match the persisted index are reused without
+    being read; the rest are hashed, and re-parsed only if the hash changed.
+    """
+    index_file = os.path.join(cache_dir, 'routes', 'index.json')
+    decorators = load_role_decorators(os.path.join(backend_src, 'auth', 'decorators'))
+    try:
+        with open(index_file, encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != INDEX_VERSION or index.get('decorators') != decorators:
+            raise ValueError('stale route index')
+    except (FileNotFoundError, ValueError):
+        index = {'version': INDEX_VERSION, 'decorators': decorators, 'files': {}}
+
+    files = sorted(glob.glob(os.path.join(backend_src, CONTROLLER_GLOB), recursive=True))
+    entries = {}
+    todo = []
+    for path in files:
+        relpath = os.path.relpath(path, REPO_ROOT).replace(os.sep, '/')
+        known = index['files'].get(relpath)
+        if known and known['stamp'] == _stamp(path):
+            entries[relpath] = known
+        else:
+            todo.append((path, relpath, known))
+
+    rescanned = []
+    if todo:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda job: _scan(*job, decorators), todo)
+            for (path, relpath, known), (entry, changed) in zip(todo, results):
+                entries[relpath] = entry
+                if changed:
+                    rescanned.append(relpath)
+
+    if todo or set(entries) != set(index['files']):
+        index['files'] = entries
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        tmp = f'{index_file}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp, index_file)
+
+    routes = [Route(**r) for relpath in sorted(entries) for r in entries[relpath]['routes']]
+    return routes, rescanned
+
+
+def auth_label(route):
+    if route.public:
+        return 'No'
+    if route.roles:
+        return f'Yes ({"/".join(route.roles)})'
+    if any('Auth' in guard for guard in route.guards):
+        return 'Yes'
+    return 'No'
+
+
+def route_rows(routes, prefix=''):
+    """Rows for the Backend Routes table"""
+    for r in routes:
+        path = prefix + r.path if r.path != '/' else (prefix or '/')
+        yield (f'{r.method} {path}', r.handler, auth_label(r), f'{os.path.basename(r.file)}:{r.line}')
+
+
+if __name__ == '__main__':
+    routes, rescanned = load_route_index()
+    for row in route_rows(routes, global_prefix()):
+        print('  '.join(row))
+    print(f'{len(routes)} routes, {len(rescanned)} file(s) re-parsed')
@@ -0,0 +1,499 @@
+"""
+Discrete-event simulation of the check-in gates.
+
+Each scanner handles one attendee at a time: the operator's handling time
+(aiming the camera, the attendee presenting the code), the request round
+trip, then the database steps of ``CheckInsService.scanTicket`` in order:
+ticket lookup, duplicate check, insert, registration update and populate.
+The database steps share a connection pool. Attendees arrive along an
+arrival curve (a rush around doors-open, or the per-minute arrivals of an
+event replayed from the check-in exports) and wait in one queue for the
+next free scanner.
+
+Step latencies come from measured values (a JSON file with samples or
+median/p95 per step, in milliseconds), from a local SQLite mock of the
+same queries (``--mock``; no network, so far faster than MongoDB), or
+from the defaults below. Every scanner count is simulated against the same
+arrivals, so configurations are compared on equal terms.
+
+    python -m docgen.scansim --attendees 1500 --window 60 --scanners 1 2 4 6 8
+    python -m docgen.scansim --latencies measured.json --attendance exports/*.jsonl
+
+Results are written as JSON (``reports/scansim.json`` by default), which
+``generate_documentation.py --capacity`` turns into a capacity-planning
+section with tables and charts.
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import sqlite3
+import time
+from collections import deque, namedtuple
+from datetime import datetime, timezone
+
+from .analytics import percentile
+from .model import Figure, Heading, PageBreak, Paragraph, Section, Table
+from .paths import CACHE_DIR, REPO_ROOT
+
+RESULTS_VERSION = 1
+RESULTS_PATH = os.path.join(REPO_ROOT, 'reports', 'scansim.json')
+
+STEPS = ('ticket lookup', 'duplicate check', 'insert', 'registration update', 'populate')
+PHASES = ('handling', 'request', *STEPS)
+
+# Median and p95 in milliseconds. The database steps assume MongoDB in the
+# same region as the API; 'request' is the phone-to-API round trip plus
+# framework overhead, 'handling' the person at the gate.
+DEFAULT_LATENCIES = {
+    'handling': (4000.0, 9000.0),
+    'request': (40.0, 150.0),
+    'ticket lookup': (4.0, 12.0),
+    'duplicate check': (2.0, 6.0),
+    'insert': (4.0, 12.0),
+    'registration update': (3.0, 9.0),
+    'populate': (8.0, 25.0),
+}
+# Mongoose's default maxPoolSize
+DB_POOL = 100
+TARGET_WAIT = 5.0
+
+GateResult = namedtuple(
+    'GateResult',
+    'scanners completed capacity_per_minute per_minute peak_per_minute max_queue mean_wait_s p95_wait_s '
+    'p95_total_s cleared_min utilization',
+)
+
+
+class Latency:
+    """Draws from measured samples, or from a lognormal fitted to a median and p95"""
+    __slots__ = ('samples', 'mu', 'sigma')
+
+    def __init__(self, median=None, p95=None, samples=None):
+        self.samples = sorted(samples) if samples else None
+        if self.samples is None:
+            self.mu = math.log(median)
+            self.sigma = max(math.log(p95 / median), 0.0) / 1.6449
+        else:
+            self.mu = self.sigma = None
+
+    @classmethod
+    def from_spec(cls, spec):
+        """``[samples...]``, ``{"median": .., "p95": ..}`` or ``(median, p95)``"""
+        if isinstance(spec, dict):
+            return cls(spec['median'], spec.get('p95', spec['median']))
+        if isinstance(spec, tuple):
+            return cls(*spec)
+        return cls(samples=[float(v) for v in spec])
+
+    def draw(self, rng):
+        if self.samples:
+            return rng.choice(self.samples)
+        return rng.lognormvariate(self.mu, self.sigma) if self.sigma else math.exp(self.mu)
+
+    def summary(self):
+        """``(median, p95)`` in milliseconds"""
+        if self.samples:
+            return percentile(self.samples, 50), percentile(self.samples, 95)
+        return math.exp(self.mu), math.exp(self.mu + 1.6449 * self.sigma)
+
+
+def latency_model(specs=None):
+    """``{phase: Latency}`` from specs, falling back to ``DEFAULT_LATENCIES``"""
+    specs = specs or {}
+    unknown = set(specs) - set(PHASES)
+    if unknown:
+        raise ValueError(f'Unknown scan steps: {", ".join(sorted(unknown))} (expected {", ".join(PHASES)})')
+    return {phase: Latency.from_spec(specs.get(phase, DEFAULT_LATENCIES[phase])) for phase in PHASES}
+
+
+def load_latencies(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def mock_latencies(samples=2000, registrations=20_000, seed=0):
+    """
+    Time the ``scanTicket`` queries against an in-memory SQLite mock of the
+    collections; returns ``{step: [milliseconds...]}``.
+    """
+    rng = random.Random(seed)
+    db = sqlite3.connect(':memory:')
+    db.executescript('''
+        CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT);
+        CREATE TABLE events (id INTEGER PRIMARY KEY, title TEXT, date TEXT, location TEXT);
+        CREATE TABLE registrations (id INTEGER PRIMARY KEY, ticket_code TEXT UNIQUE, user_id INTEGER,
+                                    event_id INTEGER, status TEXT, checked_in_at TEXT);
+        CREATE TABLE check_ins (id INTEGER PRIMARY KEY, registration_id INTEGER, scanned_by INTEGER,
+                                scanned_at TEXT, method TEXT, notes TEXT, event_id INTEGER);
+        CREATE INDEX check_ins_registration ON check_ins (registration_id);
+    ''')
+    db.executemany('INSERT INTO users VALUES (?, ?, ?)',
+                   ((i, f'User {i}', f'user{i}@example.com') for i in range(registrations)))
+    db.executemany('INSERT INTO events VALUES (?, ?, ?, ?)',
+                   ((i, f'Event {i}', '2026-01-01', 'Hall') for i in range(10)))
+    db.executemany('INSERT INTO registrations VALUES (?, ?, ?, ?, ?, NULL)',
+                   ((i, f'TKT-{i:08d}', i, i % 10, 'confirmed') for i in range(registrations)))
+    queries = {
+        'ticket lookup': ('SELECT r.id, r.status, e.id, e.title, e.date, e.location FROM registrations r '
+                          'JOIN events e ON e.id = r.event_id WHERE r.ticket_code = ?'),
+        'duplicate check': 'SELECT id FROM check_ins WHERE registration_id = ? LIMIT 1',
+        'insert': ('INSERT INTO check_ins (registration_id, scanned_by, scanned_at, method, notes, event_id) '
+                   'VALUES (?, 1, ?, ?, NULL, ?)'),
+        'registration update': 'UPDATE registrations SET status = ?, checked_in_at = ? WHERE id = ?',
+        'populate': ('SELECT c.id, u.name, u.email, s.name, e.title, e.date, e.location FROM check_ins c '
+                     'JOIN registrations r ON r.id = c.registration_id JOIN users u ON u.id = r.user_id '
+                     'JOIN users s ON s.id = c.scanned_by JOIN events e ON e.id = c.event_id WHERE c.id = ?'),
+    }
+    timings = {step: [] for step in STEPS}
+
+    def timed(step, *params):
+        start = time.perf_counter_ns()
+        cursor = db.execute(queries[step], params)
+        rows = cursor.fetchall()
+        timings[step].append((time.perf_counter_ns() - start) / 1e6)
+        return rows, cursor.lastrowid
+
+    now = datetime.now(timezone.utc).isoformat()
+    for n in rng.sample(range(registrations), min(samples, registrations)):
+        registration_id, _, event_id = timed('ticket lookup', f'TKT-{n:08d}')[0][0][:3]
+        timed('duplicate check', registration_id)
+        check_in = timed('insert', registration_id, now, 'qr', event_id)[1]
+        timed('registration update', 'checked_in', now, registration_id)
+        timed('populate', check_in)
+    db.close()
+    return timings
+
+
+def rush_curve(attendees, window=60, peak=0.25):
+    """
+    Arrivals per minute rising linearly to a peak ``peak`` of the way into
+    ``window`` minutes and falling back to zero, ``attendees`` in total.
+    """
+    apex = max(peak * window, 1e-9)
+    shape = [
+        (m + 0.5) / apex if m + 0.5 <= apex else max(window - m - 0.5, 0) / max(window - apex, 1e-9)
+        for m in range(window)
+    ]
+    total = sum(shape)
+    return [attendees * s / total for s in shape]
+
+
+def curve_from_exports(paths, event_id=None, cache_dir=CACHE_DIR):
+    """Per-minute check-ins of one event (the busiest unless ``event_id``) in the exports"""
+    from .columnar import CHECK_INS, open_store
+
+    store = open_store(paths, cache_dir)
+    event_ids = store.strings('events')
+    if event_id is None:
+        event = max(range(len(event_ids)), key=lambda e: len(store.event_rows(CHECK_INS, e)), default=None)
+    else:
+        event = event_ids.find(str(event_id))
+        if event is None:
+            raise ValueError(f'No event {event_id} in the exports')
+    rows = store.event_rows(CHECK_INS, event) if event is not None else range(0)
+    if not rows:
+        raise ValueError('The exports contain no check-ins' + (f' for event {event_id}' if event_id else ''))
+    stamps = sorted(store.column(CHECK_INS, 'scanned_at')[rows.start:rows.stop])
+    curve = [0.0] * (int((stamps[-1] - stamps[0]) // 60) + 1)
+    for t in stamps:
+        curve[int((t - stamps[0]) // 60)] += 1
+    return event_ids[event], curve
+
+
+def arrivals(curve, rng):
+    """Arrival times in seconds: a Poisson process with the curve's per-minute rates"""
+    times = []
+    for minute, rate in enumerate(curve):
+        if rate <= 0:
+            continue
+        t = minute * 60.0
+        end = t + 60.0
+        while True:
+            t += rng.expovariate(rate / 60.0)
+            if t >= end:
+                break
+            times.append(t)
+    return times
+
+
+def simulate(arrival_times, scanners, latencies, db_pool=DB_POOL, seed=0):
+    """
+    Run one gate configuration; returns ``(GateResult, queue)`` where
+    ``queue[m]`` is the longest queue during minute ``m``.
+    """
+    rng = random.Random(seed)
+    draw = [latencies[phase].draw for phase in PHASES]
+    uses_db = [phase in STEPS for phase in PHASES]
+    last_phase = len(PHASES) - 1
+
+    # Events: (time, seq, kind, scanner); kind 0 = arrival, 1 = phase done
+    events = [(t, i, 0, -1) for i, t in enumerate(arrival_times)]
+    heapq.heapify(events)
+    seq = len(events)
+    waiting = deque()
+    idle = list(range(scanners))
+    serving = [None] * scanners     # arrival time of the attendee at each scanner
+    phase = [0] * scanners
+    db_free = db_pool
+    db_queue = deque()
+    busy = 0.0
+    started = [0.0] * scanners
+    waits, totals, done_at = [], [], []
+    queue_max = []
+    queued = 0
+
+    def note_queue(t):
+        # Minutes without changes kept the previous length throughout
+        nonlocal queued
+        minute = int(t // 60)
+        while len(queue_max) <= minute:
+            queue_max.append(queued)
+        queued = len(waiting)
+        queue_max[minute] = max(queue_max[minute], queued)
+
+    def start_phase(s, t):
+        nonlocal seq, db_free
+        if uses_db[phase[s]]:
+            if not db_free:
+                db_queue.append(s)
+                return
+            db_free -= 1
+        seq += 1
+        heapq.heappush(events, (t + draw[phase[s]](rng) / 1000, seq, 1, s))
+
+    def take(s, t):
+        arrived = waiting.popleft()
+        note_queue(t)
+        waits.append(t - arrived)
+        serving[s] = arrived
+        phase[s] = 0
+        started[s] = t
+        start_phase(s, t)
+
+    while events:
+        t, _, kind, s = heapq.heappop(events)
+        if kind == 0:
+            waiting.append(t)
+            note_queue(t)
+            if idle:
+                take(idle.pop(), t)
+            continue
+        if uses_db[phase[s]]:
+            db_free += 1
+            if db_queue:
+                start_phase(db_queue.popleft(), t)
+        if phase[s] < last_phase:
+            phase[s] += 1
+            start_phase(s, t)
+            continue
+        totals.append(t - serving[s])
+        done_at.append(t)
+        busy += t - started[s]
+        if waiting:
+            take(s, t)
+        else:
+            idle.append(s)
+
+    if not done_at:
+        return GateResult(scanners, 0, 0.0, 0.0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0), []
+    first, last = arrival_times[0], done_at[-1]
+    per_minute = [0] * (int(last // 60) + 1)
+    for t in done_at:
+        per_minute[int(t // 60)] += 1
+    ordered_waits = sorted(waits)
+    result = GateResult(
+        scanners=scanners,
+        completed=len(done_at),
+        capacity_per_minute=round(scanners * 60 * len(done_at) / busy, 1),
+        per_minute=round(len(done_at) / max((last - first) / 60, 1 / 60), 1),
+        peak_per_minute=max(per_minute),
+        max_queue=max(queue_max),
+        mean_wait_s=round(sum(waits) / len(waits), 1),
+        p95_wait_s=round(percentile(ordered_waits, 95), 1),
+        p95_total_s=round(percentile(sorted(totals), 95), 1),
+        cleared_min=round(last / 60, 1),
+        utilization=round(busy / (scanners * (last - first)), 3) if last > first else 0.0,
+    )
+    return result, queue_max
+
+
+def run_capacity(curve, scanner_counts, latencies, db_pool=DB_POOL, seed=0, source='rush'):
+    """Simulate every scanner count against the same arrivals; returns the results dict"""
+    times = arrivals(curve, random.Random(seed))
+    if not times:
+        raise ValueError('The arrival curve produces no arrivals')
+    configs = []
+    for n in sorted(set(scanner_counts)):
+        result, queue = simulate(times, n, latencies, db_pool, seed)
+        configs.append({**result._asdict(), 'queue': queue})
+    return {
+        'version': RESULTS_VERSION,
+        'generated': datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        'source': source,
+        'attendees': len(times),
+        'curve': [round(rate, 2) for rate in curve],
+        'db_pool': db_pool,
+        'latencies': {phase: [round(v, 3) for v in latencies[phase].summary()] for phase in PHASES},
+        'configs': configs,
+    }
+
+
+def recommend(results, target_wait=TARGET_WAIT):
+    """Fewest scanners whose p95 queue wait stays within ``target_wait`` minutes, or ``None``"""
+    for config in results['configs']:
+        if config['p95_wait_s'] <= target_wait * 60:
+            return config
+    return None
+
+
+def write_results(results, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+    os.replace(tmp, path)
+
+
+def load_results(path=RESULTS_PATH):
+    with open(path, encoding='utf-8') as f:
+        results = json.load(f)
+    if results.get('version') != RESULTS_VERSION:
+        raise ValueError(f'{path}: unsupported simulation results version {results.get("version")!r}')
+    return results
+
+
+def _scanners(n):
+    return f'{n} scanner' if n == 1 else f'{n} scanners'
+
+
+def _duration(seconds):
+    return f'{seconds:.0f} s' if seconds < 90 else f'{seconds / 60:.1f} min'
+
+
+def format_results(results, target_wait=TARGET_WAIT):
+    """Plain-text capacity table"""
+    lines = [f'{results["attendees"]} attendees over {len(results["curve"])} min ({results["source"]})',
+             f'{"scanners":>8}  {"capacity":>8}  {"scans/min":>9}  {"peak/min":>8}  {"max queue":>9}  '
+             f'{"mean wait":>9}  {"p95 wait":>9}  {"cleared":>9}  {"util":>5}']
+    for c in results['configs']:
+        lines.append(f'{c["scanners"]:>8}  {c["capacity_per_minute"]:>8.1f}  {c["per_minute"]:>9.1f}  '
+                     f'{c["peak_per_minute"]:>8}  {c["max_queue"]:>9}  '
+                     f'{_duration(c["mean_wait_s"]):>9}  {_duration(c["p95_wait_s"]):>9}  '
+                     f'{c["cleared_min"]:>7.1f} m  {c["utilization"]:>5.0%}')
+    best = recommend(results, target_wait)
+    lines.append(f'Recommended scanners: {best["scanners"]} (p95 wait <= {target_wait:g} min)' if best else
+                 f'No simulated scanner count keeps the p95 wait within {target_wait:g} min')
+    return '\n'.join(lines)
+
+
+def capacity_section(results, target_wait=TARGET_WAIT, cache_dir=CACHE_DIR):
+    """Build the 'Gate Capacity Planning' model section from a results dict"""
+    from .charts import figure
+
+    configs = results['configs']
+    source = ('a rush peaking a quarter of the way in' if results['source'] == 'rush'
+              else f'the check-ins of event {results["source"]} replayed from the exports')
+    children = [
+        Heading('Gate Capacity Planning'),
+        Paragraph(text='Simulated check-in gates: each scanner serves one attendee at a time, running the steps '
+                       'of CheckInsService.scanTicket in sequence (ticket lookup, duplicate check, insert, '
+                       'registration update, populate) after the operator has scanned the code. '
+                       f'{results["attendees"]} attendees arrive over {len(results["curve"])} minutes following '
+                       f'{source}, and queue for the next free scanner. Capacity is what the gates could '
+                       'sustain (scanners x 60 s / mean service time); scans per minute is what they did, '
+                       'averaged from the first arrival until the queue cleared.'),
+        Heading('Step Latencies', level=2),
+        Table(['Step', 'Median ms', 'p95 ms'], [
+            (phase.capitalize(), f'{median:.1f}', f'{p95:.1f}') for phase, (median, p95) in results['latencies'].items()
+        ]),
+        Heading('Capacity by Scanner Count', level=2),
+        Table(['Scanners', 'Capacity / min', 'Scans / min', 'Peak / min', 'Max Queue', 'Mean Wait', 'p95 Wait',
+               'Queue Cleared', 'Utilization'], [
+            (c['scanners'], f'{c["capacity_per_minute"]:.1f}', f'{c["per_minute"]:.1f}', c['peak_per_minute'],
+             c['max_queue'], _duration(c['mean_wait_s']), _duration(c['p95_wait_s']), f'{c["cleared_min"]:.1f} min',
+             f'{c["utilization"]:.0%}')
+            for c in configs
+        ]),
+    ]
+    best = recommend(results, target_wait)
+    children.append(Paragraph(text=(
+        f'Recommendation: {_scanners(best["scanners"])} keep the '
+        f'95th-percentile wait within {target_wait:g} minutes ({_duration(best["p95_wait_s"])}).' if best else
+        f'None of the simulated configurations keeps the 95th-percentile wait within {target_wait:g} minutes.'
+    )))
+
+    queue_chart = figure('line', [(_scanners(c['scanners']), c['queue']) for c in configs], cache_dir,
+                         title='Queue length over time', x_label='Minutes after doors open',
+                         y_label='Attendees waiting')
+    throughput_chart = figure('bar', [(str(c['scanners']), c['capacity_per_minute']) for c in configs], cache_dir,
+                              title='Gate capacity', x_label='Scanners', y_label='Scans per minute')
+    if queue_chart:
+        children.append(Figure(queue_chart, 'Longest queue per minute for each scanner count'))
+    if throughput_chart:
+        children.append(Figure(throughput_chart, 'Sustainable scans per minute: scanners x 60 s / mean service time'))
+    children.append(PageBreak())
+    return Section('capacity', children)
+
+
+def add_capacity(document, path=RESULTS_PATH, cache_dir=CACHE_DIR):
+    """Insert the capacity-planning section ahead of the conclusion"""
+    section = capacity_section(load_results(path), cache_dir=cache_dir)
+    names = [s.name for s in document.sections]
+    at = names.index('conclusion') if 'conclusion' in names else len(names)
+    document.sections.insert(at, section)
+    return document
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scanners', type=int, nargs='+', default=[1, 2, 3, 4, 6, 8],
+                        help='scanner counts to compare')
+    parser.add_argument('--attendees', type=int, default=1000, help='attendees arriving (rush curve)')
+    parser.add_argument('--window', type=int, default=60, help='minutes over which they arrive (rush curve)')
+    parser.add_argument('--peak', type=float, default=0.25, help='where the rush peaks, as a fraction of --window')
+    parser.add_argument('--attendance', nargs='+', metavar='EXPORT',
+                        help='replay the arrival curve of an event in these exports instead of the rush curve')
+    parser.add_argument('--event', help='event id to replay (default: the one with most check-ins)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help='cache directory for the converted exports (default .docgen-cache)')
+    latency = parser.add_mutually_exclusive_group()
+    latency.add_argument('--latencies', metavar='JSON',
+                         help='measured per-step latencies in ms: {"insert": [samples...] or '
+                              '{"median": .., "p95": ..}, ...}; steps left out keep their defaults')
+    latency.add_argument('--mock', action='store_true',
+                         help='time the database steps against a local SQLite mock')
+    parser.add_argument('--db-pool', type=int, default=DB_POOL, help='database connections shared by the steps')
+    parser.add_argument('--target-wait', type=float, default=TARGET_WAIT,
+                        help='acceptable p95 queue wait in minutes, for the recommendation')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default=RESULTS_PATH, help='results JSON path')
+    args = parser.parse_args(argv)
+
+    if args.attendance:
+        source, curve = curve_from_exports(args.attendance, args.event, args.cache_dir)
+    else:
+        source, curve = 'rush', rush_curve(args.attendees, args.window, args.peak)
+    if args.latencies:
+        specs = load_latencies(args.latencies)
+    elif args.mock:
+        specs = mock_latencies(seed=args.seed)
+    else:
+        specs = None
+    try:
+        latencies = latency_model(specs)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    results = run_capacity(curve, args.scanners, latencies, args.db_pool, args.seed, source)
+    write_results(results, args.output)
+    print(format_results(results, args.target_wait))
+    print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""
+Screenshots for the application pages section.
+
+A capture directory holds one PNG per page, named after the page
+(``login-page.png``, ``Login Page.png`` or ``login.png`` for "Login Page").
+Captures are downscaled to the printable width at ``DPI`` and recompressed
+on a process pool with Pillow when it is installed; without it they are
+embedded as captured. Processed images live in the cache under a key
+derived from the capture's content hash, so identical captures are
+processed and stored once, and unchanged captures are never reprocessed.
+
+Rendered fragments refer to a processed image by file name only
+(``pic:cNvPr/@name``) and leave ``r:embed`` empty: relationship ids belong
+to one package, so ``ImageLinker`` adds the image parts and fills them in
+whenever a section is rendered or stitched from the cache.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import shutil
+import struct
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+
+from .paths import CACHE_DIR
+from .wml import quoteattr
+
+# Bump when the processing below changes
+IMAGE_VERSION = '1'
+DPI = 150
+EMU_PER_INCH = 914400
+
+A_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+PIC_NS = 'http://schemas.openxmlformats.org/drawingml/2006/picture'
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+WP_NS = 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing'
+
+Screenshot = namedtuple('Screenshot', 'name file width height')
+
+
+def have_pillow():
+    return importlib.util.find_spec('PIL') is not None
+
+
+def slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def find_captures(directory, names):
+    """Map each page name to its capture in ``directory``, where there is one"""
+    by_slug = {}
+    for entry in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(entry)
+        if ext.lower() == '.png':
+            by_slug.setdefault(slug(stem), os.path.join(directory, entry))
+    found = {}
+    for name in names:
+        key = slug(name)
+        path = by_slug.get(key) or by_slug.get(re.sub(r'-page$', '', key))
+        if path:
+            found[name] = path
+    return found
+
+
+def png_size(path):
+    """``(width, height)`` from a PNG's IHDR chunk"""
+    with open(path, 'rb') as f:
+        head = f.read(24)
+    if head[:8] != b'\x89PNG\r\n\x1a\n' or head[12:16] != b'IHDR':
+        raise ValueError(f'{path} is not a PNG file')
+    return struct.unpack('>II', head[16:24])
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def process_image(source, target, max_width):
+    """Downscale ``source`` to at most ``max_width`` pixels and write ``target``; returns its size"""
+    tmp = f'{target}.{os.getpid()}.tmp'
+    if not have_pillow():
+        with open(source, 'rb') as src, open(tmp, 'wb') as dst:
+            dst.write(src.read())
+        os.replace(tmp, target)
+        return png_size(target)
+
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.load()
+        if image.width > max_width:
+            height = max(round(image.height * max_width / image.width), 1)
+            image = image.resize((max_width, height), Image.LANCZOS)
+        image.save(tmp, 'PNG', optimize=True)
+        size = image.size
+    os.replace(tmp, target)
+    return size
+
+
+def images_path(cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, 'images')
+
+
+def assets_path(output_path):
+    """``<name>_files`` next to an HTML or Markdown output, for its images"""
+    return f'{os.path.splitext(output_path)[0]}_files'
+
+
+def export_images(files, target_dir, cache_dir=CACHE_DIR):
+    """Copy processed images into ``target_dir``, skipping ones already there"""
+    if not files:
+        return
+    source_dir = images_path(cache_dir)
+    os.makedirs(target_dir, exist_ok=True)
+    for file in dict.fromkeys(files):
+        target = os.path.join(target_dir, file)
+        if not os.path.exists(target):
+            shutil.copyfile(os.path.join(source_dir, file), target)
+
+
+def _load_index(index_file):
+    try:
+        with open(index_file, encoding='utf-8') as f:
+            index = json.load(f)
+        if index['version'] == IMAGE_VERSION:
+            return index
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+    return {'version': IMAGE_VERSION, 'sources': {}, 'images': {}}
+
+
+def process_screenshots(directory, names, max_width, cache_dir=CACHE_DIR, workers=None):
+    """
+    Process the captures for ``names`` and return ``{name: Screenshot}``.
+
+    Captures are hashed only when their mtime or size changed, and each
+    distinct content hash is processed once, in parallel.
+    """
+    images_dir = images_path(cache_dir)
+    os.makedirs(images_dir, exist_ok=True)
+    index_file = os.path.join(images_dir, 'index.json')
+    index = _load_index(index_file)
+    sources, images = index['sources'], index['images']
+
+    captures = find_captures(directory, names)
+    keys = {}
+    changed = False
+    for name, path in captures.items():
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = sources.get(path)
+        if stamp is None or stamp[:2] != [st.st_mtime_ns, st.st_size]:
+            stamp = sources[path] = [st.st_mtime_ns, st.st_size, _sha256(path)]
+            changed = True
+        keys[name] = hashlib.sha256(f'{IMAGE_VERSION}:{max_width}:{stamp[2]}'.encode()).hexdigest()[:32]
+
+    pending = {}
+    for name, key in keys.items():
+        if key not in images or not os.path.exists(os.path.join(images_dir, f'{key}.png')):
+            pending.setdefault(key, os.path.abspath(captures[name]))
+    jobs = [(source, os.path.join(images_dir, f'{key}.png'), max_width) for key, source in pending.items()]
+    if len(jobs) > 1 and have_pillow():
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            sizes = list(pool.map(process_image, *zip(*jobs)))
+    else:
+        sizes = [process_image(*job) for job in jobs]
+    for key, size in zip(pending, sizes):
+        images[key] = list(size)
+
+    if pending or changed:
+        tmp = f'{index_file}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp, index_file)
+
+    return {name: Screenshot(name, f'{key}.png', *images[key]) for name, key in keys.items()}
+
+
+def add_screenshots(document, directory, section='pages', dpi=DPI, cache_dir=CACHE_DIR, workers=None):
+    """
+    Attach screenshots to the entries of ``section``; returns the page names
+    that have no capture (they keep their placeholder).
+
+    Images are displayed at ``dpi``, never wider than the printable width.
+    """
+    from .template import load_template
+
+    block_width = load_template(cache_dir)[0]._block_width
+    max_width = int(block_width / EMU_PER_INCH * dpi)
+    entries = [node for node in document.section(section).children if node.type == 'entries']
+    names = [item['name'] for node in entries for item in node.items]
+    shots = process_screenshots(directory, names, max_width, cache_dir, workers)
+
+    for node in entries:
+        for item in node.items:
+            shot = shots.get(item['name'])
+            if shot is None:
+                continue
+            cx = min(int(shot.width / dpi * EMU_PER_INCH), block_width)
+            item['image'] = {'file': shot.file, 'width': cx, 'height': int(cx * shot.height / shot.width)}
+    return [name for name in names if name not in shots]
+
+
+def section_has_images(node):
+    """Whether any figures or entries with a screenshot are below ``node``"""
+    if node.type == 'figure':
+        return True
+    if node.type == 'entries':
+        return any('image' in item for item in node.items)
+    return any(section_has_images(child) for child in getattr(node, 'children', ()))
+
+
+def drawing_xml(image, description='', rid='', shape_id=0):
+    """
+    Inline picture run for an entry's ``image``. Without ``rid`` and
+    ``shape_id`` the ids are left for ``ImageLinker`` to fill in.
+    """
+    cx, cy = image['width'], image['height']
+    name = f'Picture {shape_id}' if shape_id else 'Picture'
+    return (
+        f'<w:r><w:drawing><wp:inline xmlns:wp="{WP_NS}" xmlns:a="{A_NS}" xmlns:pic="{PIC_NS}" xmlns:r="{R_NS}">'
+        f'<wp:extent cx="{cx}" cy="{cy}"/><wp:docPr id="{shape_id}" name="{name}" descr={quoteattr(description)}/>'
+        '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+        f'<a:graphic><a:graphicData uri="{PIC_NS}"><pic:pic>'
+        f'<pic:nvPicPr><pic:cNvPr id="0" name={quoteattr(image["file"])}/><pic:cNvPicPr/></pic:nvPicPr>'
+        f'<pic:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+        f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+        '<a:prstGeom prst="rect"/></pic:spPr>'
+        '</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r>'
+    )
+
+
+class ImageLinker:
+    """
+    Gives the pictures in stitched or freshly rendered blocks their image
+    parts, relationship ids and document-unique shape ids.
+    """
+    MARKER = PIC_NS.encode()
+
+    def __init__(self, doc, cache_dir=CACHE_DIR):
+        self.doc = doc
+        self.images_dir = images_path(cache_dir)
+        self._ids = count(1)
+        self._rids = {}
+
+    def link(self, elements):
+        for element in elements:
+            for inline in element.iter(f'{{{WP_NS}}}inline'):
+                pic = next(inline.iter(f'{{{PIC_NS}}}pic'))
+                name = next(pic.iter(f'{{{PIC_NS}}}cNvPr')).get('name')
+                rid = self._rids.get(name)
+                if rid is None:
+                    # python-docx stores identical image bytes as one part
+                    rid = self._rids[name] = self.doc.part.get_or_add_image(os.path.join(self.images_dir, name))[0]
+                next(pic.iter(f'{{{A_NS}}}blip')).set(f'{{{R_NS}}}embed', rid)
+                shape_id = next(self._ids)
+                doc_pr = next(inline.iter(f'{{{WP_NS}}}docPr'))
+                doc_pr.set('id', str(shape_id))
+                doc_pr.set('name', f'Picture {shape_id}')
@@ -0,0 +1,203 @@
+"""
+Streaming .docx backend.
+
+``stream_document`` writes ``word/document.xml`` straight into the output
+zip while sections are rendered: paragraphs go out in small batches and
+tables a chunk of rows at a time, so no lxml tree of the body is ever
+built and peak memory stays flat however long the document gets. Every
+other package part is copied from the cached base template, so styles,
+numbering and page setup match the python-docx backend, and documents
+without screenshots get a byte-identical ``document.xml``.
+
+Sections are cached as raw body XML under ``<section>.stream`` and copied
+into the zip on later builds. Sections with screenshots are always
+rendered, since their relationship and shape ids are assigned per build.
+"""
+
+import io
+import os
+import shutil
+import zipfile
+from itertools import count
+
+from . import model, render, screenshots, tables, wml
+from .cache import FragmentCache, module_fingerprint, section_key
+from .memo import block_memo
+from .model import load_document
+from .providers import resolve_sources
+from .render import Renderer
+from .screenshots import drawing_xml, images_path, section_has_images
+from .tables import table_chunks
+from .template import load_template, template_path
+
+FLUSH_ITEMS = 256
+COPY_BUFFER = 1 << 16
+
+DOCUMENT_PART = 'word/document.xml'
+RELS_PART = 'word/_rels/document.xml.rels'
+CONTENT_TYPES_PART = '[Content_Types].xml'
+IMAGE_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+
+STREAM_FINGERPRINT = 'stream:' + module_fingerprint(model, render, screenshots, tables, wml)
+
+
+class _Pending(list):
+    """Renderer buffer that writes itself out every ``limit`` items"""
+    __slots__ = ('write', 'limit')
+
+    def __init__(self, write, limit=FLUSH_ITEMS):
+        super().__init__()
+        self.write = write
+        self.limit = limit
+
+    def append(self, item):
+        list.append(self, item)
+        if len(self) >= self.limit:
+            self.drain()
+
+    def drain(self):
+        if self:
+            self.write(''.join(self))
+            self.clear()
+
+
+class _Tee:
+    __slots__ = ('streams',)
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, data):
+        for stream in self.streams:
+            stream.write(data)
+
+
+class StreamRenderer(Renderer):
+    """
+    Renders sections as body XML into a binary stream.
+
+    ``template`` is the read-only base document, used for style lookups and
+    the table width. Screenshots get their relationship ids from ``media``,
+    a ``{file name: rId}`` dict filled in as pictures are written.
+    """
+
+    def __init__(self, template, style_ids=None, memo=None):
+        super().__init__(template, style_ids, memo)
+        self.block_width = template._block_width
+        self.media = {}
+        self._shape_ids = count(1)
+        self._write = None
+
+    def render_to(self, section, out):
+        def write(text):
+            out.write(text.encode('utf-8'))
+        self._write = write
+        self._buffer = _Pending(write)
+        self._group(section)
+        self.flush()
+
+    def flush(self):
+        self._buffer.drain()
+
+    def _table(self, node):
+        self.flush()
+        chunks = table_chunks(node.columns, node.rows, self.style_id(node.style), self.block_width, declare_ns=False)
+        for chunk in chunks:
+            self._write(chunk)
+
+    def _picture(self, image, description):
+        rid = self.media.setdefault(image['file'], f'rIdImg{len(self.media) + 1}')
+        return drawing_xml(image, description, rid, next(self._shape_ids))
+
+
+def _split_document(xml):
+    """Template ``document.xml`` around its (empty) body content"""
+    start = xml.index(b'<w:body>') + len(b'<w:body>')
+    end = xml.index(b'<w:sectPr', start)
+    return xml[:start], xml[end:]
+
+
+def _stream_section(section, out, renderer, cache, force, prune, prerendered=()):
+    """Copy one section from the cache or render it into ``out``; returns whether it was rendered"""
+    if section_has_images(section):
+        renderer.render_to(section, out)
+        return True
+    name = f'{section.name}.stream'
+    key = section_key(section, STREAM_FINGERPRINT)
+    cached = None if force and key not in prerendered else cache.open(name, key)
+    if cached is not None:
+        with cached:
+            shutil.copyfileobj(cached, out, COPY_BUFFER)
+        return False
+    with cache.writer(name, key, prune) as f:
+        renderer.render_to(section, _Tee(out, f))
+    return True
+
+
+def _with_media(part, data, media):
+    """Add image relationships / the png content type to a template part"""
+    if part == RELS_PART:
+        rels = ''.join(
+            f'<Relationship Id="{rid}" Type="{IMAGE_REL}" Target="media/{file}"/>' for file, rid in media.items()
+        )
+        return data.replace(b'</Relationships>', rels.encode() + b'</Relationships>')
+    if part == CONTENT_TYPES_PART and b'Extension="png"' not in data:
+        return data.replace(b'<Default ', b'<Default Extension="png" ContentType="image/png"/><Default ', 1)
+    return data
+
+
+def stream_document(output_path, document=None, cache=None, force=False, context=None, prune=True, tracer=None,
+                    prerendered=()):
+    """
+    Stream the .docx at ``output_path``; same arguments and return value as
+    ``build_document``.
+    """
+    if document is None:
+        document = load_document()
+    if cache is None:
+        cache = FragmentCache()
+    cache_dir = os.path.dirname(cache.path)
+    if tracer is None:
+        resolve_sources(document, context, cache_dir)
+    else:
+        with tracer.span('resolve sources'):
+            resolve_sources(document, context, cache_dir)
+    template, ids = load_template(cache_dir)
+    with open(template_path(cache_dir), 'rb') as f:
+        package = f.read()
+    renderer = StreamRenderer(template, ids, memo=None if force else block_memo())
+    rendered = []
+
+    tmp = f'{output_path}.{os.getpid()}.tmp'
+    try:
+        _write_package(tmp, package, document, renderer, cache, force, prune, tracer, rendered, prerendered)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, output_path)
+    return rendered
+
+
+def _write_package(path, package, document, renderer, cache, force, prune, tracer, rendered, prerendered):
+    images_dir = images_path(os.path.dirname(cache.path))
+    with zipfile.ZipFile(io.BytesIO(package)) as src, zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as dst:
+        head, tail = _split_document(src.read(DOCUMENT_PART))
+        with dst.open(DOCUMENT_PART, 'w', force_zip64=True) as out:
+            out.write(head)
+            for section in document.sections:
+                if tracer is None:
+                    fresh = _stream_section(section, out, renderer, cache, force, prune, prerendered)
+                else:
+                    with tracer.span(section.name, 'section') as span:
+                        fresh = _stream_section(section, out, renderer, cache, force, prune, prerendered)
+                        span.args['cached'] = not fresh
+                if fresh:
+                    rendered.append(section.name)
+            out.write(tail)
+
+        for info in src.infolist():
+            if info.filename != DOCUMENT_PART:
+                dst.writestr(info.filename, _with_media(info.filename, src.read(info), renderer.media))
+        for file in renderer.media:
+            dst.write(os.path.join(images_dir, file), f'word/media/{file}')
@@ -0,0 +1,82 @@
+"""
+Bulk table writer.
+
+Builds a whole ``w:tbl`` element from an iterable of row tuples. Rows are
+serialized to WordprocessingML in chunks and fed straight into an
+incremental lxml parser, so neither python-docx row/cell proxies nor one
+giant XML string are ever materialized. The result is identical to what
+``Document.add_table`` plus ``cell.text`` assignments produce.
+"""
+
+from itertools import islice
+
+from docx.oxml.parser import element_class_lookup
+from docx.shared import Emu
+from lxml import etree
+
+from .cache import W_NS, append_block
+from .wml import text_xml
+
+CHUNK_ROWS = 512
+
+
+def _tc(value, width):
+    para = f'<w:p><w:r>{text_xml(str(value))}</w:r></w:p>' if value not in (None, '') else '<w:p/>'
+    return f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>{para}</w:tc>'
+
+
+def table_chunks(columns, rows, style_id, width, chunk_rows=CHUNK_ROWS, declare_ns=True):
+    """
+    Yield the XML of a table as string chunks.
+
+    ``width`` is the table width in EMU, split evenly between the columns as
+    python-docx does. ``rows`` may be any iterable, including a generator.
+    ``declare_ns=False`` leaves out the ``w`` namespace declaration, for
+    chunks written inside a document that already declares it.
+    """
+    cols = len(columns)
+    col_width = Emu(width // cols).twips if cols else 0
+    cell = _tc
+    grid = f'<w:gridCol w:w="{col_width}"/>' * cols
+    style = f'<w:tblStyle w:val="{style_id}"/>' if style_id else ''
+    ns = f' xmlns:w="{W_NS}"' if declare_ns else ''
+    yield (
+        f'<w:tbl{ns}><w:tblPr>{style}<w:tblW w:type="auto" w:w="0"/>'
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+        'w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr>'
+        f'<w:tblGrid>{grid}</w:tblGrid>'
+    )
+    yield '<w:tr>' + ''.join(cell(v, col_width) for v in columns) + '</w:tr>'
+
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, chunk_rows))
+        if not batch:
+            break
+        yield ''.join(
+            '<w:tr>' + ''.join(cell(v, col_width) for v in row) + '</w:tr>' for row in batch
+        )
+    yield '</w:tbl>'
+
+
+def build_tbl(chunks):
+    """Parse an iterable of XML chunks into a python-docx ``CT_Tbl``"""
+    parser = etree.XMLParser(remove_blank_text=True, resolve_entities=False)
+    parser.set_element_class_lookup(element_class_lookup)
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+def write_table(doc, columns, rows, style='Light Grid Accent 1', style_id=None, chunk_rows=CHUNK_ROWS):
+    """
+    Append a table to ``doc`` in one step and return its ``CT_Tbl``.
+
+    ``columns`` is the header row; ``rows`` is an iterable of row tuples
+    which is consumed lazily. Pass ``style_id`` to skip the style lookup.
+    """
+    if style_id is None and style:
+        style_id = doc.styles[style].style_id
+    tbl = build_tbl(table_chunks(columns, rows, style_id, doc._block_width, chunk_rows))
+    append_block(doc.element.body, tbl)
+    return tbl
@@ -0,0 +1,88 @@
+"""
+Persistent base template.
+
+``Document()`` unzips and parses python-docx's bundled template on every
+call, and the report then restyles 'Normal' and looks styles up by name.
+The styled package is saved once under the cache directory together with
+its style name -> id map, parsed at most once per process, and every new
+document is a deep copy of that parsed template.
+"""
+
+import copy
+import io
+import json
+import os
+
+from .paths import CACHE_DIR
+
+# Bump when the base styles below change
+TEMPLATE_VERSION = '1'
+
+_loaded = {}
+
+
+def _styled_document():
+    from docx import Document
+    from docx.shared import Pt
+
+    doc = Document()
+    style = doc.styles['Normal']
+    style.font.name = 'Calibri'
+    style.font.size = Pt(11)
+    return doc
+
+
+def template_path(cache_dir=CACHE_DIR):
+    import docx
+
+    return os.path.join(cache_dir, 'template', f'base-{TEMPLATE_VERSION}-{docx.__version__}.docx')
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_template(cache_dir=CACHE_DIR):
+    """
+    Return ``(document, style_ids)`` for the parsed base template.
+
+    The first call in a fresh cache builds the template and writes it out;
+    later processes parse the saved package instead. Treat the returned
+    document as read-only and use ``new_document`` for actual builds.
+    """
+    path = template_path(cache_dir)
+    loaded = _loaded.get(path)
+    if loaded is not None:
+        return loaded
+
+    from docx import Document
+
+    try:
+        with open(path, 'rb') as f:
+            doc = Document(io.BytesIO(f.read()))
+        with open(f'{path[:-5]}.styles.json', encoding='utf-8') as f:
+            style_ids = json.load(f)
+    except (FileNotFoundError, ValueError):
+        doc = _styled_document()
+        style_ids = {style.name: style.style_id for style in doc.styles}
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        _write(path, buffer.getvalue())
+        _write(f'{path[:-5]}.styles.json', json.dumps(style_ids).encode())
+
+    loaded = _loaded[path] = (doc, style_ids)
+    return loaded
+
+
+def new_document(cache_dir=CACHE_DIR):
+    """Blank document with the report's base styles applied"""
+    return copy.deepcopy(load_template(cache_dir)[0])
+
+
+def style_ids(cache_dir=CACHE_DIR):
+    """Style name -> style id map of the base template"""
+    return load_template(cache_dir)[1]
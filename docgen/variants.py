@@ -0,0 +1,106 @@
+"""
+Document variants: per-role and per-event cuts of the report.
+
+A variant is one entry of a build manifest::
+
+    {"name": "attendee", "role": "Attendee", "output": "reports/attendee.docx"}
+    {"name": "tech-conf", "event": {"id": "65a...", "title": "Tech Conference"}}
+
+``role`` drops sections and groups whose ``audience`` excludes it, and
+filters ``entries`` items by their ``users`` field. ``event`` is handed to
+table data providers and names the report in its subtitle.
+"""
+
+import json
+import os
+import re
+
+ROLES = ('Attendee', 'Organizer', 'Admin')
+
+
+class Variant:
+    __slots__ = ('name', 'output', 'role', 'event', 'sections', 'subtitle')
+
+    def __init__(self, name, output=None, role=None, event=None, sections=None, subtitle=None):
+        self.name = name
+        self.output = output or f'QRentry_{re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")}.docx'
+        self.role = role
+        self.event = event
+        self.sections = sections
+        self.subtitle = subtitle
+
+    @property
+    def context(self):
+        """What table data providers get to see"""
+        return {'variant': self.name, 'role': self.role, 'event': self.event}
+
+    def default_subtitle(self):
+        if self.subtitle:
+            return self.subtitle
+        if self.event:
+            return f'Event Report: {self.event.get("title") or self.event.get("id")}'
+        if self.role:
+            return f'Activity Documentation Report ({self.role} Edition)'
+        return None
+
+    def apply(self, document):
+        """Return a filtered copy of ``document`` for this variant"""
+        doc = document.copy()
+        if self.sections is not None:
+            keep = set(self.sections) | {'title'}
+            doc.sections = [s for s in doc.sections if s.name in keep]
+        if self.role:
+            doc.sections = [s for s in doc.sections if _visible(s, self.role)]
+            for section in doc.sections:
+                _filter(section, self.role)
+        subtitle = self.default_subtitle()
+        if subtitle:
+            _set_subtitle(doc, subtitle)
+        return doc
+
+
+def _visible(node, role):
+    audience = getattr(node, 'audience', None)
+    return not audience or role in audience
+
+
+def _mentions(text, role):
+    """Whether a free-text audience such as ``'Organizers, Admins'`` covers ``role``"""
+    text = text.lower()
+    named = [r for r in ROLES if r.lower() in text]
+    return not named or role.lower() in text
+
+
+def _filter(node, role):
+    children = getattr(node, 'children', None)
+    if children is not None:
+        node.children = [c for c in children if _visible(c, role)]
+        for child in node.children:
+            _filter(child, role)
+    if node.type == 'entries':
+        node.items = [item for item in node.items if _mentions(item.get('users', ''), role)]
+
+
+def _set_subtitle(doc, subtitle):
+    try:
+        title = doc.section('title')
+    except KeyError:
+        return
+    for node in title.children:
+        if node.type == 'paragraph' and node.runs:
+            node.runs[0].text = subtitle
+            return
+
+
+def load_manifest(path):
+    """Read a JSON manifest: ``{"output_dir": ..., "variants": [...]}``"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    output_dir = data.get('output_dir')
+    variants = []
+    for entry in data['variants']:
+        variant = Variant(**entry)
+        if output_dir and not os.path.isabs(variant.output):
+            variant.output = os.path.join(output_dir, variant.output)
+        variants.append(variant)
+    return variants
@@ -0,0 +1,233 @@
+"""
+Watch the documentation sources and rebuild on change.
+
+On Linux the source directories are watched with inotify (through ctypes,
+no extra dependency); elsewhere, or when inotify is unavailable, their
+files are polled by mtime and size. A burst of saves is collapsed into one
+rebuild once the sources have been quiet for ``DEBOUNCE`` seconds.
+
+The rebuild runs in the same long-lived process, so imports and the base
+template are already loaded, and the fragment cache re-renders only the
+sections whose inputs changed.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+
+from .model import CONTENT_PATH
+from .paths import API_DOCS, POSTMAN_COLLECTION
+from .routes import BACKEND_SRC
+
+DEBOUNCE = 0.1
+POLL_INTERVAL = 0.25
+
+# Editor swap, backup and lock files, and our own atomic-write temporaries
+IGNORED_SUFFIXES = ('.tmp', '.swp', '.swx', '~')
+IGNORED_PREFIXES = ('.#', '.~')
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT = struct.Struct('iIII')
+
+
+def watch_roots(inputs=()):
+    """
+    Directories and files the documentation is built from: the built-in
+    sources plus ``inputs`` (exports, capture directories, result files).
+    """
+    roots = [
+        os.path.dirname(CONTENT_PATH),
+        os.path.dirname(POSTMAN_COLLECTION),
+        os.path.dirname(API_DOCS),
+        BACKEND_SRC,
+        *(path for path in inputs if path),
+    ]
+    return [os.path.abspath(root) for root in roots if os.path.exists(root)]
+
+
+def ignored(path):
+    name = os.path.basename(path)
+    return name.endswith(IGNORED_SUFFIXES) or name.startswith(IGNORED_PREFIXES)
+
+
+def _directories(root):
+    yield root
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.') and d != 'node_modules']
+        for d in dirnames:
+            yield os.path.join(dirpath, d)
+
+
+class PollingWatcher:
+    """Detects changes by comparing file mtimes and sizes every ``interval`` seconds"""
+    kind = 'polling'
+
+    def __init__(self, roots, interval=POLL_INTERVAL):
+        self.roots = roots
+        self.interval = interval
+        self._files = self._snapshot()
+
+    def _snapshot(self):
+        files = {}
+        for root in self.roots:
+            if os.path.isfile(root):
+                st = os.stat(root)
+                files[root] = (st.st_mtime_ns, st.st_size)
+                continue
+            for directory in _directories(root):
+                try:
+                    entries = list(os.scandir(directory))
+                except FileNotFoundError:
+                    continue
+                for entry in entries:
+                    if entry.is_file():
+                        st = entry.stat()
+                        files[entry.path] = (st.st_mtime_ns, st.st_size)
+        return files
+
+    def poll(self, timeout):
+        """Changed paths, waiting up to ``timeout`` seconds (``None``: until there are some)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            files = self._snapshot()
+            changed = {path for path in files.keys() | self._files.keys() if files.get(path) != self._files.get(path)}
+            self._files = files
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            wait = self.interval if deadline is None else min(self.interval, max(deadline - time.monotonic(), 0))
+            time.sleep(wait)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watches on every directory below the roots"""
+    kind = 'inotify'
+
+    def __init__(self, roots):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.roots = roots
+        self._dirs = {}
+        # Single files are watched through their directory
+        self._files = {root for root in roots if os.path.isfile(root)}
+        try:
+            for root in roots:
+                if root in self._files:
+                    self._watch(os.path.dirname(root))
+                else:
+                    for directory in _directories(root):
+                        self._watch(directory)
+        except BaseException:
+            self.close()
+            raise
+
+    def _watch(self, directory):
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            # Directories may vanish between listing and watching
+            if directory in self.roots or err not in (errno.ENOENT, errno.ENOTDIR):
+                raise OSError(err, f'inotify_add_watch failed: {os.strerror(err)}', directory)
+            return
+        self._dirs[wd] = directory
+
+    def _wanted(self, path):
+        return not self._files or path in self._files or any(
+            path.startswith(root + os.sep) for root in self.roots if root not in self._files
+        )
+
+    def poll(self, timeout):
+        """Changed paths, waiting up to ``timeout`` seconds (``None``: until there are some)"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost; report every root so everything is rechecked
+                    changed.update(self.roots)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if mask & IN_DELETE_SELF:
+                    del self._dirs[wd]
+                elif mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    for sub in _directories(path):
+                        self._watch(sub)
+                elif self._wanted(path):
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(roots, polling=False):
+    """inotify where available, polling otherwise (or when ``polling`` is set)"""
+    if not polling and hasattr(os, 'O_CLOEXEC'):
+        try:
+            return InotifyWatcher(roots)
+        except (AttributeError, OSError):
+            pass
+    return PollingWatcher(roots)
+
+
+def watch(watcher, rebuild, debounce=DEBOUNCE, exclude=()):
+    """
+    Call ``rebuild(changed_paths)`` after every burst of changes the
+    ``watcher`` reports; runs until interrupted. Paths in or below
+    ``exclude`` (the build's own outputs) never trigger a rebuild.
+    """
+    exclude = tuple(os.path.abspath(path) for path in exclude)
+
+    def relevant(paths):
+        return {
+            path for path in paths
+            if not ignored(path) and not any(path == x or path.startswith(x + os.sep) for x in exclude)
+        }
+
+    try:
+        while True:
+            changed = relevant(watcher.poll(None))
+            while True:
+                more = watcher.poll(debounce)
+                if not more:
+                    break
+                changed |= relevant(more)
+            if changed:
+                rebuild(changed)
+    finally:
+        watcher.close()
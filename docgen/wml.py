@@ -0,0 +1,63 @@
+"""
+WordprocessingML string builders shared by the renderer and table writer.
+"""
+
+# Local equivalents of xml.sax.saxutils.escape/quoteattr, which would pull in
+# urllib and http.client at import time
+_ATTR_ESCAPES = str.maketrans({'"': '&quot;', '\n': '&#10;', '\r': '&#13;', '\t': '&#9;'})
+
+
+def escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def quoteattr(value):
+    return f'"{escape(value).translate(_ATTR_ESCAPES)}"'
+
+
+def color_hex(color):
+    """``[r, g, b]`` or ``'RRGGBB'`` to the upper-case hex python-docx writes"""
+    if isinstance(color, str):
+        return color.lstrip('#').upper()
+    return '%02X%02X%02X' % tuple(color)
+
+
+def text_xml(text):
+    """Run content for ``text``, mapping tabs and newlines like python-docx"""
+    parts = []
+    chunk = []
+
+    def flush():
+        if chunk:
+            value = ''.join(chunk)
+            space = ' xml:space="preserve"' if value.strip() != value else ''
+            parts.append(f'<w:t{space}>{escape(value)}</w:t>')
+            chunk.clear()
+
+    for ch in text:
+        if ch == '\t':
+            flush()
+            parts.append('<w:tab/>')
+        elif ch in '\n\r':
+            flush()
+            parts.append('<w:br/>')
+        else:
+            chunk.append(ch)
+    flush()
+    return ''.join(parts)
+
+
+def run_xml(text, bold=None, italic=None, size=None, color=None, font=None):
+    props = []
+    if font:
+        props.append(f'<w:rFonts w:ascii={quoteattr(font)} w:hAnsi={quoteattr(font)}/>')
+    if bold is not None:
+        props.append('<w:b/>' if bold else '<w:b w:val="0"/>')
+    if italic is not None:
+        props.append('<w:i/>' if italic else '<w:i w:val="0"/>')
+    if color:
+        props.append(f'<w:color w:val="{color_hex(color)}"/>')
+    if size:
+        props.append(f'<w:sz w:val="{int(size * 2)}"/>')
+    rpr = f'<w:rPr>{"".join(props)}</w:rPr>' if props else ''
+    return f'<w:r>{rpr}{text_xml(text)}</w:r>'
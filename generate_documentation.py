@@ -3,507 +3,277 @@
 Generate Activity Documentation for QRentry Event Registration System
 """
 
-try:
-    from docx import Document
-    from docx.shared import Inches, Pt, RGBColor
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-except ImportError:
-    print("Installing python-docx...")
-    import subprocess
-    subprocess.check_call(['pip', 'install', 'python-docx'])
-    from docx import Document
-    from docx.shared import Inches, Pt, RGBColor
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
+import time
+
+STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import importlib  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+from contextlib import nullcontext  # noqa: E402
+
+from docgen.deps import check_dependencies  # noqa: E402
+from docgen.paths import CACHE_DIR as DEFAULT_CACHE_DIR  # noqa: E402
+
+OUTPUT_PATH = 'QRentry_Activity_Documentation.docx'
+
+
+class Stopwatch:
+    """Wall-clock laps since interpreter start-up, for ``--profile-startup``"""
+
+    def __init__(self, start=STARTED):
+        self.start = self.last = start
+        self.laps = []
+
+    def lap(self, label):
+        now = time.perf_counter()
+        self.laps.append((label, now - self.last))
+        self.last = now
+
+    def report(self):
+        width = max(len(label) for label, _ in self.laps)
+        lines = [f'  {label:<{width}}  {seconds * 1000:8.1f} ms' for label, seconds in self.laps]
+        lines.append(f'  {"total":<{width}}  {(self.last - self.start) * 1000:8.1f} ms')
+        return 'Startup profile:\n' + '\n'.join(lines)
+
+
+def _import_timed(stopwatch):
+    """Import the build modules one layer at a time so each shows up as a lap"""
+    importlib.import_module('docx')
+    stopwatch.lap('import python-docx')
+    importlib.import_module('docgen.build')
+    stopwatch.lap('import docgen')
+
+
+def create_documentation(output_path=OUTPUT_PATH, force=False, cache_dir=DEFAULT_CACHE_DIR,
+                         exports=None, event_id=None, attendees=True, analytics=False, stopwatch=None,
+                         tracer=None, screenshots=None, screenshot_dpi=None, workers=None, backend=None,
+                         formats=('docx',), load_results=None, capacity=None, check=False):
+    """
+    Create comprehensive Activity Documentation; with ``check``, refuse to
+    build (``RuntimeError``) while the content contradicts the code. The
+    ``backend`` defaults to ``stream`` when the report has attendee tables.
+    """
+    from docgen import FragmentCache, load_document
+    from docgen.formats import build_formats, output_paths
+
+    with tracer.span('load content') if tracer else nullcontext():
+        document = load_document()
+        if exports:
+            from docgen.attendance import add_attendance
+            add_attendance(document, exports, event_id, attendees, cache_dir)
+            if analytics:
+                from docgen.analytics import add_analytics
+                add_analytics(document, exports, event_id, cache_dir)
+        if load_results:
+            from docgen.loadtest import add_performance
+            add_performance(document, load_results)
+        if capacity:
+            from docgen.scansim import add_capacity
+            add_capacity(document, capacity, cache_dir)
+    if screenshots:
+        from docgen.screenshots import DPI, add_screenshots, have_pillow
+        if not have_pillow():
+            print('Pillow is not installed; screenshots are embedded at full resolution')
+        with tracer.span('screenshots') if tracer else nullcontext():
+            missing = add_screenshots(document, screenshots, dpi=screenshot_dpi or DPI, cache_dir=cache_dir,
+                                      workers=workers)
+        if missing:
+            print(f'No screenshot for: {", ".join(missing)}')
+    if check:
+        from docgen.consistency import check_document, format_findings
+        with tracer.span('consistency check') if tracer else nullcontext():
+            findings = check_document(document, cache_dir, workers)
+        if findings:
+            raise RuntimeError(format_findings(findings))
+    if stopwatch:
+        from docgen.template import load_template, template_path
+        stopwatch.lap('load content')
+        cached = os.path.exists(template_path(cache_dir))
+        load_template(cache_dir)
+        stopwatch.lap(f'base template ({"cached" if cached else "built"})')
+    if backend is None:
+        # python-docx would hold every attendee row in its tree; the stream backend never does
+        backend = 'stream' if exports and attendees else 'docx'
+    outputs = output_paths(output_path, formats)
+    with tracer.span('build') if tracer else nullcontext():
+        results = build_formats(outputs, document, cache=FragmentCache(cache_dir), force=force, backend=backend,
+                                tracer=tracer)
+    if stopwatch:
+        stopwatch.lap('build')
+
+    if 'docx' in results:
+        rendered = results['docx']
+        if rendered:
+            from docgen.memo import block_memo, format_stats
+            print(f'Rendered sections: {", ".join(rendered)}')
+            if block_memo() is not None and not force:
+                print(f'Blocks: {format_stats(block_memo().stats())}')
+        else:
+            print('All sections up to date (cached)')
+    for path in outputs.values():
+        print(f'✅ Documentation created successfully: {path}')
+    return list(outputs.values())
+
+
+def watch_documentation(build, inputs=(), polling=False):
+    """
+    Run ``build()`` now and ``build(force=False)`` again whenever its sources
+    change, until interrupted; ``--force`` applies to the first build only.
+    """
+    from docgen.screenshots import assets_path
+    from docgen.watch import open_watcher, watch, watch_roots
+
+    outputs = build()
+    watcher = open_watcher(watch_roots(inputs), polling)
+    print(f'Watching {len(watcher.roots)} source paths ({watcher.kind}); press Ctrl+C to stop')
+
+    def rebuild(changed):
+        print(f'\nChanged: {", ".join(sorted(os.path.relpath(path) for path in changed))}')
+        start = time.perf_counter()
+        try:
+            build(force=False)
+        except Exception as exc:
+            # A half-saved source must not end the session; the next save retries
+            print(f'❌ Build failed: {exc}', file=sys.stderr)
+            return
+        print(f'Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms')
+
+    try:
+        watch(watcher, rebuild, exclude=[*outputs, *(assets_path(path) for path in outputs)])
+    except KeyboardInterrupt:
+        print()
+
+
+def create_variants(manifest, workers=None, force=False, cache_dir=DEFAULT_CACHE_DIR, exports=None,
+                    attendees=True, analytics=False, load_results=None, capacity=None, backend=None):
+    """Build every document variant listed in ``manifest`` in parallel"""
+    from docgen.batch import build_variants, format_report
+    from docgen.variants import load_manifest
+
+    report = build_variants(load_manifest(manifest), cache_dir=cache_dir, workers=workers, force=force,
+                            exports=exports, attendees=attendees, analytics=analytics, load_results=load_results,
+                            capacity=capacity, backend=backend)
+    print(format_report(report))
+    return [r.output for r in report.results]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('-o', '--output', default=OUTPUT_PATH,
+                        help='output .docx path; other --formats are written next to it with their own extension')
+    parser.add_argument('--formats', nargs='+', choices=('docx', 'html', 'md'), default=['docx'],
+                        help='output formats, written concurrently from one render pass '
+                             '(the HTML has print styles for saving as PDF)')
+    parser.add_argument('--force', action='store_true', help='ignore cached sections and re-render everything')
+    parser.add_argument('--backend', choices=('docx', 'stream'),
+                        help='"stream" writes word/document.xml into the zip section by section, '
+                             'keeping memory flat for very long reports; the default is "stream" when the '
+                             'report has per-attendee tables and "docx" otherwise')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='directory for cached section fragments')
+    parser.add_argument('--memo-entries', type=int, default=4096, metavar='N',
+                        help='rendered blocks (lists, tables, ...) kept in memory for reuse across sections, '
+                             'variants and --watch rebuilds, least recently used evicted first; 0 turns it off')
+    parser.add_argument('--memo-disk-mb', type=float, default=0, metavar='MB',
+                        help='also keep rendered blocks on disk (in the cache dir, shared by later runs and '
+                             '--manifest workers) up to MB megabytes')
+    parser.add_argument('--manifest', help='JSON manifest of document variants to build in parallel '
+                                           '(see docgen/content/manifest.json)')
+    parser.add_argument('--workers', type=int, help='worker processes for --manifest builds and screenshots')
+    parser.add_argument('--attendance', nargs='+', metavar='EXPORT',
+                        help='registration/check-in exports (.jsonl or .csv) for the attendance report')
+    parser.add_argument('--event', help='limit the attendance report to one event id')
+    parser.add_argument('--no-attendee-tables', action='store_true',
+                        help='attendance report with aggregates only, no per-attendee tables')
+    parser.add_argument('--analytics', action='store_true',
+                        help='add arrival-rate, scanner throughput and conversion statistics (needs --attendance)')
+    parser.add_argument('--load-results', metavar='JSON',
+                        help='add a Performance section from a load test run (python -m docgen.loadtest)')
+    parser.add_argument('--capacity', metavar='JSON',
+                        help='add a gate capacity-planning section from a check-in simulation '
+                             '(python -m docgen.scansim)')
+    parser.add_argument('--screenshots', metavar='DIR',
+                        help='directory of page captures (one PNG per page, e.g. login-page.png) to embed')
+    parser.add_argument('--screenshot-dpi', type=int,
+                        help='resolution screenshots are downscaled to at printable width (default 150)')
+    parser.add_argument('--check', action='store_true',
+                        help='verify ports, database/ORM, versions, npm scripts and endpoints stated in the content '
+                             'against the backend and frontend code, and fail instead of building on a mismatch')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='report where cold-start time goes (imports, base template, build)')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='record wall time, element counts and peak memory per section to PATH')
+    parser.add_argument('--trace-format', choices=('json', 'chrome'), default='json',
+                        help='trace file format; "chrome" loads in chrome://tracing and Perfetto')
+    parser.add_argument('--watch', action='store_true',
+                        help='stay running and rebuild the affected sections whenever the content, Postman '
+                             'collection, docs, backend controllers or any input file given on the command line '
+                             'changes')
+    parser.add_argument('--poll', action='store_true', help='with --watch, poll for changes instead of using inotify')
+    args = parser.parse_args(argv)
+    if args.manifest and (args.trace or args.screenshots or args.check or args.formats != ['docx']):
+        parser.error('--trace, --screenshots, --check and --formats apply to single builds; '
+                     'they cannot be combined with --manifest')
+    if args.manifest and args.event:
+        parser.error('--event cannot be combined with --manifest; each variant reports on its own event')
+    if args.watch and (args.manifest or args.trace or args.profile_startup):
+        parser.error('--watch cannot be combined with --manifest, --trace or --profile-startup')
+    return args
 
-def create_documentation():
-    """Create comprehensive Activity Documentation"""
-    doc = Document()
-    
-    # Set up styles
-    style = doc.styles['Normal']
-    style.font.name = 'Calibri'
-    style.font.size = Pt(11)
-    
-    # Title
-    title = doc.add_heading('QRentry Event Registration System', 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    title_format = title.runs[0].font
-    title_format.color.rgb = RGBColor(99, 102, 241)  # Primary color
-    
-    # Subtitle
-    subtitle = doc.add_paragraph('Activity Documentation Report')
-    subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    subtitle_format = subtitle.runs[0].font
-    subtitle_format.italic = True
-    subtitle_format.size = Pt(12)
-    
-    # Date
-    date_para = doc.add_paragraph('January 11, 2026')
-    date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    date_para.runs[0].font.size = Pt(10)
-    date_para.runs[0].font.color.rgb = RGBColor(107, 114, 128)
-    
-    doc.add_paragraph()  # Spacing
-    
-    # Table of Contents
-    doc.add_heading('Table of Contents', level=1)
-    toc_items = [
-        '1. Project Overview',
-        '2. System Description',
-        '3. Features',
-        '4. Architecture Overview',
-        '5. Application Pages & Screenshots',
-        '6. API Integration',
-        '7. Installation & Setup Instructions',
-        '8. Running the Project',
-        '9. Technical Stack',
-        '10. Support & Documentation'
-    ]
-    
-    for item in toc_items:
-        doc.add_paragraph(item, style='List Bullet')
-    
-    doc.add_page_break()
-    
-    # 1. Project Overview
-    doc.add_heading('1. Project Overview', level=1)
-    doc.add_paragraph(
-        'QRentry is a comprehensive Event Registration System that streamlines event '
-        'management through QR code technology. It enables attendees to register for events, '
-        'organizers to manage events and registrations, and administrators to oversee the entire system.'
-    )
-    
-    # 2. System Description
-    doc.add_heading('2. System Description', level=1)
-    doc.add_paragraph(
-        'QRentry simplifies the event registration process by leveraging QR codes for '
-        'quick check-ins, ticket management, and attendee tracking. The system supports multiple '
-        'user roles (Attendee, Organizer, Admin) with different permissions and capabilities.'
-    )
-    
-    description_table = doc.add_table(rows=5, cols=2)
-    description_table.style = 'Light Grid Accent 1'
-    
-    header_cells = description_table.rows[0].cells
-    header_cells[0].text = 'Aspect'
-    header_cells[1].text = 'Details'
-    
-    rows_data = [
-        ('System Name', 'QRentry Event Registration System'),
-        ('Primary Purpose', 'Event registration, ticketing, and check-in management'),
-        ('Target Users', 'Event Attendees, Event Organizers, System Administrators'),
-        ('Key Technology', 'QR Code scanning for registration and check-in')
-    ]
-    
-    for i, (aspect, detail) in enumerate(rows_data, 1):
-        cells = description_table.rows[i].cells
-        cells[0].text = aspect
-        cells[1].text = detail
-    
-    doc.add_page_break()
-    
-    # 3. Features
-    doc.add_heading('3. Features', level=1)
-    
-    doc.add_heading('Authentication', level=2)
-    features_auth = [
-        'User Registration (Attendee, Organizer, Admin)',
-        'Secure Login with JWT authentication',
-        'Password reset functionality',
-        'Email verification',
-        'Session management'
-    ]
-    for feature in features_auth:
-        doc.add_paragraph(feature, style='List Bullet')
-    
-    doc.add_heading('Event Management', level=2)
-    features_event = [
-        'Create and manage events',
-        'Set event details, date, time, and location',
-        'Manage event capacity',
-        'View event registrations',
-        'Generate QR codes for events'
-    ]
-    for feature in features_event:
-        doc.add_paragraph(feature, style='List Bullet')
-    
-    doc.add_heading('Registration & Ticketing', level=2)
-    features_reg = [
-        'Browse and register for events',
-        'Download event tickets',
-        'QR code integration for ticket verification',
-        'Multiple registration categories',
-        'Event status tracking'
-    ]
-    for feature in features_reg:
-        doc.add_paragraph(feature, style='List Bullet')
-    
-    doc.add_heading('Check-in Management', level=2)
-    features_checkin = [
-        'QR code scanning for attendee check-in',
-        'Real-time attendance tracking',
-        'Check-in status updates',
-        'Attendee list management',
-        'Check-in history and reporting'
-    ]
-    for feature in features_checkin:
-        doc.add_paragraph(feature, style='List Bullet')
-    
-    doc.add_heading('Admin Dashboard', level=2)
-    features_admin = [
-        'System overview and analytics',
-        'User management',
-        'Event oversight',
-        'Registration monitoring',
-        'System configuration'
-    ]
-    for feature in features_admin:
-        doc.add_paragraph(feature, style='List Bullet')
-    
-    doc.add_page_break()
-    
-    # 4. Architecture Overview
-    doc.add_heading('4. Architecture Overview', level=1)
-    
-    doc.add_heading('Frontend Stack', level=2)
-    doc.add_paragraph('React with TypeScript for type-safe component development', style='List Bullet')
-    doc.add_paragraph('Tailwind CSS for responsive, utility-first styling', style='List Bullet')
-    doc.add_paragraph('React Router for client-side navigation', style='List Bullet')
-    doc.add_paragraph('Zustand for state management', style='List Bullet')
-    doc.add_paragraph('Axios for HTTP API communication', style='List Bullet')
-    doc.add_paragraph('QR code scanning library for ticket verification', style='List Bullet')
-    
-    doc.add_heading('Backend Stack', level=2)
-    doc.add_paragraph('NestJS framework for robust API development', style='List Bullet')
-    doc.add_paragraph('PostgreSQL database for data persistence', style='List Bullet')
-    doc.add_paragraph('JWT (JSON Web Tokens) for authentication', style='List Bullet')
-    doc.add_paragraph('TypeORM for database ORM', style='List Bullet')
-    doc.add_paragraph('Role-based access control (RBAC)', style='List Bullet')
-    doc.add_paragraph('RESTful API endpoints', style='List Bullet')
-    
-    doc.add_heading('Authentication Flow', level=2)
-    doc.add_paragraph('1. User registers with email, password, and role (Attendee/Organizer/Admin)')
-    doc.add_paragraph('2. User logs in with credentials')
-    doc.add_paragraph('3. Backend validates and issues JWT token')
-    doc.add_paragraph('4. Frontend stores token in secure storage')
-    doc.add_paragraph('5. Token included in all subsequent API requests')
-    doc.add_paragraph('6. Backend validates token on protected routes')
-    
-    doc.add_page_break()
-    
-    # 5. Application Pages & Screenshots
-    doc.add_heading('5. Application Pages & Screenshots', level=1)
-    doc.add_paragraph(
-        'Note: The following pages represent the key user interfaces of QRentry. '
-        'Screenshots should be captured from the running application.'
-    )
-    
-    pages = [
-        {
-            'name': 'Login Page',
-            'description': 'User authentication interface. Attendees, organizers, and admins use this page to log in with their email/username and password. Includes forgot password link and signup option.',
-            'users': 'All user types'
-        },
-        {
-            'name': 'Registration Page',
-            'description': 'New user account creation. Users select their role (Attendee, Organizer, Admin), enter email, password, name, and optional company information.',
-            'users': 'New users'
-        },
-        {
-            'name': 'Discover Events Page',
-            'description': 'Browse all available events in the system. Displays event cards with name, date, time, location, and registration button. Users can search and filter events.',
-            'users': 'Attendees, Organizers'
-        },
-        {
-            'name': 'Create Event Page',
-            'description': 'Form for organizers to create new events. Includes fields for event name, description, date, time, location, capacity, and other event details.',
-            'users': 'Organizers'
-        },
-        {
-            'name': 'Event Details Page',
-            'description': 'Detailed view of a single event. Shows full event information, registration status, attendee count, and action buttons (Register, View Tickets, Check-in).',
-            'users': 'Attendees, Organizers'
-        },
-        {
-            'name': 'My Events Page',
-            'description': 'Dashboard showing registered events for attendees. Displays list of events with registration status, allows filtering by status (upcoming, past, cancelled).',
-            'users': 'Attendees'
-        },
-        {
-            'name': 'My Tickets Page',
-            'description': 'View and manage event tickets. Shows QR codes for each ticket, ticket details, and options to download or print tickets. Tickets display registration information.',
-            'users': 'Attendees'
-        },
-        {
-            'name': 'Check-in Page',
-            'description': 'QR code scanner interface for checking in attendees. Organizers and admins can scan attendee QR codes to verify attendance. Shows real-time attendance statistics.',
-            'users': 'Organizers, Admins'
-        },
-        {
-            'name': 'Admin Dashboard',
-            'description': 'System overview for administrators. Shows key metrics including total events, registrations, users, and system status. Provides access to manage users, events, and registrations.',
-            'users': 'Admins'
-        },
-        {
-            'name': 'Admin Users Management',
-            'description': 'Manage system users. Admins can view user list, edit user details, change user roles, and delete accounts. Shows user registration date and activity status.',
-            'users': 'Admins'
-        }
-    ]
-    
-    for i, page in enumerate(pages, 1):
-        doc.add_heading(f'{i}. {page["name"]}', level=2)
-        
-        desc_para = doc.add_paragraph()
-        desc_para.add_run('Description: ').bold = True
-        desc_para.add_run(page['description'])
-        
-        users_para = doc.add_paragraph()
-        users_para.add_run('Accessible to: ').bold = True
-        users_para.add_run(page['users'])
-        
-        # Placeholder for screenshot
-        screenshot_note = doc.add_paragraph()
-        screenshot_note.add_run('[Screenshot of ' + page['name'] + ']').italic = True
-        screenshot_note.runs[0].font.color.rgb = RGBColor(107, 114, 128)
-        
-        doc.add_paragraph()  # Spacing
-    
-    doc.add_page_break()
-    
-    # 6. API Integration
-    doc.add_heading('6. API Integration', level=1)
-    doc.add_paragraph('QRentry frontend communicates with the backend API for all operations.')
-    
-    api_table = doc.add_table(rows=1, cols=4)
-    api_table.style = 'Light Grid Accent 1'
-    
-    hdr_cells = api_table.rows[0].cells
-    hdr_cells[0].text = 'Endpoint'
-    hdr_cells[1].text = 'Method'
-    hdr_cells[2].text = 'Purpose'
-    hdr_cells[3].text = 'Auth Required'
-    
-    endpoints = [
-        ('POST /api/auth/register', 'POST', 'User registration', 'No'),
-        ('POST /api/auth/login', 'POST', 'User authentication', 'No'),
-        ('GET /api/events', 'GET', 'List all events', 'No'),
-        ('POST /api/events', 'POST', 'Create new event', 'Yes'),
-        ('GET /api/events/:id', 'GET', 'Get event details', 'No'),
-        ('POST /api/registrations', 'POST', 'Register for event', 'Yes'),
-        ('GET /api/my-registrations', 'GET', 'User registrations', 'Yes'),
-        ('POST /api/check-in', 'POST', 'Check in attendee', 'Yes'),
-        ('GET /api/admin/dashboard', 'GET', 'Admin stats', 'Yes (Admin)'),
-        ('GET /api/admin/users', 'GET', 'Manage users', 'Yes (Admin)')
-    ]
-    
-    for endpoint, method, purpose, auth in endpoints:
-        row_cells = api_table.add_row().cells
-        row_cells[0].text = endpoint
-        row_cells[1].text = method
-        row_cells[2].text = purpose
-        row_cells[3].text = auth
-    
-    doc.add_page_break()
-    
-    # 7. Installation & Setup
-    doc.add_heading('7. Installation & Setup Instructions', level=1)
-    
-    doc.add_heading('Prerequisites', level=2)
-    doc.add_paragraph('Node.js (v16 or higher)', style='List Bullet')
-    doc.add_paragraph('npm or yarn package manager', style='List Bullet')
-    doc.add_paragraph('PostgreSQL database (v12 or higher)', style='List Bullet')
-    doc.add_paragraph('Git for version control', style='List Bullet')
-    
-    doc.add_heading('Step 1: Clone Repository', level=2)
-    code1 = doc.add_paragraph('git clone <repository-url>')
-    code1.style = 'No Spacing'
-    code1.runs[0].font.name = 'Courier New'
-    code1.runs[0].font.color.rgb = RGBColor(31, 41, 55)
-    
-    code2 = doc.add_paragraph('cd event-registration-system')
-    code2.style = 'No Spacing'
-    code2.runs[0].font.name = 'Courier New'
-    code2.runs[0].font.color.rgb = RGBColor(31, 41, 55)
-    
-    doc.add_heading('Step 2: Backend Setup', level=2)
-    doc.add_paragraph('Navigate to backend directory')
-    code3 = doc.add_paragraph('cd backend')
-    code3.style = 'No Spacing'
-    code3.runs[0].font.name = 'Courier New'
-    
-    doc.add_paragraph('Install dependencies')
-    code4 = doc.add_paragraph('npm install')
-    code4.style = 'No Spacing'
-    code4.runs[0].font.name = 'Courier New'
-    
-    doc.add_paragraph('Create .env file with database configuration')
-    doc.add_paragraph('Run database migrations (if applicable)')
-    code5 = doc.add_paragraph('npm run typeorm migration:run')
-    code5.style = 'No Spacing'
-    code5.runs[0].font.name = 'Courier New'
-    
-    doc.add_heading('Step 3: Frontend Setup', level=2)
-    doc.add_paragraph('Navigate to frontend directory')
-    code6 = doc.add_paragraph('cd frontend')
-    code6.style = 'No Spacing'
-    code6.runs[0].font.name = 'Courier New'
-    
-    doc.add_paragraph('Install dependencies')
-    code7 = doc.add_paragraph('npm install')
-    code7.style = 'No Spacing'
-    code7.runs[0].font.name = 'Courier New'
-    
-    doc.add_paragraph('Configure API base URL in .env or config files')
-    
-    doc.add_page_break()
-    
-    # 8. Running the Project
-    doc.add_heading('8. Running the Project', level=1)
-    
-    doc.add_heading('Backend Startup', level=2)
-    doc.add_paragraph('From backend directory:')
-    code_back = doc.add_paragraph('npm run start:dev')
-    code_back.style = 'No Spacing'
-    code_back.runs[0].font.name = 'Courier New'
-    doc.add_paragraph('Backend runs on: http://localhost:3001')
-    
-    doc.add_heading('Frontend Startup', level=2)
-    doc.add_paragraph('From frontend directory (in separate terminal):')
-    code_front = doc.add_paragraph('npm start')
-    code_front.style = 'No Spacing'
-    code_front.runs[0].font.name = 'Courier New'
-    doc.add_paragraph('Frontend runs on: http://localhost:3000')
-    
-    doc.add_heading('Accessing the Application', level=2)
-    doc.add_paragraph('Open browser and navigate to: http://localhost:3000')
-    doc.add_paragraph('Create a new account or use provided test credentials')
-    doc.add_paragraph('Select role: Attendee, Organizer, or Admin')
-    
-    doc.add_heading('Test Credentials (if available)', level=2)
-    test_table = doc.add_table(rows=4, cols=3)
-    test_table.style = 'Light Grid Accent 1'
-    
-    test_hdr = test_table.rows[0].cells
-    test_hdr[0].text = 'Role'
-    test_hdr[1].text = 'Email'
-    test_hdr[2].text = 'Password'
-    
-    test_data = [
-        ('Admin', 'admin@test.com', 'Test@123'),
-        ('Organizer', 'organizer@test.com', 'Test@123'),
-        ('Attendee', 'attendee@test.com', 'Test@123')
-    ]
-    
-    for role, email, pwd in test_data:
-        row = test_table.add_row()
-        row.cells[0].text = role
-        row.cells[1].text = email
-        row.cells[2].text = pwd
-    
-    doc.add_page_break()
-    
-    # 9. Technical Stack
-    doc.add_heading('9. Technical Stack', level=1)
-    
-    doc.add_heading('Frontend Technologies', level=2)
-    stack_front = [
-        'React 18.x - UI framework',
-        'TypeScript - Type-safe JavaScript',
-        'Tailwind CSS - Utility-first CSS framework',
-        'React Router - Navigation',
-        'Zustand - State management',
-        'Axios - HTTP client',
-        'QR Code Scanner - QR code reading'
-    ]
-    for tech in stack_front:
-        doc.add_paragraph(tech, style='List Bullet')
-    
-    doc.add_heading('Backend Technologies', level=2)
-    stack_back = [
-        'NestJS - Progressive Node.js framework',
-        'TypeScript - Type-safe JavaScript',
-        'PostgreSQL - Relational database',
-        'TypeORM - ORM for database operations',
-        'JWT - Authentication tokens',
-        'bcrypt - Password hashing',
-        'Passport - Authentication middleware'
-    ]
-    for tech in stack_back:
-        doc.add_paragraph(tech, style='List Bullet')
-    
-    doc.add_heading('Development Tools', level=2)
-    stack_dev = [
-        'VS Code - Code editor',
-        'Git - Version control',
-        'npm - Package manager',
-        'Postman - API testing (optional)',
-        'Docker - Containerization (optional)'
-    ]
-    for tech in stack_dev:
-        doc.add_paragraph(tech, style='List Bullet')
-    
-    doc.add_page_break()
-    
-    # 10. Support & Documentation
-    doc.add_heading('10. Support & Documentation', level=1)
-    
-    doc.add_heading('Troubleshooting', level=2)
-    doc.add_paragraph('Port Already in Use: Change port in configuration or kill process using the port', style='List Bullet')
-    doc.add_paragraph('Database Connection Issues: Verify PostgreSQL is running and .env credentials are correct', style='List Bullet')
-    doc.add_paragraph('Module Not Found: Run npm install again in respective directory', style='List Bullet')
-    doc.add_paragraph('CORS Errors: Ensure backend CORS configuration includes frontend URL', style='List Bullet')
-    doc.add_paragraph('Authentication Failures: Check JWT token expiration and localStorage/sessionStorage settings', style='List Bullet')
-    
-    doc.add_heading('Common Commands', level=2)
-    commands = [
-        ('npm install', 'Install project dependencies'),
-        ('npm start', 'Start frontend development server'),
-        ('npm run start:dev', 'Start backend in development mode'),
-        ('npm run build', 'Build frontend for production'),
-        ('npm run test', 'Run tests'),
-        ('npm run lint', 'Run code linter'),
-    ]
-    
-    cmd_table = doc.add_table(rows=1, cols=2)
-    cmd_table.style = 'Light Grid Accent 1'
-    
-    cmd_hdr = cmd_table.rows[0].cells
-    cmd_hdr[0].text = 'Command'
-    cmd_hdr[1].text = 'Description'
-    
-    for cmd, desc in commands:
-        cmd_row = cmd_table.add_row()
-        cmd_row.cells[0].text = cmd
-        cmd_row.cells[1].text = desc
-    
-    doc.add_heading('Resources', level=2)
-    doc.add_paragraph('React Documentation: https://react.dev', style='List Bullet')
-    doc.add_paragraph('NestJS Documentation: https://docs.nestjs.com', style='List Bullet')
-    doc.add_paragraph('Tailwind CSS: https://tailwindcss.com', style='List Bullet')
-    doc.add_paragraph('TypeScript: https://www.typescriptlang.org', style='List Bullet')
-    doc.add_paragraph('PostgreSQL: https://www.postgresql.org', style='List Bullet')
-    
-    doc.add_page_break()
-    
-    # Conclusion
-    doc.add_heading('Conclusion', level=1)
-    doc.add_paragraph(
-        'QRentry is a comprehensive event registration and management system that combines '
-        'modern web technologies with practical event management features. The system is designed '
-        'to be user-friendly, scalable, and secure. By following the setup and running instructions, '
-        'you should have a fully functional event management platform ready to deploy.'
-    )
-    
-    doc.add_paragraph()
-    doc.add_paragraph('For additional support, refer to the README files in the respective directories.')
-    
-    # Save document
-    output_path = 'QRentry_Activity_Documentation.docx'
-    doc.save(output_path)
-    
-    print(f'✅ Documentation created successfully: {output_path}')
-    return output_path
 
 if __name__ == '__main__':
-    create_documentation()
+    args = parse_args()
+    stopwatch = Stopwatch() if args.profile_startup else None
+    if stopwatch:
+        stopwatch.lap('module imports')
+    try:
+        check_dependencies()
+    except RuntimeError as exc:
+        sys.exit(str(exc))
+    if stopwatch:
+        stopwatch.lap('dependency check')
+        _import_timed(stopwatch)
+    from docgen.memo import blocks_path, configure_memo
+    configure_memo(args.memo_entries, disk_dir=blocks_path(args.cache_dir),
+                   disk_bytes=int(args.memo_disk_mb * (1 << 20)))
+    if args.manifest:
+        create_variants(args.manifest, workers=args.workers, force=args.force, cache_dir=args.cache_dir,
+                        exports=args.attendance, attendees=not args.no_attendee_tables, analytics=args.analytics,
+                        load_results=args.load_results, capacity=args.capacity, backend=args.backend)
+        if stopwatch:
+            stopwatch.lap('build variants')
+    else:
+        tracer = None
+        if args.trace:
+            from docgen.trace import Tracer
+            tracer = Tracer()
+
+        def build(force=args.force):
+            return create_documentation(args.output, force=force, cache_dir=args.cache_dir,
+                                        exports=args.attendance, event_id=args.event,
+                                        attendees=not args.no_attendee_tables, analytics=args.analytics,
+                                        stopwatch=stopwatch, tracer=tracer, screenshots=args.screenshots,
+                                        screenshot_dpi=args.screenshot_dpi, workers=args.workers,
+                                        backend=args.backend, formats=dict.fromkeys(args.formats),
+                                        load_results=args.load_results, capacity=args.capacity,
+                                        check=args.check)
+
+        try:
+            if args.watch:
+                inputs = [*(args.attendance or ()), args.screenshots, args.load_results, args.capacity]
+                if args.check:
+                    from docgen.consistency import CHECK_SOURCES
+                    inputs += CHECK_SOURCES
+                watch_documentation(build, inputs, args.poll)
+            else:
+                build()
+        except RuntimeError as exc:
+            sys.exit(str(exc))
+        if tracer:
+            tracer.close()
+            tracer.write(args.trace, args.trace_format)
+            print(tracer.report())
+            print(f'Trace written to {args.trace}')
+    if stopwatch:
+        print(stopwatch.report())
@@ -0,0 +1,188 @@
+"""
+Columnar conversion against a naive in-memory aggregation of the same
+exports. The chunk, run and block sizes are shrunk so a few hundred rows
+go through every spill, merge and flush boundary.
+"""
+
+import json
+import os
+import random
+import threading
+
+import pytest
+
+from docgen import columnar
+from docgen.analytics import to_epoch
+from docgen.attendance import CHECK_IN, iter_records
+from docgen.columnar import CHECK_INS, NULL_TIME, REGISTRATIONS, convert, open_store
+
+
+def _export(path, rng, registrations, check_ins):
+    events = [f'ev{n}' for n in (3, 1, 4, 10, 5, 9, 2)]
+    tickets = [f'T{n:03}' for n in range(registrations // 2)]
+    users = ['Zoë', 'ana', 'Ana', 'Łukasz', 'bob', '']
+    ids = []
+    with open(path, 'w', encoding='utf-8') as f:
+        for n in range(registrations):
+            event = rng.choice(events)
+            record = {
+                '_id': {'$oid': f'{n:024x}'}, 'eventId': event, 'eventTitle': f'Title {event}',
+                # Tickets repeat, within and across events
+                'ticketCode': rng.choice(tickets),
+                'status': rng.choice(['confirmed', 'cancelled', 'checked_in', 'waitlisted']),
+                'registeredAt': f'2026-01-{rng.randint(1, 28):02}T08:{rng.randint(0, 59):02}:00Z',
+            }
+            if rng.random() < 0.8:
+                record['userName'] = rng.choice(users)
+            else:
+                record['userId'] = rng.randint(1, 20)
+            if record['status'] == 'checked_in':
+                record['checkedInAt'] = f'2026-02-01T09:{rng.randint(0, 59):02}:00Z'
+            ids.append((f'{n:024x}', event))
+            f.write(json.dumps(record) + '\n')
+        for _ in range(check_ins):
+            registration, event = rng.choice(ids)
+            scanned_at = f'2026-02-01T09:{rng.randint(0, 59):02}:{rng.randint(0, 59):02}Z'
+            f.write(json.dumps({
+                'registrationId': registration, 'eventId': event, 'scannedBy': rng.choice(['s1', 's2', 's3']),
+                'method': rng.choice(['qr', 'manual', 'nfc']),
+                # Scans without a time are dropped
+                'scannedAt': None if rng.random() < 0.1 else scanned_at,
+            }) + '\n')
+
+
+def _time(value):
+    epoch = to_epoch(value)
+    return NULL_TIME if epoch is None else epoch
+
+
+def _naive(paths):
+    """Rows per event, in export order, as the store should decode them"""
+    registrations, check_ins, titles = {}, {}, {}
+    for kind, record in iter_records(paths):
+        event = str(record.get('eventId', ''))
+        if titles.get(event) is None:
+            titles[event] = record.get('eventTitle')
+        registrations.setdefault(event, [])
+        check_ins.setdefault(event, [])
+        if kind == CHECK_IN:
+            if record.get('scannedAt') is None:
+                continue
+            check_ins[event].append((
+                str(record.get('scannedBy', '')), str(record.get('registrationId', '')),
+                record.get('method', 'qr'), _time(record['scannedAt']),
+            ))
+        else:
+            registrations[event].append((
+                str(record.get('ticketCode', '')), str(record.get('userName') or record.get('userId', '')),
+                record.get('status', 'confirmed'), _time(record.get('registeredAt')),
+                _time(record.get('checkedInAt')),
+            ))
+    return registrations, check_ins, titles
+
+
+def _decoded(store):
+    """The store read back through its columns, string tables and enums"""
+    statuses, methods = store.enum('status'), store.enum('method')
+    tickets, users = store.strings('tickets'), store.strings('users')
+    scanners, registration_ids = store.strings('scanners'), store.strings('registration_ids')
+    reg = {name: store.column(REGISTRATIONS, name) for name, _ in columnar.COLUMNS[REGISTRATIONS]}
+    chk = {name: store.column(CHECK_INS, name) for name, _ in columnar.COLUMNS[CHECK_INS]}
+    registrations, check_ins = {}, {}
+    for event, event_id in enumerate(store.strings('events')):
+        registrations[event_id] = [
+            (tickets[reg['ticket'][r]], users[reg['user'][r]], statuses[reg['status'][r]],
+             reg['registered_at'][r], reg['checked_in_at'][r])
+            for r in store.event_rows(REGISTRATIONS, event)
+        ]
+        assert {reg['event'][r] for r in store.event_rows(REGISTRATIONS, event)} <= {event}
+        check_ins[event_id] = [
+            (scanners[chk['scanner'][r]], registration_ids[chk['registration'][r]], methods[chk['method'][r]],
+             chk['scanned_at'][r])
+            for r in store.event_rows(CHECK_INS, event)
+        ]
+        assert {chk['event'][r] for r in store.event_rows(CHECK_INS, event)} <= {event}
+    return registrations, check_ins
+
+
+@pytest.fixture
+def tiny(monkeypatch):
+    monkeypatch.setattr(columnar, 'CHUNK_ROWS', 3)
+    monkeypatch.setattr(columnar, 'RUN_ROWS', 5)
+    monkeypatch.setattr(columnar, 'BLOCK_ROWS', 2)
+
+
+@pytest.fixture
+def exports(tmp_path):
+    rng = random.Random(7)
+    paths = [str(tmp_path / 'first.jsonl'), str(tmp_path / 'second.jsonl')]
+    _export(paths[0], rng, 300, 200)
+    _export(paths[1], rng, 40, 30)
+    return paths
+
+
+def test_convert_matches_naive_aggregation(tiny, exports, tmp_path):
+    convert(exports, str(tmp_path / 'store'))
+    store = columnar.ColumnStore(str(tmp_path / 'store'))
+    registrations, check_ins, titles = _naive(exports)
+
+    assert list(store.strings('events')) == sorted(registrations)
+    assert list(store.strings('titles')) == [titles[e] or '' for e in sorted(registrations)]
+    assert _decoded(store) == (registrations, check_ins)
+    assert store.rows(REGISTRATIONS) == sum(map(len, registrations.values()))
+    assert store.rows(CHECK_INS) == sum(map(len, check_ins.values()))
+    assert 'waitlisted' in store.enum('status') and 'nfc' in store.enum('method')
+
+    for name, values in (
+        ('tickets', {r[0] for rows in registrations.values() for r in rows}),
+        ('users', {r[1] for rows in registrations.values() for r in rows}),
+        ('registration_ids', {c[1] for rows in check_ins.values() for c in rows}),
+    ):
+        assert list(store.strings(name)) == sorted(values)
+
+
+def test_ticket_index(tiny, exports, tmp_path):
+    convert(exports, str(tmp_path / 'store'))
+    store = columnar.ColumnStore(str(tmp_path / 'store'))
+    tickets, ticket = store.strings('tickets'), store.column(REGISTRATIONS, 'ticket')
+    expected = {}
+    for row in range(store.rows(REGISTRATIONS)):
+        expected.setdefault(tickets[ticket[row]], []).append(row)
+    assert any(len(rows) > 1 for rows in expected.values())
+    for code, rows in expected.items():
+        assert store.ticket_rows(code) == rows
+    assert store.ticket_rows('missing') == []
+
+
+def test_chunk_sizes_do_not_change_the_store(exports, tmp_path, monkeypatch):
+    convert(exports, str(tmp_path / 'default'))
+    monkeypatch.setattr(columnar, 'CHUNK_ROWS', 1)
+    monkeypatch.setattr(columnar, 'RUN_ROWS', 2)
+    monkeypatch.setattr(columnar, 'BLOCK_ROWS', 1)
+    convert(exports, str(tmp_path / 'tiny'))
+    names = sorted(os.listdir(tmp_path / 'default'))
+    assert names == sorted(os.listdir(tmp_path / 'tiny'))
+    for name in names:
+        assert (tmp_path / 'default' / name).read_bytes() == (tmp_path / 'tiny' / name).read_bytes(), name
+
+
+def test_empty_export(tiny, tmp_path):
+    path = tmp_path / 'empty.jsonl'
+    path.write_text('')
+    convert([str(path)], str(tmp_path / 'store'))
+    store = columnar.ColumnStore(str(tmp_path / 'store'))
+    assert store.rows(REGISTRATIONS) == store.rows(CHECK_INS) == 0
+    assert len(store.strings('events')) == 0
+    assert store.event_rows(REGISTRATIONS, 'ev1') == range(0)
+
+
+def test_open_store_from_threads(tiny, exports, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    stores = []
+    threads = [threading.Thread(target=lambda: stores.append(open_store(exports, cache_dir))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(stores) == 4 and len({id(store) for store in stores}) == 1
+    assert os.listdir(columnar.columnar_path(cache_dir)) == [os.path.basename(stores[0].path)]
@@ -0,0 +1,129 @@
+"""
+Consistency check against a small backend/frontend tree with known
+mismatches.
+"""
+
+import json
+import os
+
+import pytest
+
+from docgen import consistency
+from docgen.consistency import check_document
+from docgen.model import Document, Paragraph, Section
+
+MAIN_TS = """
+async function bootstrap() {
+  const app = await NestFactory.create(AppModule);
+  app.setGlobalPrefix('api');
+  await app.listen(process.env.PORT || 3001);
+}
+"""
+
+EVENTS_CONTROLLER = """
+@Controller('events')
+export class EventsController {
+  @Get()
+  findAll() {}
+
+  @Get(':id')
+  findOne(@Param('id') id: string) {}
+
+  @Post()
+  create(@Body() dto: CreateEventDto) {}
+}
+"""
+
+EVENTS_SERVICE = """
+export const eventsService = {
+  getAll: () => api.get('/api/events'),
+  getOne: (id: string) => api.get(`/api/events/${id}`),
+  remove: (id: string) => api.delete(`/api/events/${id}`),
+};
+"""
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    root = str(tmp_path / 'repo')
+    _write(os.path.join(root, 'backend', 'package.json'), json.dumps({
+        'dependencies': {'@nestjs/core': '^10.0.0', '@nestjs/mongoose': '^10.0.0', 'mongoose': '^8.0.0'},
+        'scripts': {'start': 'nest start', 'start:dev': 'nest start --watch'},
+    }))
+    _write(os.path.join(root, 'frontend', 'package.json'), json.dumps({
+        'dependencies': {'react': '^18.2.0', 'react-scripts': '5.0.1'},
+        'scripts': {'start': 'react-scripts start', 'build': 'react-scripts build'},
+    }))
+    _write(os.path.join(root, 'backend', 'src', 'main.ts'), MAIN_TS)
+    _write(os.path.join(root, 'backend', 'src', 'events', 'events.controller.ts'), EVENTS_CONTROLLER)
+    _write(os.path.join(root, 'frontend', 'src', 'services', 'events.service.ts'), EVENTS_SERVICE)
+
+    monkeypatch.setattr(consistency, 'REPO_ROOT', root)
+    monkeypatch.setattr(consistency, 'BACKEND_PACKAGE', os.path.join(root, 'backend', 'package.json'))
+    monkeypatch.setattr(consistency, 'FRONTEND_PACKAGE', os.path.join(root, 'frontend', 'package.json'))
+    monkeypatch.setattr(consistency, 'SERVICES_GLOB',
+                        os.path.join(root, 'frontend', 'src', 'services', '*.service.ts'))
+    return root
+
+
+def _check(tree, tmp_path, *texts):
+    document = Document([Section('claims', [Paragraph(text=text) for text in texts])])
+    return check_document(document, str(tmp_path / 'cache'), workers=2,
+                          backend_src=os.path.join(tree, 'backend', 'src'))
+
+
+def _found(findings):
+    return sorted((f.section, f.kind, f.claim, f.expected) for f in findings)
+
+
+def test_known_mismatches(tree, tmp_path):
+    findings = _check(
+        tree, tmp_path,
+        'Data is stored in PostgreSQL through TypeORM.',
+        'Built with React 17 and NestJS 10.',
+        'The backend API listens on http://localhost:3000/api',
+        'Run npm run seed to load sample data, then npm start.',
+        'DELETE /api/events/:id removes an event.',
+    )
+    service = 'frontend/src/services/events.service.ts'
+    assert _found(findings) == sorted([
+        (service, 'endpoint', 'DELETE /api/events/${id}', 'no matching controller route'),
+        ('claims', 'database', 'Data is stored in PostgreSQL through TypeORM.',
+         'PostgreSQL is not a dependency; the backend uses MongoDB (mongoose, @nestjs/mongoose)'),
+        ('claims', 'orm', 'Data is stored in PostgreSQL through TypeORM.',
+         'TypeORM is not a dependency; the backend uses Mongoose (mongoose, @nestjs/mongoose)'),
+        ('claims', 'version', 'Built with React 17 and NestJS 10.', 'react ^18.2.0'),
+        ('claims', 'port', 'The backend API listens on http://localhost:3000/api', 'port 3001'),
+        ('claims', 'script', 'Run npm run seed to load sample data, then npm start.', 'no "seed" script'),
+        ('claims', 'endpoint', 'DELETE /api/events/:id removes an event.', 'no DELETE /api/events/:id route'),
+    ])
+    assert [f.source for f in findings if f.section == service] == [f'{service}:5']
+
+
+def test_consistent_statements(tree, tmp_path):
+    findings = _check(
+        tree, tmp_path,
+        'MongoDB with Mongoose, React 18 and NestJS 10.',
+        'The backend API listens on http://localhost:3001/api.',
+        'Open the frontend in a browser at http://localhost:3000.',
+        'npm run start:dev, or npm start.',
+        'GET /events/:id and POST /api/events.',
+    )
+    assert [f.section for f in findings] == ['frontend/src/services/events.service.ts']
+
+
+def test_findings_follow_source_changes(tree, tmp_path):
+    claim = 'DELETE /api/events/:id removes an event.'
+    assert len(_check(tree, tmp_path, claim)) == 2
+    # Cached facts and section results give the same answer
+    assert len(_check(tree, tmp_path, claim)) == 2
+
+    _write(os.path.join(tree, 'backend', 'src', 'events', 'events.controller.ts'), EVENTS_CONTROLLER.replace(
+        '  @Post()', "  @Delete(':id')\n  remove(@Param('id') id: string) {}\n\n  @Post()"))
+    assert _check(tree, tmp_path, claim) == []